@@ -21,16 +21,16 @@ from _mienodes_internal.services.llm import SetGeneralLLMServiceConnector, SetSi
     SetDeepSeekLLMServiceConnector, SetGeminiLLMServiceConnector, SetBailianLLMServiceConnector, \
     SetMiniMaxLLMServiceConnector, SetMiniMaxTokenPlanLLMServiceConnector, \
     SetMiMoLLMServiceConnector, SetMiMoTokenPlanLLMServiceConnector, \
-    CheckLLMServiceConnectivity, CallLLMService
+    CheckLLMServiceConnectivity, CallLLMService, CallLLMServiceBatch, SetLLMResponseCache, SetLLMHttpPool
 from _mienodes_internal.nodes.media import WavConcat, QwenTTSNode, SingleImageToVideo, AddNumberWatermarkForImage, AddTextWatermarkForImage
 from _mienodes_internal.services.tts import SetBailianTTSConnector
-from _mienodes_internal.nodes.loop import MieLoopStart, MieLoopResume, MieLoopBodyIn, MieLoopBodyOut, MieLoopEnd, MieLoopGetIndex, MieLoopIfCurrentIdx, MieLoopIfIsFirst, MieLoopIfIsLast, MieLoopParamGetInt, MieLoopParamGetFloat, \
+from _mienodes_internal.nodes.loop import MieLoopStart, MieLoopResume, MieLoopUnrollJoin, MieLoopInlineRun, MieLoopBodyIn, MieLoopBodyOut, MieLoopEnd, MieLoopGetIndex, MieLoopIfCurrentIdx, MieLoopIfIsFirst, MieLoopIfIsLast, MieLoopParamGetInt, MieLoopParamGetFloat, \
     MieLoopParamGetString, MieLoopParamGetBool, MieLoopStateGetInt, MieLoopStateGetFloat, MieLoopStateGetString, \
     MieLoopStateGetBool, MieLoopStateSet, MieImageSelectFrame, MieLoopStateSetImage, MieLoopStateSetImageBatch, MieLoopStateGetImage, MieLoopStateCleanupImage, \
     MieLoopStateSetInt, MieLoopStateSetFloat, MieLoopStateSetString, MieLoopStateSetBool, \
     MieLoopCollectImage, MieLoopFinalizeImages, MieLoopCleanupImages, MieImageGrid, \
     MieLoopCollectText, MieLoopFinalizeTextList, MieLoopCleanupText, MieLoopCollectJSON, MieLoopFinalizeJSONList, MieLoopCleanupJSON, \
-    MieLoopCollectAudio, MieLoopFinalizeAudio, MieLoopCleanupAudio
+    MieLoopCollectAudio, MieLoopFinalizeAudio, MieLoopCleanupAudio, MieLoopStats, MieLoopSetRuntimeBudget
 from _mienodes_internal.core.utils import add_suffix, add_emoji
 
 WEB_DIRECTORY = "./js"
@@ -64,6 +64,9 @@ NODE_CLASS_MAPPINGS = {
     add_suffix("SetMiMoTokenPlanLLMServiceConnector"): SetMiMoTokenPlanLLMServiceConnector,
     add_suffix("CheckLLMServiceConnectivity"): CheckLLMServiceConnectivity,
     add_suffix("CallLLMService"): CallLLMService,
+    add_suffix("CallLLMServiceBatch"): CallLLMServiceBatch,
+    add_suffix("SetLLMResponseCache"): SetLLMResponseCache,
+    add_suffix("SetLLMHttpPool"): SetLLMHttpPool,
     add_suffix("Translator"): TextTranslator,
     add_suffix("PromptGenerator"): PromptGenerator,
     add_suffix("KontextPromptGenerator"): KontextPromptGenerator,
@@ -118,6 +121,8 @@ NODE_CLASS_MAPPINGS = {
     add_suffix('AboutAuthorNode'): AboutAuthorNode,
     add_suffix("MieLoopStart"): MieLoopStart,
     add_suffix("MieLoopResume"): MieLoopResume,
+    add_suffix("MieLoopUnrollJoin"): MieLoopUnrollJoin,
+    add_suffix("MieLoopInlineRun"): MieLoopInlineRun,
     add_suffix("MieLoopBodyIn"): MieLoopBodyIn,
     add_suffix("MieLoopBodyOut"): MieLoopBodyOut,
     add_suffix("MieLoopEnd"): MieLoopEnd,
@@ -156,6 +161,8 @@ NODE_CLASS_MAPPINGS = {
     add_suffix("MieLoopCollectAudio"): MieLoopCollectAudio,
     add_suffix("MieLoopFinalizeAudio"): MieLoopFinalizeAudio,
     add_suffix("MieLoopCleanupAudio"): MieLoopCleanupAudio,
+    add_suffix("MieLoopStats"): MieLoopStats,
+    add_suffix("MieLoopSetRuntimeBudget"): MieLoopSetRuntimeBudget,
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -185,6 +192,9 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     add_suffix("SetMiMoTokenPlanLLMServiceConnector"): add_emoji("Set MiMo Token Plan LLM Service Connector"),
     add_suffix("CheckLLMServiceConnectivity"): add_emoji("Check LLM Service Connectivity"),
     add_suffix("CallLLMService"): add_emoji("Call LLM Service"),
+    add_suffix("CallLLMServiceBatch"): add_emoji("Call LLM Service Batch"),
+    add_suffix("SetLLMResponseCache"): add_emoji("Set LLM Response Cache"),
+    add_suffix("SetLLMHttpPool"): add_emoji("Set LLM Http Pool"),
     add_suffix("ModelDownloader"): add_emoji("Model Downloader"),
     add_suffix("HFRepoDownloader"): add_emoji("HF Repo Downloader"),
     add_suffix("Translator"): add_emoji("Translator"),
@@ -241,6 +251,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     add_suffix('AboutAuthorNode'): add_emoji('About Author'),
     add_suffix("MieLoopStart"): add_emoji("Mie Loop Start"),
     add_suffix("MieLoopResume"): add_emoji("Mie Loop Resume"),
+    add_suffix("MieLoopUnrollJoin"): add_emoji("Mie Loop Unroll Join"),
+    add_suffix("MieLoopInlineRun"): add_emoji("Mie Loop Inline Run"),
     add_suffix("MieLoopBodyIn"): add_emoji("Mie Loop Body In"),
     add_suffix("MieLoopBodyOut"): add_emoji("Mie Loop Body Out"),
     add_suffix("MieLoopEnd"): add_emoji("Mie Loop End"),
@@ -279,6 +291,8 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     add_suffix("MieLoopCollectAudio"): add_emoji("Mie Loop Collect Audio"),
     add_suffix("MieLoopFinalizeAudio"): add_emoji("Mie Loop Finalize Audio"),
     add_suffix("MieLoopCleanupAudio"): add_emoji("Mie Loop Cleanup Audio"),
+    add_suffix("MieLoopStats"): add_emoji("Mie Loop Stats"),
+    add_suffix("MieLoopSetRuntimeBudget"): add_emoji("Mie Loop Set Runtime Budget"),
 }
 
 __all__ = ["NODE_CLASS_MAPPINGS", "NODE_DISPLAY_NAME_MAPPINGS", "WEB_DIRECTORY"]
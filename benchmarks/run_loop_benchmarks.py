@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""Performance benchmarks for the loop subsystem (expand, collect, finalize).
+
+Standalone runner -- no pytest-benchmark needed. It loads ``nodes/loop/loop.py``
+through the same stubbed package context the unit tests use
+(``tests/conftest.py``: mocked ComfyUI modules, ``FakeGraphBuilder`` in place
+of ComfyUI's GraphBuilder), so it runs anywhere the test suite runs.
+
+Benchmarks:
+
+- ``collect_loop_body``: body detection on synthetic loop graphs of
+  50 / 500 / 5000 body nodes.
+- ``build_expand_graph``: ``_build_expand_graph_for_next_round`` on the same
+  graphs (cold: no template cache).
+- ``loop_end_rounds``: wall time of ``MieLoopEnd`` driven through 10 / 100 /
+  1000 rounds on a 50-node body (template reuse after round 0), reported as
+  total and per-round.
+- ``loop_driver_rounds``: the same 50-node body driven through 10 / 100 /
+  1000 rounds with ``MieLoopEnd(driver="expand")`` and ``driver="inline"``.
+  Unlike ``loop_end_rounds`` the body nodes really run: a minimal executor
+  calls every node of each expand graph in build order (stand-in bench node
+  classes return a constant), so the expand side pays graph building plus
+  per-round node instantiation, the inline side one compiled plan. ComfyUI's
+  own per-node bookkeeping (ephemeral registration, cache lookups, UI
+  messages) is not modelled, so the expand cost is a lower bound.
+- ``chunked_disk_merge``: merge throughput (MB/s) of synthetic ``.mieraw``
+  batches, chunked vs single-pass; batch count and frame shape are
+  configurable.
+
+Every case runs ``--repeat`` times; min / median / mean seconds are kept.
+Results go to stdout and, with ``--out``, to a JSON file. ``--compare`` takes
+a previous JSON file and reports the median ratio per case; the exit code is
+1 when any case is slower than ``--threshold`` times its baseline, so the
+runner can gate CI.
+
+Usage:
+
+    python benchmarks/run_loop_benchmarks.py --out bench.json
+    python benchmarks/run_loop_benchmarks.py --quick
+    python benchmarks/run_loop_benchmarks.py --only merge --merge-batches 30 \\
+        --merge-shape 81,704,1280
+    python benchmarks/run_loop_benchmarks.py --compare bench.json --threshold 1.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+_REPO_ROOT = Path(__file__).resolve().parent.parent
+_TESTS_CONFTEST = _REPO_ROOT / "tests" / "conftest.py"
+
+SUITES = ("detect", "expand", "end", "driver", "merge")
+
+
+def _load_harness():
+    """Return ``(loop_module, FakeGraphBuilder)`` from tests/conftest.py.
+
+    Under pytest the conftest is already imported (as ``tests.conftest``);
+    reuse it rather than executing loop.py a second time.
+    """
+    for name in ("tests.conftest", "conftest"):
+        mod = sys.modules.get(name)
+        if mod is not None and hasattr(mod, "FakeGraphBuilder"):
+            return mod.loop, mod.FakeGraphBuilder
+    spec = importlib.util.spec_from_file_location("_mie_bench_conftest", _TESTS_CONFTEST)
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules["_mie_bench_conftest"] = mod
+    spec.loader.exec_module(mod)
+    return mod.loop, mod.FakeGraphBuilder
+
+
+def synthetic_loop_graph(n_body, depth=40):
+    """A loop prompt with ``n_body`` business nodes between BodyIn and BodyOut.
+
+    Nodes are laid out in at most ``depth`` layers (width grows with
+    ``n_body``, as in real wide workflows). Each node reads two neighbours
+    from the previous layer, every fourth also reads a shared loader outside
+    the loop, and a join node gathers the last layer into BodyOut -- so
+    detection walks both directions and the expand builder has to keep
+    external links intact. Depth stays bounded because detection and the
+    expand builder recurse along node chains.
+    """
+    prompt = {
+        "1": {"class_type": "MieLoopStart|Mie", "inputs": {"loop_id": "bench"}},
+        "5": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "x"}},
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+    }
+    width = max(1, -(-n_body // max(1, depth)))
+    ids = [str(100 + i) for i in range(n_body)]
+    for i, nid in enumerate(ids):
+        layer, col = divmod(i, width)
+        if layer == 0:
+            inputs = {"loop_ctx": ["10", 0]}
+        else:
+            prev = (layer - 1) * width
+            inputs = {
+                "in_0": [ids[prev + col], 0],
+                "in_1": [ids[prev + (col + 1) % width], 0],
+            }
+        if i % 4 == 0:
+            inputs["model"] = ["5", 0]
+        prompt[nid] = {"class_type": f"BenchNode{i % 13}", "inputs": inputs}
+    last_layer = ids[((n_body - 1) // width) * width:] if ids else ["10"]
+    prompt["90"] = {
+        "class_type": "BenchJoin",
+        "inputs": {f"in_{k}": [nid, 0] for k, nid in enumerate(last_layer)},
+    }
+    prompt["20"] = {
+        "class_type": "MieLoopBodyOut|Mie",
+        "inputs": {"loop_ctx": ["90", 0], "state_json": "{}"},
+    }
+    prompt["30"] = {
+        "class_type": "MieLoopEnd|Mie",
+        "inputs": {"loop_ctx": ["20", 0], "state_json": "{}"},
+    }
+    return prompt
+
+
+def _bench_ctx(count, run_id):
+    return {
+        "version": 3,
+        "loop_id": "bench",
+        "run_id": run_id,
+        "mode": "for_each",
+        "index": 0,
+        "count": count,
+        "is_last": count == 1,
+        "params_list": [{"value": i} for i in range(count)],
+        "current_params": {"value": 0},
+        "state": {},
+        "collectors": {
+            "image": {"ref": None, "count": 0},
+            "text": {"ref": None, "count": 0},
+            "json": {"ref": None, "count": 0},
+            "audio": {"ref": None, "count": 0},
+        },
+        "meta": {"body_in_id": "10", "body_out_id": "20", "end_id": "30"},
+    }
+
+
+def _reset_runtime_store(loop):
+    for key, value in list(loop.RUNTIME_STORE.items()):
+        if key == "offload_writers":
+            for writer in list(value.values()):
+                writer.close()
+        if key == "collectors":
+            loop.RUNTIME_STORE[key] = {k: {} for k in value}
+        elif key == "state_objects":
+            loop.RUNTIME_STORE[key] = {"image": {}}
+        elif isinstance(value, dict):
+            loop.RUNTIME_STORE[key] = {}
+        elif isinstance(value, list):
+            loop.RUNTIME_STORE[key] = []
+
+
+@contextmanager
+def _fake_graph_builder(loop, fake_cls):
+    real = loop.GraphBuilder
+    loop.GraphBuilder = fake_cls
+    try:
+        yield
+    finally:
+        loop.GraphBuilder = real
+
+
+@contextmanager
+def _quiet_logs(loop, enabled):
+    """Silence ``mie_log`` (one line per LoopEnd round) unless ``--verbose``."""
+    real = loop.mie_log
+    if enabled:
+        loop.mie_log = lambda *args, **kwargs: None
+    try:
+        yield
+    finally:
+        loop.mie_log = real
+
+
+def _timed(fn, repeat):
+    times = []
+    extra = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        extra = fn()
+        times.append(time.perf_counter() - t0)
+    return times, extra
+
+
+def _result(name, params, times, **extra):
+    return {
+        "name": name,
+        "params": params,
+        "repeat": len(times),
+        "min_s": round(min(times), 6),
+        "median_s": round(statistics.median(times), 6),
+        "mean_s": round(statistics.fmean(times), 6),
+        **extra,
+    }
+
+
+def bench_detect(loop, sizes, repeat):
+    out = []
+    for n in sizes:
+        prompt = synthetic_loop_graph(n)
+        times, body = _timed(
+            lambda: loop.collect_loop_body("10", "20", prompt, "30")[0], repeat
+        )
+        out.append(_result("collect_loop_body", {"nodes": n}, times, body_nodes=len(body)))
+    return out
+
+
+def bench_expand(loop, fake_cls, sizes, repeat):
+    out = []
+    with _fake_graph_builder(loop, fake_cls):
+        for n in sizes:
+            prompt = synthetic_loop_graph(n)
+            _, detect_result = loop.collect_loop_body("10", "20", prompt, "30")
+
+            def build():
+                graph, _ = loop._build_expand_graph_for_next_round(
+                    next_ctx=_bench_ctx(2, "bench_expand"),
+                    dynprompt=prompt,
+                    body_in_id="10",
+                    body_out_id="20",
+                    end_id="30",
+                    detect_result=detect_result,
+                )
+                return len(graph)
+
+            times, n_expand = _timed(build, repeat)
+            _reset_runtime_store(loop)
+            out.append(
+                _result("build_expand_graph", {"nodes": n}, times, expand_nodes=n_expand)
+            )
+    return out
+
+
+def bench_end_rounds(loop, fake_cls, rounds_list, repeat, body_nodes=50):
+    out = []
+    prompt = synthetic_loop_graph(body_nodes)
+    end = loop.MieLoopEnd()
+    with _fake_graph_builder(loop, fake_cls):
+        for rounds in rounds_list:
+
+            def drive():
+                _reset_runtime_store(loop)
+                ctx = _bench_ctx(rounds, f"bench_end_{rounds}")
+                loop._ensure_runtime_meta(ctx["run_id"])
+                for idx in range(rounds):
+                    ctx["index"] = idx
+                    ctx["is_last"] = idx == rounds - 1
+                    result = end.execute(ctx, "{}", dynprompt=prompt, unique_id="30")
+                    if isinstance(result, tuple):
+                        return result[1]
+                return False
+
+            times, done = _timed(drive, repeat)
+            _reset_runtime_store(loop)
+            out.append(
+                _result(
+                    "loop_end_rounds",
+                    {"rounds": rounds, "body_nodes": body_nodes},
+                    times,
+                    per_round_s=round(statistics.median(times) / rounds, 9),
+                    done=bool(done),
+                )
+            )
+    return out
+
+
+class _BenchNode:
+    """Stand-in for the synthetic graph's business nodes: links only, one output."""
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {}}
+
+    RETURN_TYPES = ("*",)
+    FUNCTION = "run"
+
+    def run(self, **kwargs):
+        return (len(kwargs),)
+
+
+_BENCH_NODE_CLASSES = {f"BenchNode{i}": _BenchNode for i in range(13)}
+_BENCH_NODE_CLASSES["BenchJoin"] = _BenchNode
+
+
+@contextmanager
+def _bench_node_registry():
+    """Expose the bench node classes the way ComfyUI's ``nodes`` module does."""
+    missing = object()
+    real = sys.modules.get("nodes", missing)
+    sys.modules["nodes"] = type(sys)("nodes")
+    sys.modules["nodes"].NODE_CLASS_MAPPINGS = dict(_BENCH_NODE_CLASSES)
+    try:
+        yield
+    finally:
+        if real is missing:
+            sys.modules.pop("nodes", None)
+        else:
+            sys.modules["nodes"] = real
+
+
+def _execute_graph(loop, graph, cache, hidden):
+    """Run every node of ``graph`` in build order; returns a pending expand result."""
+    pending = None
+    for nid, node in graph.items():
+        node_cls = loop._inline_node_class(node["class_type"])
+        inputs = {
+            name: (True, cache[(str(value[0]), int(value[1]))]) if loop.is_link(value)
+            else (False, value)
+            for name, value in node["inputs"].items()
+        }
+        result = loop._inline_call_node(node_cls, node_cls(), inputs, dict(hidden, UNIQUE_ID=nid))
+        if isinstance(result, dict):
+            if "expand" in result:
+                pending = result
+                continue
+            result = result.get("result") or ()
+        for idx, value in enumerate(result):
+            cache[(nid, idx)] = value
+    return pending
+
+
+def bench_driver_rounds(loop, fake_cls, rounds_list, repeat, body_nodes=50):
+    out = []
+    prompt = synthetic_loop_graph(body_nodes)
+    end = loop.MieLoopEnd()
+    hidden = {"DYNPROMPT": prompt}
+    with _fake_graph_builder(loop, fake_cls), _bench_node_registry():
+        for driver in ("expand", "inline"):
+            for rounds in rounds_list:
+
+                def drive():
+                    _reset_runtime_store(loop)
+                    ctx = _bench_ctx(rounds, f"bench_driver_{driver}_{rounds}")
+                    loop._ensure_runtime_meta(ctx["run_id"])
+                    cache = {("5", 0): "model"}
+                    result = end.execute(
+                        ctx, "{}", dynprompt=prompt, unique_id="30", driver=driver
+                    )
+                    while isinstance(result, dict):
+                        pending = _execute_graph(loop, result["expand"], cache, hidden)
+                        if pending is None:
+                            result = tuple(cache[(src, idx)] for src, idx in result["result"])
+                        else:
+                            result = pending
+                    return result[1]
+
+                times, done = _timed(drive, repeat)
+                _reset_runtime_store(loop)
+                out.append(
+                    _result(
+                        "loop_driver_rounds",
+                        {"driver": driver, "rounds": rounds, "body_nodes": body_nodes},
+                        times,
+                        per_round_s=round(statistics.median(times) / rounds, 9),
+                        done=bool(done),
+                    )
+                )
+    return out
+
+
+def bench_merge(loop, n_batches, frame_shape, repeat, modes=("chunked", "single_pass")):
+    import torch
+
+    mieraw = sys.modules[loop.save_mieraw.__module__]
+    out = []
+    with tempfile.TemporaryDirectory(prefix="mie_bench_merge_") as tmp:
+        tmp = Path(tmp)
+        items = []
+        for i in range(n_batches):
+            path = tmp / f"image_{i:04d}.mieraw"
+            mieraw.save_mieraw(torch.rand(*frame_shape), path)
+            items.append({"disk_path": str(path), "ref": ""})
+        total_bytes = sum(Path(it["disk_path"]).stat().st_size for it in items)
+        for mode in modes:
+            stats = {}
+            # single_pass only writes once into a .mieraw target.
+            out_path = tmp / ("merged.mieraw" if mode == "single_pass" else "merged.pt")
+
+            def merge():
+                stats.clear()
+                loop._chunked_disk_merge(
+                    items, out_path, kind="image",
+                    single_pass=mode == "single_pass", stats=stats,
+                )
+                out_path.unlink()
+
+            times, _ = _timed(merge, repeat)
+            out.append(
+                _result(
+                    "chunked_disk_merge",
+                    {"mode": mode, "batches": n_batches, "batch_shape": list(frame_shape),
+                     "out": out_path.name},
+                    times,
+                    input_bytes=total_bytes,
+                    throughput_mb_s=round(total_bytes / 1e6 / statistics.median(times), 2),
+                    bytes_written=stats.get("bytes_written"),
+                    peak_rss_bytes=stats.get("peak_rss_bytes"),
+                    phase_s=stats.get("phase_s"),
+                )
+            )
+    return out
+
+
+def run(args):
+    loop, fake_cls = _load_harness()
+    only = set(args.only or SUITES)
+    results = []
+    with _quiet_logs(loop, not args.verbose):
+        if "detect" in only:
+            results += bench_detect(loop, args.sizes, args.repeat)
+        if "expand" in only:
+            results += bench_expand(loop, fake_cls, args.sizes, args.repeat)
+        if "end" in only:
+            results += bench_end_rounds(loop, fake_cls, args.rounds, args.repeat)
+        if "driver" in only:
+            results += bench_driver_rounds(loop, fake_cls, args.rounds, args.repeat)
+        if "merge" in only:
+            results += bench_merge(loop, args.merge_batches, tuple(args.merge_shape), args.repeat)
+    _reset_runtime_store(loop)
+    import torch
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+
+def _case_key(result):
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+
+def compare(report, baseline, threshold):
+    """Median ratio per case vs ``baseline``; returns the regressed cases."""
+    base = {_case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in report["results"]:
+        b = base.get(_case_key(r))
+        if b is None or not b.get("median_s"):
+            r["vs_baseline"] = None
+            continue
+        ratio = round(r["median_s"] / b["median_s"], 3)
+        r["vs_baseline"] = ratio
+        if ratio > threshold:
+            regressions.append(r)
+    return regressions
+
+
+def _int_list(raw):
+    return [int(x) for x in str(raw).split(",") if x.strip()]
+
+
+def parse_args(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--only", action="append", choices=SUITES, help="run only these suites (repeatable)")
+    ap.add_argument("--sizes", type=_int_list, default=[50, 500, 5000], help="body node counts, comma-separated")
+    ap.add_argument("--rounds", type=_int_list, default=[10, 100, 1000], help="MieLoopEnd / driver round counts")
+    ap.add_argument("--merge-batches", type=int, default=10)
+    ap.add_argument("--merge-shape", type=_int_list, default=[16, 256, 256, 3], help="frames,H,W[,C] per batch")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--quick", action="store_true", help="small sizes for a smoke run")
+    ap.add_argument("--verbose", action="store_true", help="keep the loop's own log lines")
+    ap.add_argument("--out", type=Path, default=None, help="write the JSON report here")
+    ap.add_argument("--compare", type=Path, default=None, help="baseline JSON report")
+    ap.add_argument("--threshold", type=float, default=1.25, help="regression ratio for --compare")
+    args = ap.parse_args(argv)
+    if len(args.merge_shape) == 3:
+        args.merge_shape = args.merge_shape + [3]
+    if args.quick:
+        args.sizes = [min(s, 50) for s in args.sizes][:1]
+        args.rounds = [min(r, 10) for r in args.rounds][:1]
+        args.merge_batches = min(args.merge_batches, 3)
+        args.merge_shape = [2, 16, 16, args.merge_shape[-1]]
+        args.repeat = 1
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run(args)
+    regressions = []
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+    for r in report["results"]:
+        extra = f"  vs_baseline={r['vs_baseline']}" if "vs_baseline" in r else ""
+        print(f"{r['name']:<22} {json.dumps(r['params'], sort_keys=True):<60} "
+              f"median={r['median_s']:.6f}s min={r['min_s']:.6f}s{extra}")
+    if args.out is not None:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}")
+    if regressions:
+        print(f"{len(regressions)} case(s) slower than {args.threshold}x baseline:")
+        for r in regressions:
+            print(f"  {r['name']} {json.dumps(r['params'], sort_keys=True)} x{r['vs_baseline']}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
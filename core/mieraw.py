@@ -0,0 +1,422 @@
+"""``.mieraw``: a header + raw-buffer tensor container.
+
+``torch.save`` / ``torch.load`` go through pickle + zip, so every reload
+deserializes the whole tensor into RAM even when the caller needs a few
+frames. A ``.mieraw`` file is just::
+
+    b"MIERAW\\x00\\x01"            8-byte magic (format version 1)
+    <u64 little-endian>           header length in bytes
+    <JSON header, space-padded>   {"dtype", "shape", "byteorder", "meta"}
+    <raw C-contiguous data>       starts on a 64-byte boundary
+
+so it can be ``numpy.memmap``-ed directly: `load_mieraw` returns a
+zero-copy (copy-on-write) tensor over the file, and a frame range only
+touches the pages of the frames it selects. `create_mieraw` pre-sizes a
+file and hands back a writable memmap over the data region, which lets a
+merge write its output exactly once.
+
+bfloat16 has no numpy dtype; it is stored as its raw 16-bit pattern and
+viewed back, so the round-trip is bit-exact. Like the rest of ``core/``
+this module has no ComfyUI imports.
+
+Encoded files (``codec != "raw"``, see `CODECS`) keep the same layout but
+the data region is a run of independently compressed blocks of whole
+frames, listed in ``header["encoding"]["blocks"]``. Blocks are compressed
+in a shared thread pool (zstd when ``zstandard`` is installed, else zlib;
+both release the GIL) and decoded one at a time, so `iter_tensor_blocks`
+and frame-range loads never inflate more than the blocks they need.
+Encoded files cannot be memory-mapped.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple, Union
+
+import numpy as np
+import torch
+
+try:
+    import zstandard
+except ImportError:  # optional: encoded files fall back to zlib
+    zstandard = None
+
+PathLike = Union[str, Path]
+
+MIERAW_MAGIC = b"MIERAW\x00\x01"
+MIERAW_SUFFIX = ".mieraw"
+_PREFIX = struct.Struct("<8sQ")
+_ALIGN = 64
+
+# dtype name -> (torch dtype, numpy dtype of the same item size)
+_DTYPES = {
+    "float32": (torch.float32, np.float32),
+    "float16": (torch.float16, np.float16),
+    "bfloat16": (torch.bfloat16, np.int16),
+    "float64": (torch.float64, np.float64),
+    "uint8": (torch.uint8, np.uint8),
+    "int8": (torch.int8, np.int8),
+    "int16": (torch.int16, np.int16),
+    "int32": (torch.int32, np.int32),
+    "int64": (torch.int64, np.int64),
+    "bool": (torch.bool, np.bool_),
+}
+_NAME_BY_TORCH = {tdt: name for name, (tdt, _) in _DTYPES.items()}
+
+# Offload codecs, from cheapest to smallest:
+#   raw             uncompressed, memory-mappable
+#   lossless        compressed original bytes
+#   lossless_uint8  uint8 when x == round(x*255)/255 holds bit-exactly for
+#                   every value (images that came from 8-bit files), else
+#                   falls back to "lossless"; compressed
+#   fp16            float16, compressed. Lossy but far below 8-bit display
+#                   precision for [0, 1] images (max error ~2.4e-4)
+#   uint8           round(clamp(x, 0, 1) * 255), compressed. Lossy at the
+#                   precision ComfyUI's own 8-bit image savers keep
+CODECS = ("raw", "lossless", "lossless_uint8", "fp16", "uint8")
+_UINT8_SCALE = 255.0
+# Target uncompressed bytes per block: big enough to compress well, small
+# enough that a streaming decode holds little and the pool has parallelism.
+_BLOCK_BYTES = 8 * 1024 * 1024
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = ThreadPoolExecutor(
+                max_workers=max(1, min(8, os.cpu_count() or 1)),
+                thread_name_prefix="mieraw-codec",
+            )
+        return _POOL
+
+
+def _compress(buf, compression: str) -> bytes:
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(buf)
+    return zlib.compress(buf, 1)
+
+
+def _decompress(buf: bytes, compression: str) -> bytes:
+    if compression == "zstd":
+        if zstandard is None:
+            raise RuntimeError("mieraw: file is zstd-compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(buf)
+    return zlib.decompress(buf)
+
+
+def _dtype_name(dtype: torch.dtype) -> str:
+    try:
+        return _NAME_BY_TORCH[dtype]
+    except KeyError:
+        raise ValueError(f"mieraw: unsupported dtype {dtype}") from None
+
+
+def _check_byteorder() -> None:
+    if sys.byteorder != "little":
+        raise RuntimeError("mieraw: only little-endian hosts are supported")
+
+
+def _encode_header(shape, dtype_name: str, meta: Optional[dict], encoding: Optional[dict] = None) -> bytes:
+    fields = {
+        "dtype": dtype_name,
+        "shape": [int(x) for x in shape],
+        "byteorder": "little",
+        "meta": meta or {},
+    }
+    if encoding is not None:
+        fields["encoding"] = encoding
+    body = json.dumps(
+        fields,
+        ensure_ascii=True,
+        separators=(",", ":"),
+    ).encode("ascii")
+    pad = (-(_PREFIX.size + len(body))) % _ALIGN
+    body += b" " * pad
+    return _PREFIX.pack(MIERAW_MAGIC, len(body)) + body
+
+
+def is_mieraw(path: PathLike) -> bool:
+    """True when ``path`` starts with the ``.mieraw`` magic (any extension)."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MIERAW_MAGIC)) == MIERAW_MAGIC
+    except OSError:
+        return False
+
+
+def read_header(path: PathLike) -> dict:
+    """Parse the header only. Adds ``data_offset`` (absolute byte offset)."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ValueError(f"mieraw: truncated header in {path}")
+        magic, header_len = _PREFIX.unpack(prefix)
+        if magic != MIERAW_MAGIC:
+            raise ValueError(f"mieraw: bad magic in {path}")
+        header = json.loads(f.read(header_len).decode("ascii"))
+    if header.get("dtype") not in _DTYPES:
+        raise ValueError(f"mieraw: unsupported dtype {header.get('dtype')!r} in {path}")
+    header["shape"] = tuple(int(x) for x in header["shape"])
+    header["data_offset"] = _PREFIX.size + header_len
+    return header
+
+
+def _numel(shape) -> int:
+    n = 1
+    for x in shape:
+        n *= int(x)
+    return n
+
+
+def _quantize(t: torch.Tensor, codec: str) -> Tuple[torch.Tensor, Optional[str], Optional[float], str]:
+    """Return ``(stored, stored_dtype_name, quant_scale, effective_codec)``."""
+    if not t.is_floating_point() or codec == "lossless":
+        return t, None, None, "lossless"
+    if codec in ("uint8", "lossless_uint8"):
+        q = torch.round(t.clamp(0.0, 1.0) * _UINT8_SCALE).to(torch.uint8)
+        if codec == "uint8" or torch.equal(q.to(t.dtype) / _UINT8_SCALE, t):
+            return q, "uint8", _UINT8_SCALE, codec
+        return t, None, None, "lossless"
+    if codec == "fp16":
+        return t.to(torch.float16), "float16", None, "fp16"
+    raise ValueError(f"mieraw: unknown codec {codec!r} (expected one of {CODECS})")
+
+
+def _encode_blocks(stored: torch.Tensor):
+    frames = int(stored.shape[0]) if stored.dim() else 1
+    frame_bytes = max(1, stored.numel() * stored.element_size() // max(1, frames))
+    per_block = max(1, _BLOCK_BYTES // frame_bytes)
+    compression = "zstd" if zstandard is not None else "zlib"
+    flat = stored.reshape(frames, -1) if stored.dim() else stored.reshape(1, -1)
+    if flat.dtype is torch.bfloat16:
+        flat = flat.view(torch.int16)
+    arr = flat.numpy()
+    jobs = [
+        _pool().submit(_compress, memoryview(arr[i : i + per_block]).cast("B"), compression)
+        for i in range(0, frames, per_block)
+    ]
+    return [j.result() for j in jobs], per_block, compression
+
+
+def save_mieraw(
+    tensor: torch.Tensor, path: PathLike, meta: Optional[dict] = None, codec: str = "raw"
+) -> int:
+    """Write ``tensor`` (moved to CPU, made contiguous) atomically.
+
+    ``codec`` is one of `CODECS`; anything but ``"raw"`` writes compressed
+    frame blocks. Returns the number of bytes written.
+    """
+    _check_byteorder()
+    t = tensor.detach().to("cpu").contiguous()
+    name = _dtype_name(t.dtype)
+    blocks = None
+    encoding = None
+    if codec != "raw" and t.numel():
+        stored, stored_name, scale, effective = _quantize(t, codec)
+        blocks, per_block, compression = _encode_blocks(stored.contiguous())
+        offsets, pos = [], 0
+        for b in blocks:
+            offsets.append([pos, len(b)])
+            pos += len(b)
+        encoding = {
+            "codec": effective,
+            "compression": compression,
+            "stored_dtype": stored_name or name,
+            "quant_scale": scale,
+            "frames_per_block": per_block,
+            "blocks": offsets,
+        }
+    elif t.dtype is torch.bfloat16:
+        t = t.view(torch.int16)
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    header = _encode_header(t.shape, name, meta, encoding)
+    try:
+        with open(tmp, "wb") as f:
+            f.write(header)
+            if blocks is not None:
+                for b in blocks:
+                    f.write(b)
+            elif t.numel():
+                f.write(memoryview(t.numpy()).cast("B"))
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        raise
+    if blocks is not None:
+        return len(header) + sum(len(b) for b in blocks)
+    return len(header) + t.numel() * t.element_size()
+
+
+def create_mieraw(path: PathLike, shape, dtype: torch.dtype, meta: Optional[dict] = None):
+    """Pre-size ``path`` and return a writable ``numpy.memmap`` over its data.
+
+    Wrap it with `memmap_as_tensor` to copy torch data in; call ``flush()``
+    when done. An existing file at ``path`` is replaced.
+    """
+    _check_byteorder()
+    name = _dtype_name(dtype)
+    shape = tuple(int(x) for x in shape)
+    header = _encode_header(shape, name, meta)
+    np_dtype = _DTYPES[name][1]
+    nbytes = _numel(shape) * np.dtype(np_dtype).itemsize
+    with open(path, "wb") as f:
+        f.write(header)
+        f.truncate(len(header) + nbytes)
+    if nbytes == 0:
+        return np.empty(shape, dtype=np_dtype)
+    return np.memmap(str(path), dtype=np_dtype, mode="r+", offset=len(header), shape=shape)
+
+
+def memmap_as_tensor(array, dtype: torch.dtype) -> torch.Tensor:
+    """Torch view over a `create_mieraw` memmap (handles the bfloat16 view)."""
+    t = torch.from_numpy(array)
+    return t.view(torch.bfloat16) if dtype is torch.bfloat16 else t
+
+
+def load_mieraw(
+    path: PathLike,
+    *,
+    mmap: bool = True,
+    start: int = 0,
+    count: Optional[int] = None,
+    stride: int = 1,
+) -> torch.Tensor:
+    """Load a ``.mieraw`` tensor, optionally only frames of the first dim.
+
+    ``start`` / ``count`` / ``stride`` select ``[start : start+count*stride : stride]``
+    along dim 0 (``count=None`` = to the end). With ``mmap=True`` the result
+    is a copy-on-write view over the file, so only the pages actually read
+    become resident; ``mmap=False`` copies just the selected frames out.
+    Encoded files ignore ``mmap`` and decode only the blocks that hold the
+    selected frames.
+    """
+    header = read_header(path)
+    shape = header["shape"]
+    torch_dtype, np_dtype = _DTYPES[header["dtype"]]
+    if header.get("encoding"):
+        return _load_encoded(path, header, frame_slice(shape[0], start, count, stride))
+    if _numel(shape) == 0:
+        full = torch.empty(shape, dtype=torch_dtype)
+        return full[frame_slice(shape[0], start, count, stride)] if shape else full
+    arr = np.memmap(
+        str(path), dtype=np_dtype, mode="c", offset=header["data_offset"], shape=shape
+    )
+    if shape and (start or count is not None or stride != 1):
+        arr = arr[frame_slice(shape[0], start, count, stride)]
+    if not mmap:
+        arr = np.array(arr, copy=True)
+    return memmap_as_tensor(arr, torch_dtype)
+
+
+def _decode_block(f, header: dict, block_idx: int) -> torch.Tensor:
+    enc = header["encoding"]
+    shape = header["shape"]
+    offset, length = enc["blocks"][block_idx]
+    f.seek(header["data_offset"] + offset)
+    raw = _decompress(f.read(length), enc["compression"])
+    stored_torch, stored_np = _DTYPES[enc["stored_dtype"]]
+    first = block_idx * enc["frames_per_block"]
+    frames = min(enc["frames_per_block"], shape[0] - first)
+    arr = np.frombuffer(raw, dtype=stored_np).reshape((frames,) + tuple(shape[1:]))
+    block = memmap_as_tensor(arr.copy(), stored_torch)
+    logical = _DTYPES[header["dtype"]][0]
+    if enc.get("quant_scale"):
+        return block.to(logical) / float(enc["quant_scale"])
+    return block.to(logical)
+
+
+def _load_encoded(path: PathLike, header: dict, sl: slice) -> torch.Tensor:
+    shape = header["shape"]
+    wanted = range(shape[0])[sl]
+    per_block = header["encoding"]["frames_per_block"]
+    out = torch.empty((len(wanted),) + tuple(shape[1:]), dtype=_DTYPES[header["dtype"]][0])
+    decoded_idx, decoded = None, None
+    with open(path, "rb") as f:
+        for i, frame in enumerate(wanted):
+            b = frame // per_block
+            if b != decoded_idx:
+                decoded_idx, decoded = b, _decode_block(f, header, b)
+            out[i] = decoded[frame - b * per_block]
+    return out
+
+
+def iter_tensor_blocks(path: PathLike) -> Iterator[torch.Tensor]:
+    """Yield a tensor file as consecutive dim-0 pieces for streaming copies.
+
+    Raw ``.mieraw`` and ``.pt`` files yield one memory-mapped tensor;
+    encoded ``.mieraw`` files yield one decoded block at a time.
+    """
+    if not is_mieraw(path):
+        yield torch.load(str(path), map_location="cpu", weights_only=False, mmap=True)
+        return
+    header = read_header(path)
+    if not header.get("encoding"):
+        yield load_mieraw(path, mmap=True)
+        return
+    with open(path, "rb") as f:
+        for b in range(len(header["encoding"]["blocks"])):
+            yield _decode_block(f, header, b)
+
+
+def probe_tensor_file(path: PathLike) -> Tuple[tuple, torch.dtype]:
+    """``(shape, dtype)`` of a tensor file without decoding its data."""
+    if is_mieraw(path):
+        header = read_header(path)
+        return header["shape"], _DTYPES[header["dtype"]][0]
+    t = torch.load(str(path), map_location="cpu", weights_only=False, mmap=True)
+    if not isinstance(t, torch.Tensor):
+        raise ValueError(f"{path} is not a torch.Tensor (got {type(t).__name__})")
+    return tuple(t.shape), t.dtype
+
+
+def frame_slice(n_frames: int, start: int = 0, count: Optional[int] = None, stride: int = 1) -> slice:
+    """Dim-0 slice for ``count`` frames every ``stride`` from ``start``
+    (``count=None`` = to the end), clamped to ``n_frames``."""
+    stride = max(1, int(stride))
+    start = max(0, int(start))
+    if count is None:
+        return slice(start, None, stride)
+    return slice(start, min(int(n_frames), start + max(0, int(count)) * stride), stride)
+
+
+def load_tensor_file(path: PathLike, *, mmap: bool = False) -> Any:
+    """Load a ``.mieraw`` or ``torch.save`` file, sniffing the magic bytes.
+
+    ``mmap`` is forwarded to both loaders (``torch.load(mmap=True)`` needs
+    the zip format torch has written by default since 1.6).
+    """
+    if is_mieraw(path):
+        return load_mieraw(path, mmap=mmap)
+    return torch.load(str(path), map_location="cpu", weights_only=False, mmap=mmap)
+
+
+__all__ = [
+    "MIERAW_MAGIC",
+    "MIERAW_SUFFIX",
+    "CODECS",
+    "is_mieraw",
+    "read_header",
+    "save_mieraw",
+    "create_mieraw",
+    "memmap_as_tensor",
+    "load_mieraw",
+    "load_tensor_file",
+    "iter_tensor_blocks",
+    "probe_tensor_file",
+    "frame_slice",
+]
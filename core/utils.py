@@ -2,6 +2,7 @@ import math
 import hashlib
 import datetime
 import json
+import time
 from pathlib import Path
 from PIL import Image
 import base64
@@ -9,6 +10,11 @@ import numpy as np
 import cv2
 import torch
 
+try:
+    import xxhash
+except ImportError:  # optional; blake2b over a few KB is already microseconds
+    xxhash = None
+
 LOGO_SUFFIX = "|Mie"
 LOGO_EMOJI = "🐑"
 
@@ -110,30 +116,131 @@ def image_tensor_to_data_url(image, fmt=".jpg"):
     return "data:image/jpeg;base64," + base64.b64encode(buf.tobytes()).decode("utf-8")
 
 
-def image_tensor_batch_to_data_urls(image, fmt=".jpg"):
+def _as_image_batch(image):
+    """Normalize a ComfyUI IMAGE (H,W,C) / (N,H,W,C) into a 4D batch, or None."""
+    if image is None or not hasattr(image, "ndim"):
+        return None
+    if image.ndim == 3:
+        image = image[None]
+    if image.ndim != 4:
+        return None
+    return image
+
+
+def tensor_fingerprint(t, samples=4096):
+    """Cheap content fingerprint of a tensor / ndarray for `is_changed`.
+
+    Hashes shape + dtype plus at most ``samples`` elements taken at an even
+    stride (rounded up, so the picks span the whole buffer) over the
+    flattened data (first and last element always included), so
+    the cost is independent of tensor size and no image is encoded. Uses
+    xxhash when installed, blake2b otherwise. ``None`` hashes to ``"none"``.
+    """
+    if t is None:
+        return "none"
+    if isinstance(t, torch.Tensor):
+        flat = t.detach().reshape(-1)
+        n = flat.numel()
+        step = max(1, -(-n // max(1, samples)))
+        picked = flat[::step]
+        if n:
+            picked = torch.cat([picked, flat[-1:]])
+        if picked.dtype == torch.bfloat16:  # numpy has no bfloat16
+            picked = picked.view(torch.int16)
+        raw = picked.cpu().contiguous().numpy().tobytes()
+    elif isinstance(t, np.ndarray):
+        flat = t.reshape(-1)
+        n = flat.size
+        step = max(1, -(-n // max(1, samples)))
+        picked = flat[::step]
+        if n:
+            picked = np.concatenate([picked, flat[-1:]])
+        raw = np.ascontiguousarray(picked).tobytes()
+    else:
+        return "none"
+    header = f"{tuple(t.shape)}|{t.dtype}|".encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_128_hexdigest(header + raw)
+    return hashlib.blake2b(header + raw, digest_size=16).hexdigest()
+
+
+class FramePlan:
+    """Sample-before-encode view over a ComfyUI IMAGE batch.
+
+    Frame indices are resolved against the batch length first and only the
+    selected frames are JPEG + base64 encoded, so building a multimodal
+    request costs as many encodes as frames actually sent, not as many as the
+    source video has. Encoded frames are cached per index; overlapping
+    selections on the same plan encode each frame once.
+
+    ``name`` is only used by ``describe`` for per-node timing logs.
+    """
+
+    def __init__(self, image, name="", fmt=".jpg"):
+        self.name = name
+        self.fmt = fmt
+        self._image = _as_image_batch(image)
+        self._cache = {}
+        self.encode_seconds = 0.0
+
+    def __len__(self):
+        return 0 if self._image is None else int(self._image.shape[0])
+
+    def urls(self, indices=None):
+        """Return data URLs for ``indices`` (all frames when None).
+
+        Indices are clamped into range and de-duplicated while preserving
+        order; frames that fail to encode are skipped.
+        """
+        total = len(self)
+        if total == 0:
+            return []
+        if indices is None:
+            indices = range(total)
+        out = []
+        seen = set()
+        for i in indices:
+            i = max(0, min(int(i), total - 1))
+            if i in seen:
+                continue
+            seen.add(i)
+            if i not in self._cache:
+                t0 = time.perf_counter()
+                self._cache[i] = image_tensor_to_data_url(self._image[i], fmt=self.fmt)
+                self.encode_seconds += time.perf_counter() - t0
+            if self._cache[i]:
+                out.append(self._cache[i])
+        return out
+
+    def sample(self, n, sampler):
+        """Encode the frames picked by ``sampler(len(self), n)``."""
+        return self.urls(sampler(len(self), n))
+
+    @property
+    def encoded_frames(self):
+        return sum(1 for u in self._cache.values() if u)
+
+    @property
+    def encoded_bytes(self):
+        return sum(len(u) for u in self._cache.values() if u)
+
+    def describe(self):
+        return (
+            f"{self.name or 'media'}={self.encoded_frames}/{len(self)} frames "
+            f"{self.encoded_bytes / 1024:.1f}KB in {self.encode_seconds * 1000:.1f}ms"
+        )
+
+
+def image_tensor_batch_to_data_urls(image, fmt=".jpg", indices=None):
     """Convert a ComfyUI IMAGE batch (N,H,W,C) into a list of data URLs.
 
     Accepts a single frame (H,W,C), a single-frame batch (1,H,W,C), or a
     full batch (N,H,W,C with N>1). Returns an empty list for None / unknown
-    shapes. Each frame is encoded independently with `image_tensor_to_data_url`.
+    shapes. Pass ``indices`` to encode only those frames (see ``FramePlan``);
+    otherwise every frame is encoded independently with
+    `image_tensor_to_data_url`.
     """
-    if image is None:
-        return []
-    if not hasattr(image, "ndim"):
-        return []
-    if image.ndim == 3:
-        try:
-            image = image.unsqueeze(0)
-        except AttributeError:
-            return [image_tensor_to_data_url(image)] if image is not None else []
-    if image.ndim != 4:
-        return []
-    out = []
-    for i in range(image.shape[0]):
-        url = image_tensor_to_data_url(image[i])
-        if url:
-            out.append(url)
-    return out
+    return FramePlan(image, fmt=fmt).urls(indices)
 
 
 def build_multimodal_user_content(text, image_urls=None, image_detail="auto"):
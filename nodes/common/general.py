@@ -17,8 +17,10 @@ import torch
 import folder_paths
 try:
     from _mienodes_internal.core.utils import mie_log, any_typ, compute_hash, convert_size
+    from _mienodes_internal.core.mieraw import MIERAW_SUFFIX, frame_slice, is_mieraw, load_mieraw, save_mieraw
 except ImportError:
     from ...core.utils import mie_log, any_typ, compute_hash, convert_size
+    from ...core.mieraw import MIERAW_SUFFIX, frame_slice, is_mieraw, load_mieraw, save_mieraw
 
 
 # Empty IMAGE batch used as a safe fallback when LoadImageBatch|Mie
@@ -855,6 +857,8 @@ class SaveImageBatch(object):
     The path is taken as-is (absolute or ComfyUI-CWD relative). Parent directories are created on demand. This is the cache write side used by the SCAIL-2 material-cache loop: the 81-frame SCAIL-2 material batch is the expensive part of the workflow, so we materialise it once and reload it on subsequent runs of the same source video.
 
     .pt is preferred over .mp4 here because the data is exactly the ComfyUI IMAGE tensor (no encode/decode round-trip), the file path is deterministic (VHS auto-numbers by fps/counter), and the on-disk size stays close to N*H*W*3*4 bytes.
+
+    A file_path ending in .mieraw writes the raw header+buffer container (core/mieraw.py) instead of torch.save; LoadImageBatch|Mie memory-maps it rather than unpickling the whole batch.
     """
 
     @classmethod
@@ -882,7 +886,10 @@ class SaveImageBatch(object):
         if parent and not os.path.isdir(parent):
             os.makedirs(parent, exist_ok=True)
         payload = images.detach().to("cpu").contiguous()
-        torch.save(payload, raw)
+        if raw.lower().endswith(MIERAW_SUFFIX):
+            save_mieraw(payload, raw)
+        else:
+            torch.save(payload, raw)
         try:
             size = os.path.getsize(raw)
         except OSError:
@@ -891,15 +898,17 @@ class SaveImageBatch(object):
         return ()
 
 class LoadImageBatch(object):
-    """Inverse of SaveImageBatch|Mie: reload a .pt IMAGE batch.
+    """Inverse of SaveImageBatch|Mie: reload a .pt or .mieraw IMAGE batch.
 
     Designed for a cache gate: when file_path is missing or empty, the node falls back to the optional fallback IMAGE input (typically the freshly-generated material batch). When fallback is also unconnected, an empty batch is returned so the downstream graph still receives a valid IMAGE and can decide what to do.
 
     Wire it after FileExists|Mie only if the consumer needs a separate existence signal -- this node already does the existence check internally, so most call sites do not need an IfElse wrapper.
+
+    start / count / stride select a frame window (count=0 = to the end). The cache is memory-mapped (.mieraw natively, .pt via torch.load(mmap=True)), so a hit only reads the frames in the window and returns a copy of them (no view into the file escapes). The same window is applied to the fallback so HIT and MISS return the same frames.
     """
 
     @classmethod
-    def VALIDATE_INPUTS(s, file_path, fallback=None):
+    def VALIDATE_INPUTS(s, file_path, fallback=None, start=0, count=0, stride=1):
         return True
     @classmethod
     def INPUT_TYPES(cls):
@@ -909,6 +918,9 @@ class LoadImageBatch(object):
             },
             "optional": {
                 "fallback": ("IMAGE",),
+                "start": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFF}),
+                "count": ("INT", {"default": 0, "min": 0, "max": 0xFFFFFFFF}),
+                "stride": ("INT", {"default": 1, "min": 1, "max": 4096}),
             },
         }
 
@@ -917,17 +929,38 @@ class LoadImageBatch(object):
     FUNCTION = "execute"
     CATEGORY = "🐑 MieNodes/🐑 Common"
 
-    def execute(self, file_path, fallback=None):
+    @staticmethod
+    def _load_window(raw, start, count, stride):
+        # The window is copied out of the mapping: a view would keep the file
+        # mapped, and on Windows a later os.replace onto the cache path fails.
+        if is_mieraw(raw):
+            return load_mieraw(raw, mmap=False, start=start, count=count, stride=stride)
+        try:
+            images = torch.load(raw, map_location="cpu", mmap=True)
+        except (RuntimeError, ValueError):
+            # Legacy (pre-zip) torch.save files cannot be memory-mapped.
+            images = torch.load(raw, map_location="cpu")
+        window = images[frame_slice(images.shape[0], start, count, stride)].clone()
+        del images
+        return window
+
+    def execute(self, file_path, fallback=None, start=0, count=0, stride=1):
         raw = str(file_path or "").strip()
+        count = int(count) or None
+        windowed = bool(start) or count is not None or int(stride) != 1
         if raw and os.path.isfile(raw):
             try:
                 size = os.path.getsize(raw)
             except OSError:
                 size = -1
-            mie_log(f"LoadImageBatch|Mie: cache HIT loaded {raw} ({size} bytes)")
-            return (torch.load(raw, map_location="cpu"),)
+            images = self._load_window(raw, start, count, stride)
+            window = f", frames={images.shape[0]} from start={start} stride={stride}" if windowed else ""
+            mie_log(f"LoadImageBatch|Mie: cache HIT loaded {raw} ({size} bytes{window})")
+            return (images,)
         mie_log(f"LoadImageBatch|Mie: cache MISS {raw} -> fallback")
         if fallback is not None:
+            if windowed:
+                return (fallback[frame_slice(fallback.shape[0], start, count, stride)],)
             return (fallback,)
         return (EMPTY_IMAGE_BATCH,)
 
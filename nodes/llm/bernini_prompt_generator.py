@@ -20,15 +20,15 @@ import torch
 
 try:
     from _mienodes_internal.core.utils import (
-        image_tensor_to_data_url,
-        image_tensor_batch_to_data_urls,
+        FramePlan,
+        tensor_fingerprint,
         build_multimodal_user_content,
         mie_log,
     )
 except ImportError:
     from ...core.utils import (
-        image_tensor_to_data_url,
-        image_tensor_batch_to_data_urls,
+        FramePlan,
+        tensor_fingerprint,
         build_multimodal_user_content,
         mie_log,
     )
@@ -79,6 +79,13 @@ MY_CATEGORY = "\ud83d\udc11 MieNodes/\ud83d\udc11 Prompt Generator"
 # Matches the upstream default.
 DEFAULT_VIDEO_FRAMES = 3
 
+# Which media each task routes into the request. Used to resolve frame
+# indices before any JPEG encode happens (see ``FramePlan``).
+TEXT_ONLY_TASKS = frozenset({"t2v", "t2i"})
+IMAGE_SOURCE_TASKS = frozenset({"i2i", "i2v", "ri2i"})
+VIDEO_SOURCE_TASKS = frozenset({"v2v", "mv2v", "ads2v", "vi2v", "rv2v", "vrc2v"})
+REFERENCE_VIDEO_TASKS = frozenset({"ads2v", "rv2v", "vrc2v"})
+
 
 # --------------------------------------------------------------------------- #
 # Response parsing
@@ -119,19 +126,6 @@ def _extract_json_text(text):
 # --------------------------------------------------------------------------- #
 # Media adapters (ComfyUI IMAGE tensor <-> OpenAI image_url content part)
 # --------------------------------------------------------------------------- #
-def _tensor_to_url(t):
-    """Convert a single ComfyUI IMAGE tensor (H,W,C) into a data URL, or None."""
-    if t is None:
-        return None
-    if not isinstance(t, torch.Tensor):
-        return None
-    if t.ndim == 4:
-        t = t[0]
-    if t.ndim != 3:
-        return None
-    return image_tensor_to_data_url(t)
-
-
 def _sample_indices(total, n):
     """Uniformly sample ``n`` indices in [0, total) preserving endpoints."""
     if total <= 0 or n <= 0:
@@ -143,19 +137,6 @@ def _sample_indices(total, n):
     return [round(i * (total - 1) / (n - 1)) for i in range(n)]
 
 
-def _sample_urls(urls, n):
-    if not urls or n <= 0:
-        return []
-    idx = _sample_indices(len(urls), n)
-    idx = [max(0, min(i, len(urls) - 1)) for i in idx]
-    seen, out = set(), []
-    for i in idx:
-        if i not in seen:
-            seen.add(i)
-            out.append(urls[i])
-    return out
-
-
 def _build_messages(system_prompt, user_text, image_urls, image_detail="auto"):
     """Build chat messages with one system turn and one mixed-content user turn.
 
@@ -325,16 +306,14 @@ class BerniniPromptEnhancer:
 
         code = parse_task_code(task_type)
 
-        # Convert both IMAGE tensors to data URLs up front.
-        # `image_tensor_batch_to_data_urls` handles 3D (HWC) and 4D
-        # (NHWC) tensors uniformly; an empty / None tensor yields [].
-        source_urls = image_tensor_batch_to_data_urls(source)
-        ref_img_urls = image_tensor_batch_to_data_urls(reference_images)
-        ref_vid_urls = image_tensor_batch_to_data_urls(reference_video)
-        # 0 (or negative) keeps the legacy "all frames" behavior.
-        # 1-16 uniformly samples endpoints via _sample_urls.
-        if self.reference_video_frames:
-            ref_vid_urls = _sample_urls(ref_vid_urls, self.reference_video_frames)
+        # Resolve which frames the task actually consumes before encoding
+        # anything: `FramePlan` only JPEG/base64-encodes the selected
+        # frames, so an 81-frame drive video sampled to 3 costs 3 encodes.
+        # It handles 3D (HWC) and 4D (NHWC) tensors uniformly; an empty /
+        # None tensor yields [].
+        source_plan = FramePlan(source, name="source")
+        ref_img_plan = FramePlan(reference_images, name="ref_img")
+        ref_vid_plan = FramePlan(reference_video, name="ref_vid")
 
         summary = {
             "source": _image_tensor_summary(source),
@@ -350,21 +329,41 @@ class BerniniPromptEnhancer:
             f"source={summary['source']} ref_img={summary['ref_img']} ref_vid={summary['ref_vid']}"
         )
 
-        # For video-source tasks the routing branches below will use
-        # `frame_urls` (sampled from source_urls). For image-source
-        # tasks the routing branches use source_urls[:1] directly and
-        # ignore `frame_urls`.
-        frame_urls = _sample_urls(source_urls, self.video_frames)
+        # Image-source tasks read source[0] (ri2i forwards the whole
+        # source batch); video-source tasks read `frame_urls`, sampled
+        # from source by index. Pure text tasks encode nothing.
+        if code == "ri2i":
+            source_urls = source_plan.urls()
+        elif code in IMAGE_SOURCE_TASKS:
+            source_urls = source_plan.urls([0])
+        else:
+            source_urls = []
+        if code in VIDEO_SOURCE_TASKS:
+            frame_urls = source_plan.sample(self.video_frames, _sample_indices)
+        else:
+            frame_urls = []
+        ref_img_urls = ref_img_plan.urls() if code not in TEXT_ONLY_TASKS else []
+        if code in REFERENCE_VIDEO_TASKS:
+            # 0 (or negative) keeps the legacy "all frames" behavior.
+            # 1-16 uniformly samples endpoints via _sample_indices.
+            if self.reference_video_frames:
+                ref_vid_urls = ref_vid_plan.sample(self.reference_video_frames, _sample_indices)
+            else:
+                ref_vid_urls = ref_vid_plan.urls()
+        else:
+            ref_vid_urls = []
 
         total_img_bytes = (
             _url_bytes(source_urls) + _url_bytes(ref_img_urls) + _url_bytes(ref_vid_urls)
+            + _url_bytes(frame_urls)
         )
         mie_log(
             f"Bernini: built request: source_urls={len(source_urls)} source_kb={_url_bytes(source_urls) / 1024:.1f} "
             f"ref_img_urls={len(ref_img_urls)} ref_img_kb={_url_bytes(ref_img_urls) / 1024:.1f} "
             f"ref_vid_urls={len(ref_vid_urls)} ref_vid_kb={_url_bytes(ref_vid_urls) / 1024:.1f} "
             f"frame_urls={len(frame_urls)} frame_kb={_url_bytes(frame_urls) / 1024:.1f} "
-            f"total_img_kb={total_img_bytes / 1024:.1f}"
+            f"total_img_kb={total_img_bytes / 1024:.1f} "
+            f"encode: {source_plan.describe()} {ref_img_plan.describe()} {ref_vid_plan.describe()}"
         )
 
         # Strip the " - 中文" display suffix to get the short code used
@@ -616,9 +615,8 @@ class BerniniPromptGenerator:
             h.update(str(llm_service_connector.api_url).encode("utf-8"))
             h.update(str(llm_service_connector.api_token).encode("utf-8"))
             h.update(str(llm_service_connector.model).encode("utf-8"))
-        # A short signature of the media inputs is enough to detect change;
-        # the full data URL is large and changes the hash too aggressively.
+        # Strided-sample fingerprint: microseconds, no JPEG encode, and
+        # unlike a data-URL prefix it actually sees pixel changes.
         for src in (source, reference_images, reference_video):
-            url = _tensor_to_url(src) or ""
-            h.update(url[:64].encode("utf-8"))
+            h.update(tensor_fingerprint(src).encode("utf-8"))
         return h.hexdigest()
@@ -35,15 +35,17 @@ except ImportError:
 
 try:
     from _mienodes_internal.core.utils import (
+        FramePlan,
         build_multimodal_user_content,
-        image_tensor_batch_to_data_urls,
         mie_log,
+        tensor_fingerprint,
     )
 except ImportError:
     from ...core.utils import (
+        FramePlan,
         build_multimodal_user_content,
-        image_tensor_batch_to_data_urls,
         mie_log,
+        tensor_fingerprint,
     )
 
 MY_CATEGORY = "🐑 MieNodes/🐑 Prompt Generator"
@@ -84,15 +86,19 @@ def get_all_custom_system_prompts() -> dict:
     return result
 
 
-def _sample_urls(urls, n):
-    """Uniformly sample n items preserving endpoints.
+def _sample_indices(total, n):
+    """Uniformly sample n indices in [0, total) preserving endpoints.
 
-    n <= 0 (or fewer urls than n) -> passthrough all. Used so
+    n <= 0 (or fewer frames than n) -> every index. Used so
     reference_video_frames == 0 means "forward all" (legacy Bernini behavior).
     """
-    if not urls or n <= 0 or len(urls) <= n:
-        return list(urls or [])
-    return [urls[round(i * (len(urls) - 1) / (n - 1))] for i in range(n)]
+    if total <= 0:
+        return []
+    if n <= 0 or total <= n:
+        return list(range(total))
+    if n == 1:
+        return [total // 2]
+    return [round(i * (total - 1) / (n - 1)) for i in range(n)]
 
 
 def _collect_media_urls(source, reference_images, reference_video, video_frames, reference_video_frames):
@@ -103,16 +109,20 @@ def _collect_media_urls(source, reference_images, reference_video, video_frames,
       - reference_images: forwarded in full.
       - reference_video: ``reference_video_frames`` == 0 forwards all;
         1..16 uniformly samples that many frames.
+
+    Indices are sampled before encoding (``FramePlan``), so only the frames
+    actually sent pay a JPEG encode.
     """
+    plans = [
+        (FramePlan(source, name="source"), max(1, int(video_frames))),
+        (FramePlan(reference_images, name="ref_img"), 0),
+        (FramePlan(reference_video, name="ref_vid"), int(reference_video_frames)),
+    ]
     urls = []
-    if source is not None:
-        urls.extend(_sample_urls(image_tensor_batch_to_data_urls(source), video_frames))
-    if reference_images is not None:
-        urls.extend(image_tensor_batch_to_data_urls(reference_images))
-    if reference_video is not None:
-        urls.extend(_sample_urls(
-            image_tensor_batch_to_data_urls(reference_video), reference_video_frames
-        ))
+    for plan, n in plans:
+        urls.extend(plan.sample(n, _sample_indices))
+    if any(len(plan) for plan, _ in plans):
+        mie_log("CustomSystemPrompt media encode: " + " ".join(plan.describe() for plan, _ in plans))
     return urls
 
 
@@ -260,8 +270,7 @@ class CustomSystemPromptGenerator(object):
         hasher.update(str(temperature).encode("utf-8"))
         hasher.update(str(max_tokens).encode("utf-8"))
         for tensor in (source, reference_images, reference_video):
-            urls = image_tensor_batch_to_data_urls(tensor)
-            hasher.update("".join(u[:64] for u in urls).encode("utf-8"))
+            hasher.update(tensor_fingerprint(tensor).encode("utf-8"))
         try:
             hasher.update(llm_service_connector.get_state().encode("utf-8"))
         except AttributeError:
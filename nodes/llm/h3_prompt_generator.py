@@ -28,19 +28,22 @@ from typing import Any, Optional
 
 try:
     from _mienodes_internal.core.utils import (
-        image_tensor_batch_to_data_urls,
+        FramePlan,
         mie_log,
+        tensor_fingerprint,
     )
 except ImportError:
     try:
         from ...core.utils import (
-            image_tensor_batch_to_data_urls,
+            FramePlan,
             mie_log,
+            tensor_fingerprint,
         )
     except ImportError:
         from core.utils import (
-            image_tensor_batch_to_data_urls,
+            FramePlan,
             mie_log,
+            tensor_fingerprint,
         )
 
 try:
@@ -188,7 +191,7 @@ def _default_idea(task_code: str, category: str) -> str:
 
 
 # --------------------------------------------------------------------------- #
-# Frame sampling (mirrors scail2_prompt_generator._sample_indices / _sample_urls)
+# Frame sampling (mirrors scail2_prompt_generator._sample_indices)
 # --------------------------------------------------------------------------- #
 def _sample_indices(total: int, n: int) -> list[int]:
     """Return ``n`` unique indices in ``[0, total)`` sampled as evenly as possible.
@@ -209,21 +212,6 @@ def _sample_indices(total: int, n: int) -> list[int]:
     return [round(i * (total - 1) / (n - 1)) for i in range(n)]
 
 
-def _sample_urls(urls: list[str], n: int) -> list[str]:
-    """Apply ``_sample_indices`` to a list of URLs, preserving order and
-    dropping duplicate indices (can happen at the endpoints)."""
-    if not urls:
-        return []
-    idx = _sample_indices(len(urls), n)
-    seen: set[int] = set()
-    out: list[str] = []
-    for i in idx:
-        if i not in seen:
-            seen.add(i)
-            out.append(urls[i])
-    return out
-
-
 # --------------------------------------------------------------------------- #
 # Enhancer
 # --------------------------------------------------------------------------- #
@@ -512,7 +500,7 @@ class H3PromptEnhancer:
                 f"(single stage, no media)"
             )
         elif code == "i2v_first":
-            ref_urls = image_tensor_batch_to_data_urls(first_frame)
+            ref_urls = FramePlan(first_frame, name="first").urls()
             if not ref_urls:
                 mie_log("H3: i2v_first requires first_frame; returning original")
                 return user_prompt
@@ -523,8 +511,8 @@ class H3PromptEnhancer:
                 f"temperature={self.temperature} (single stage)"
             )
         elif code == "i2v_first_last":
-            first_urls = image_tensor_batch_to_data_urls(first_frame)
-            last_urls = image_tensor_batch_to_data_urls(last_frame)
+            first_urls = FramePlan(first_frame, name="first").urls()
+            last_urls = FramePlan(last_frame, name="last").urls()
             if not first_urls or not last_urls:
                 mie_log(
                     "H3: i2v_first_last requires both first_frame and last_frame; returning original"
@@ -538,7 +526,7 @@ class H3PromptEnhancer:
                 f"temperature={self.temperature} (single stage)"
             )
         elif code == "i2v_last":
-            ref_urls = image_tensor_batch_to_data_urls(last_frame)
+            ref_urls = FramePlan(last_frame, name="last").urls()
             if not ref_urls:
                 mie_log("H3: i2v_last requires last_frame; returning original")
                 return user_prompt
@@ -549,14 +537,17 @@ class H3PromptEnhancer:
                 f"temperature={self.temperature} (single stage)"
             )
         elif code == "reference":
-            ref_img_urls = image_tensor_batch_to_data_urls(reference_images)
-            ref_vid_urls = image_tensor_batch_to_data_urls(reference_video)
-            if not ref_img_urls and not ref_vid_urls:
+            # Sample reference-video indices before encoding so only the
+            # ``caption_sample_frames`` frames sent to stage 1 are encoded.
+            ref_img_plan = FramePlan(reference_images, name="ref_img")
+            ref_vid_plan = FramePlan(reference_video, name="ref_vid")
+            ref_img_urls = ref_img_plan.urls()
+            frame_urls = ref_vid_plan.sample(self.caption_sample_frames, _sample_indices)
+            if not ref_img_urls and not frame_urls:
                 mie_log(
                     "H3: reference requires reference_images and/or reference_video; returning original"
                 )
                 return user_prompt
-            frame_urls = _sample_urls(ref_vid_urls, self.caption_sample_frames) if ref_vid_urls else []
             # Images anchor identity/wardrobe; sampled video frames anchor
             # motion/structure. Feed both to the captioner in connection
             # order (images first, then sampled frames).
@@ -564,10 +555,10 @@ class H3PromptEnhancer:
             ref_urls = ref_img_urls if ref_img_urls else frame_urls
             mie_log(
                 f"H3: task=reference ref_imgs={len(ref_img_urls)} "
-                f"ref_vid_frames={len(ref_vid_urls)}->{len(frame_urls)} "
+                f"ref_vid_frames={len(ref_vid_plan)}->{len(frame_urls)} "
                 f"detail={self.image_detail} duration={duration}s ratio={aspect_ratio} "
                 f"cat={parse_category(category) or 'none'} temperature={self.temperature} "
-                f"(two stage)"
+                f"(two stage) encode: {ref_img_plan.describe()} {ref_vid_plan.describe()}"
             )
             caption = self._caption(caption_input_urls, user_prompt, seed=seed)
             if not caption:
@@ -576,7 +567,7 @@ class H3PromptEnhancer:
                 )
                 return user_prompt
         elif code == "s2v":
-            ref_urls = image_tensor_batch_to_data_urls(reference_images)
+            ref_urls = FramePlan(reference_images, name="ref_img").urls()
             if not ref_urls:
                 mie_log("H3: s2v requires reference_images; returning original")
                 return user_prompt
@@ -866,16 +857,8 @@ class MiniMaxH3PromptGenerator:
             h.update(str(getattr(llm_service_connector, "api_url", "")).encode("utf-8"))
             h.update(str(getattr(llm_service_connector, "api_token", "")).encode("utf-8"))
             h.update(str(getattr(llm_service_connector, "model", "")).encode("utf-8"))
-        # Cheap media signature: just the tensor shape, not the full
-        # pixel data. Matches SCAIL-2's strategy so a tweak that changes
-        # frame count or resolution triggers a re-run.
+        # Strided-sample fingerprint of the pixel data (shape + dtype
+        # included), so swapping a frame re-runs even at equal shape.
         for t in (first_frame, last_frame, reference_images, reference_video):
-            if t is None:
-                h.update(b"none")
-            else:
-                try:
-                    shape = list(t.shape)
-                except AttributeError:
-                    shape = []
-                h.update(repr(shape).encode("utf-8"))
+            h.update(tensor_fingerprint(t).encode("utf-8"))
         return h.hexdigest()
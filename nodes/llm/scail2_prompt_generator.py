@@ -16,19 +16,22 @@ from typing import Any, Optional
 
 try:
     from _mienodes_internal.core.utils import (
-        image_tensor_batch_to_data_urls,
+        FramePlan,
         mie_log,
+        tensor_fingerprint,
     )
 except ImportError:
     try:
         from ...core.utils import (
-            image_tensor_batch_to_data_urls,
+            FramePlan,
             mie_log,
+            tensor_fingerprint,
         )
     except ImportError:
         from core.utils import (
-            image_tensor_batch_to_data_urls,
+            FramePlan,
             mie_log,
+            tensor_fingerprint,
         )
 
 try:
@@ -85,7 +88,7 @@ MIN_NUM_FRAMES = 1
 MAX_NUM_FRAMES = 16
 
 # --------------------------------------------------------------------------- #
-# Frame sampling (mirrors bernini_prompt_generator._sample_indices / _sample_urls)
+# Frame sampling (mirrors bernini_prompt_generator._sample_indices)
 # --------------------------------------------------------------------------- #
 def _sample_indices(total: int, n: int) -> list[int]:
     """Return ``n`` unique indices in ``[0, total)`` sampled as evenly as possible.
@@ -106,21 +109,6 @@ def _sample_indices(total: int, n: int) -> list[int]:
     return [round(i * (total - 1) / (n - 1)) for i in range(n)]
 
 
-def _sample_urls(urls: list[str], n: int) -> list[str]:
-    """Apply ``_sample_indices`` to a list of URLs, preserving order and
-    dropping duplicate indices (can happen at the endpoints)."""
-    if not urls:
-        return []
-    idx = _sample_indices(len(urls), n)
-    seen: set[int] = set()
-    out: list[str] = []
-    for i in idx:
-        if i not in seen:
-            seen.add(i)
-            out.append(urls[i])
-    return out
-
-
 # --------------------------------------------------------------------------- #
 # Enhancer
 # --------------------------------------------------------------------------- #
@@ -340,20 +328,24 @@ class Scail2PromptEnhancer:
                 return user_prompt
 
         # Both tasks need a driving video + at least one reference image.
-        driving_urls = image_tensor_batch_to_data_urls(driving_video)
-        ref_urls = image_tensor_batch_to_data_urls(reference_images)
-        if not driving_urls:
+        # Sample driving-video indices before encoding so only the
+        # ``num_frames`` frames sent to stage 1 pay a JPEG encode.
+        driving_plan = FramePlan(driving_video, name="driving")
+        ref_plan = FramePlan(reference_images, name="ref")
+        if not driving_plan:
             mie_log(f"Scail2: no driving_video frames provided (task={code}); returning original")
             return user_prompt
-        if not ref_urls:
+        if not ref_plan:
             mie_log(f"Scail2: no reference images provided (task={code}); returning original")
             return user_prompt
 
-        frame_urls = _sample_urls(driving_urls, self.num_frames)
+        frame_urls = driving_plan.sample(self.num_frames, _sample_indices)
+        ref_urls = ref_plan.urls()
         mie_log(
-            f"Scail2: task={code} driving_frames={len(driving_urls)}->{len(frame_urls)} "
+            f"Scail2: task={code} driving_frames={len(driving_plan)}->{len(frame_urls)} "
             f"ref_imgs={len(ref_urls)} detail={self.image_detail} "
-            f"temperature={self.temperature}"
+            f"temperature={self.temperature} "
+            f"encode: {driving_plan.describe()} {ref_plan.describe()}"
         )
 
         caption = self._caption(code, frame_urls, user_prompt or "", seed=seed)
@@ -517,16 +509,8 @@ class Scail2PromptGenerator:
             h.update(str(getattr(llm_service_connector, "api_url", "")).encode("utf-8"))
             h.update(str(getattr(llm_service_connector, "api_token", "")).encode("utf-8"))
             h.update(str(getattr(llm_service_connector, "model", "")).encode("utf-8"))
-        # Cheap media signature: just the tensor shape, not the full
-        # pixel data. Matches Bernini's strategy so a tweak that
-        # changes frame count or resolution triggers a re-run.
+        # Strided-sample fingerprint of the pixel data (shape + dtype
+        # included), so swapping a frame re-runs even at equal shape.
         for t in (driving_video, reference_images):
-            if t is None:
-                h.update(b"none")
-            else:
-                try:
-                    shape = list(t.shape)
-                except AttributeError:
-                    shape = []
-                h.update(repr(shape).encode("utf-8"))
+            h.update(tensor_fingerprint(t).encode("utf-8"))
         return h.hexdigest()
@@ -1,9 +1,16 @@
 import copy
+import csv
 import gc
+import hashlib
+import heapq
+import itertools
 import json
 import math
 import os
+import queue
+import sys
 import tempfile
+import threading
 import time
 import uuid
 from typing import Any
@@ -22,8 +29,19 @@ except ImportError:
 # Re-imported under the legacy private name to keep call sites unchanged.
 try:
     from ...core.chunked_merge import chunked_disk_merge as _chunked_disk_merge
+    from ...core.chunked_merge import preallocated_audio_merge as _preallocated_audio_merge
 except Exception:
     from core.chunked_merge import chunked_disk_merge as _chunked_disk_merge
+    from core.chunked_merge import preallocated_audio_merge as _preallocated_audio_merge
+
+try:
+    from ...core.mieraw import (
+        MIERAW_SUFFIX, is_mieraw, load_mieraw, load_tensor_file, read_header, save_mieraw,
+    )
+except Exception:
+    from core.mieraw import (
+        MIERAW_SUFFIX, is_mieraw, load_mieraw, load_tensor_file, read_header, save_mieraw,
+    )
 
 try:
     from comfy_execution.graph_utils import GraphBuilder
@@ -33,6 +51,11 @@ except Exception:
     except Exception:
         GraphBuilder = None
 
+try:
+    import comfy.model_management as _comfy_model_management
+except Exception:
+    _comfy_model_management = None
+
 MY_CATEGORY = "🐑 MieNodes/🐑 Loop"
 EMPTY_IMAGE = torch.zeros((1, 1, 1, 3), dtype=torch.float32)
 EMPTY_IMAGES = torch.zeros((0, 1, 1, 3), dtype=torch.float32)
@@ -49,6 +72,14 @@ RUNTIME_STORE = {
     },
     "meta": {},
     "_detect_cache": {},
+    "_node_index_cache": {},
+    "_expand_template_cache": {},
+    "_ctx_snapshots": {},
+    "offload_writers": {},
+    "resident_index": {},
+    "loop_metrics": {},
+    "ref_owners": {},
+    "ref_orphans": [],
 }
 _MAX_RUNTIME_STORE_AGE = 3600  # seconds = 1 hour
 _runtime_store_timestamps = {}
@@ -142,7 +173,16 @@ def _parse_json_params_list(json_list):
     return parsed
 
 
-def _parse_int_range(start, end, step):
+# Computed parameter sources. Range / decrement modes (and file-backed
+# params) are kept in loop_ctx["params_source"] as a compact descriptor
+# instead of a materialized params_list; `_loop_params_at` resolves the one
+# item a round needs, so the ctx (and every resume snapshot / copy of it)
+# stays O(1) whatever the count. The `_parse_*` helpers below materialize
+# the same descriptors, so both paths produce identical values.
+_PARAMS_FILE_FORMATS = {".jsonl": "jsonl", ".ndjson": "jsonl", ".csv": "csv"}
+
+
+def _int_range_source(start, end, step):
     start = int(start)
     end = int(end)
     step = int(step)
@@ -150,7 +190,16 @@ def _parse_int_range(start, end, step):
         raise ValueError("int_range_step must be > 0")
     if end < start:
         raise ValueError("int_range_end must be >= int_range_start")
-    return [{"value": x} for x in range(start, end, step)]
+    return {
+        "kind": "int_range",
+        "start": start,
+        "step": step,
+        "count": len(range(start, end, step)),
+    }
+
+
+def _parse_int_range(start, end, step):
+    return _materialize_params_source(_int_range_source(start, end, step))
 
 
 def _normalize_float_value(value):
@@ -160,7 +209,7 @@ def _normalize_float_value(value):
     return rounded
 
 
-def _parse_float_range(start, end, step):
+def _float_range_source(start, end, step):
     start = float(start)
     end = float(end)
     step = float(step)
@@ -172,43 +221,40 @@ def _parse_float_range(start, end, step):
         raise ValueError("float_range_end must be >= float_range_start")
     eps = max(abs(step) * 1e-9, 1e-12)
     count = int(math.floor(((end - start) / step) + eps))
-    values = []
-    for idx in range(count):
-        current = start + step * idx
-        if current >= end - eps:
-            break
-        values.append({"value": _normalize_float_value(current)})
-    return values
+    # start + step * idx only grows with idx, so the values that reach
+    # end - eps form a tail; drop it.
+    while count > 0 and start + step * (count - 1) >= end - eps:
+        count -= 1
+    return {"kind": "float_range", "start": start, "step": step, "count": count}
 
 
-def _parse_int_decrement(total, step):
-    """Drain ``total`` in fixed ``step`` chunks: total=5, step=2 -> [2, 2, 1].
+def _parse_float_range(start, end, step):
+    return _materialize_params_source(_float_range_source(start, end, step))
 
-    Mirrors the spec from the user: each round subtracts a fixed value from
-    the remaining balance until nothing is left. The number of rounds is
-    ``ceil(total / step)``; the last round may be smaller than ``step`` if
-    the total does not divide evenly.
-    """
+
+def _int_decrement_source(total, step):
     total = int(total)
     step = int(step)
     if total < 0:
         raise ValueError("int_decrement_total must be >= 0")
     if step <= 0:
         raise ValueError("int_decrement_step must be > 0")
-    if total == 0:
-        return []
     n = (total + step - 1) // step  # ceil division
-    return [{"value": step} for _ in range(n - 1)] + [
-        {"value": total - step * (n - 1)}
-    ]
+    return {"kind": "int_decrement", "total": total, "step": step, "count": n}
 
 
-def _parse_float_decrement(total, step):
-    """Float counterpart of :func:`_parse_int_decrement`.
+def _parse_int_decrement(total, step):
+    """Drain ``total`` in fixed ``step`` chunks: total=5, step=2 -> [2, 2, 1].
 
-    total=5.0, step=2.0 -> [2.0, 2.0, 1.0]
-    total=1.0, step=0.4 -> [0.4, 0.4, 0.2]
+    Mirrors the spec from the user: each round subtracts a fixed value from
+    the remaining balance until nothing is left. The number of rounds is
+    ``ceil(total / step)``; the last round may be smaller than ``step`` if
+    the total does not divide evenly.
     """
+    return _materialize_params_source(_int_decrement_source(total, step))
+
+
+def _float_decrement_source(total, step):
     total = float(total)
     step = float(step)
     if not math.isfinite(total) or not math.isfinite(step):
@@ -217,16 +263,234 @@ def _parse_float_decrement(total, step):
         raise ValueError("float_decrement_total must be >= 0")
     if step <= 0:
         raise ValueError("float_decrement_step must be > 0")
-    if total == 0:
-        return []
-    n = int(math.ceil(total / step))
-    # last value is whatever balance remains after (n-1) full steps
-    last = total - step * (n - 1)
-    # guard against floating-point drift pushing the last value negative
-    if last < 0:
-        last = 0.0
-    values = [_normalize_float_value(step)] * (n - 1) + [_normalize_float_value(last)]
-    return [{"value": v} for v in values]
+    n = int(math.ceil(total / step)) if total > 0 else 0
+    return {"kind": "float_decrement", "total": total, "step": step, "count": n}
+
+
+def _parse_float_decrement(total, step):
+    """Float counterpart of :func:`_parse_int_decrement`.
+
+    total=5.0, step=2.0 -> [2.0, 2.0, 1.0]
+    total=1.0, step=0.4 -> [0.4, 0.4, 0.2]
+    """
+    return _materialize_params_source(_float_decrement_source(total, step))
+
+
+def _decode_params_line(raw, first):
+    # utf-8-sig strips a BOM on the first line only.
+    return raw.decode("utf-8-sig" if first else "utf-8")
+
+
+def _params_file_value(value, param_type, where):
+    """One file row -> a params item, cast like the matching list mode."""
+    if param_type == "json":
+        if not isinstance(value, dict):
+            raise ValueError(f"params_file {where}: json rows must be objects")
+        return value
+    if isinstance(value, dict):
+        if "value" not in value:
+            raise ValueError(f"params_file {where}: missing 'value' column")
+        value = value["value"]
+    try:
+        if param_type == "int":
+            if isinstance(value, bool) or isinstance(value, float):
+                raise ValueError(value)
+            return {"value": int(str(value).strip())}
+        if param_type == "float":
+            if isinstance(value, bool):
+                raise ValueError(value)
+            return {"value": float(value)}
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"params_file {where}: invalid {param_type} value {value!r}"
+        ) from e
+    return {"value": value if isinstance(value, str) else json.dumps(value)}
+
+
+def _iter_params_file_records(f, fmt, fields=None):
+    """Yield ``(offset, where, record)`` for every non-blank row from ``f``'s
+    position; ``record`` is the parsed JSON value or the CSV row list."""
+    first_pos = f.tell()
+    if fmt == "jsonl":
+        pos = first_pos
+        for lineno, raw in enumerate(f, 1):
+            text = _decode_params_line(raw, pos == 0).strip()
+            if text:
+                try:
+                    record = json.loads(text)
+                except ValueError as e:
+                    raise ValueError(f"params_file line {lineno} is invalid JSON: {e}") from e
+                yield pos, f"line {lineno}", record
+            pos += len(raw)
+        return
+    line_starts = []
+
+    def lines():
+        pos = first_pos
+        for raw in f:
+            line_starts.append(pos)
+            yield _decode_params_line(raw, pos == 0)
+            pos += len(raw)
+
+    reader = csv.reader(lines())
+    while True:
+        consumed = len(line_starts)
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            raise ValueError(f"params_file row {reader.line_num} is invalid CSV: {e}") from e
+        if row:
+            yield line_starts[consumed], f"row {reader.line_num}", row
+
+
+def _params_file_row(record, fmt, fields, param_type, where):
+    if fmt == "csv":
+        if len(record) != len(fields):
+            raise ValueError(
+                f"params_file {where}: expected {len(fields)} columns, got {len(record)}"
+            )
+        record = dict(zip(fields, record))
+    return _params_file_value(record, param_type, where)
+
+
+def _params_file_source(params_file, param_type):
+    """Scan a JSONL / CSV params file once. Returns ``(source, offsets)``.
+
+    Every row is validated here so a bad row fails at MieLoopStart rather
+    than deep into a long run; ``offsets`` (the byte offset of each row) are
+    kept in the run's runtime meta, not in the ctx. JSONL rows are JSON
+    objects (json type) or scalars / ``{"value": ...}`` objects; CSV needs a
+    header row and, for int / float / string, a ``value`` column.
+    """
+    raw_path = str(params_file or "").strip()
+    if raw_path == "":
+        raise ValueError("params_file is required when param_mode is file")
+    path = os.path.abspath(os.path.expanduser(raw_path))
+    fmt = _PARAMS_FILE_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError("params_file must be a .jsonl / .ndjson or .csv file")
+    if not os.path.isfile(path):
+        raise ValueError(f"params_file not found: {path}")
+    st = os.stat(path)
+    fields = None
+    offsets = []
+    with open(path, "rb") as f:
+        for offset, where, record in _iter_params_file_records(f, fmt):
+            if fmt == "csv" and fields is None:
+                fields = [x.strip() for x in record]
+                continue
+            _params_file_row(record, fmt, fields, param_type, where)
+            offsets.append(offset)
+    source = {
+        "kind": "file",
+        "path": path,
+        "format": fmt,
+        "param_type": param_type,
+        "count": len(offsets),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+    }
+    if fields is not None:
+        source["fields"] = fields
+    return source, offsets
+
+
+def _params_file_item(source, index, offsets):
+    path = source["path"]
+    try:
+        st = os.stat(path)
+    except OSError as e:
+        raise ValueError(f"params_file is gone: {path}") from e
+    if st.st_size != source["size"] or st.st_mtime_ns != source["mtime_ns"]:
+        raise ValueError(f"params_file changed since MieLoopStart: {path}")
+    with open(path, "rb") as f:
+        f.seek(offsets[index])
+        for _offset, where, record in _iter_params_file_records(f, source["format"]):
+            return _params_file_row(
+                record, source["format"], source.get("fields"), source["param_type"], where
+            )
+    raise ValueError(f"params_file row {index} not found: {path}")
+
+
+def _params_file_offsets(source, run_id):
+    """Row offsets for a file source, from the run's runtime meta; rescanned
+    after a server restart, a prune or a ctx resumed from JSON."""
+    run_meta = _ensure_runtime_meta(run_id)
+    cached = run_meta.get("params_offsets")
+    if (
+        isinstance(cached, dict)
+        and cached.get("path") == source["path"]
+        and cached.get("mtime_ns") == source["mtime_ns"]
+        and len(cached.get("offsets", ())) == source["count"]
+    ):
+        return cached["offsets"]
+    fresh, offsets = _params_file_source(source["path"], source["param_type"])
+    if fresh["count"] != source["count"]:
+        raise ValueError(f"params_file changed since MieLoopStart: {source['path']}")
+    run_meta["params_offsets"] = {
+        "path": source["path"],
+        "mtime_ns": source["mtime_ns"],
+        "offsets": offsets,
+    }
+    return offsets
+
+
+def _params_source_count(source):
+    if not isinstance(source, dict):
+        raise ValueError("loop_ctx.params_source must be an object")
+    if source.get("kind") not in {"int_range", "float_range", "int_decrement", "float_decrement", "file"}:
+        raise ValueError(f"loop_ctx.params_source has unknown kind: {source.get('kind')}")
+    count = source.get("count")
+    if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+        raise ValueError("loop_ctx.params_source.count must be an integer >= 0")
+    return count
+
+
+def _params_source_item(source, index, file_offsets=None):
+    """Item ``index`` of a computed source (``file_offsets`` for kind=file)."""
+    kind = source["kind"]
+    count = source["count"]
+    if index < 0 or index >= count:
+        raise ValueError(f"params index {index} out of range for count={count}")
+    if kind == "int_range":
+        return {"value": source["start"] + source["step"] * index}
+    if kind == "float_range":
+        return {"value": _normalize_float_value(source["start"] + source["step"] * index)}
+    if kind == "int_decrement":
+        if index < count - 1:
+            return {"value": source["step"]}
+        return {"value": source["total"] - source["step"] * (count - 1)}
+    if kind == "float_decrement":
+        if index < count - 1:
+            return {"value": _normalize_float_value(source["step"])}
+        # last value is whatever balance remains after (n-1) full steps;
+        # guard against floating-point drift pushing it negative
+        last = source["total"] - source["step"] * (count - 1)
+        return {"value": _normalize_float_value(max(last, 0.0))}
+    return _params_file_item(source, index, file_offsets)
+
+
+def _materialize_params_source(source, file_offsets=None):
+    return [
+        _params_source_item(source, idx, file_offsets)
+        for idx in range(source["count"])
+    ]
+
+
+def _loop_params_at(ctx, index):
+    """``current_params`` for round ``index``: from ``params_source`` when the
+    ctx has one, else from the materialized ``params_list``."""
+    source = ctx.get("params_source")
+    if source is None:
+        return ctx["params_list"][index]
+    offsets = None
+    if source["kind"] == "file":
+        offsets = _params_file_offsets(source, ctx["run_id"])
+    return _params_source_item(source, int(index), offsets)
+
+
 def _resolve_param_selection(param_type, param_mode, params_mode=None):
     legacy_modes = {
         "int_list": ("int", "list"),
@@ -245,11 +509,41 @@ def _resolve_param_selection(param_type, param_mode, params_mode=None):
     pm = str(param_mode)
     if pt not in {"int", "float", "string", "json"}:
         raise ValueError(f"Unknown param_type: {param_type}")
-    if pm not in {"list", "range", "decrement"}:
+    if pm not in {"list", "range", "decrement", "file"}:
         raise ValueError(f"Unknown param_mode: {param_mode}")
     return pt, pm
 
 
+def _params_source(
+    param_type,
+    param_mode,
+    int_range_start=0,
+    int_range_end=0,
+    int_range_step=1,
+    float_range_start=0.0,
+    float_range_end=0.0,
+    float_range_step=1.0,
+    int_decrement_total=5,
+    int_decrement_step=2,
+    float_decrement_total=5.0,
+    float_decrement_step=2.0,
+    params_file="",
+):
+    """Lazy descriptor for the resolved selection, as ``(source, file_offsets)``;
+    ``(None, None)`` for list modes, which stay a materialized params_list."""
+    if param_mode == "file":
+        return _params_file_source(params_file, param_type)
+    if param_type == "int" and param_mode == "range":
+        return _int_range_source(int_range_start, int_range_end, int_range_step), None
+    if param_type == "int" and param_mode == "decrement":
+        return _int_decrement_source(int_decrement_total, int_decrement_step), None
+    if param_type == "float" and param_mode == "range":
+        return _float_range_source(float_range_start, float_range_end, float_range_step), None
+    if param_type == "float" and param_mode == "decrement":
+        return _float_decrement_source(float_decrement_total, float_decrement_step), None
+    return None, None
+
+
 def _parse_params_list(
     param_type,
     param_mode,
@@ -268,10 +562,14 @@ def _parse_params_list(
     float_decrement_total=5.0,
     float_decrement_step=2.0,
     params_mode=None,
+    params_file="",
 ):
     param_type, param_mode = _resolve_param_selection(
         param_type, param_mode, params_mode=params_mode
     )
+    if param_mode == "file":
+        source, offsets = _params_file_source(params_file, param_type)
+        return _materialize_params_source(source, offsets)
     if param_type == "int" and param_mode == "list":
         return _parse_int_list(int_list)
     if param_type == "int" and param_mode == "range":
@@ -302,15 +600,22 @@ def _validate_loop_ctx(loop_ctx):
     run_id = str(ctx.get("run_id", "")).strip()
     if run_id == "":
         raise ValueError("loop_ctx.run_id is required")
-    params_list = ctx.get("params_list")
-    if not isinstance(params_list, list):
-        raise ValueError("loop_ctx.params_list must be an array")
+    source = ctx.get("params_source")
+    if source is not None:
+        params_count = _params_source_count(source)
+        params_name = "params_source.count"
+    else:
+        params_list = ctx.get("params_list")
+        if not isinstance(params_list, list):
+            raise ValueError("loop_ctx.params_list must be an array")
+        params_count = len(params_list)
+        params_name = "params_list length"
     count = int(ctx.get("count", -1))
     index = int(ctx.get("index", -1))
     if count < 0:
         raise ValueError("loop_ctx.count must be >= 0")
-    if count != len(params_list):
-        raise ValueError("loop_ctx.count does not match params_list length")
+    if count != params_count:
+        raise ValueError(f"loop_ctx.count does not match {params_name}")
     if count == 0:
         if index != 0:
             raise ValueError("loop_ctx.index must be 0 when count is 0")
@@ -335,6 +640,123 @@ def _validate_loop_ctx(loop_ctx):
     return ctx
 
 
+def _copy_ctx_containers(ctx):
+    """One-level copy of the containers loop nodes mutate (see `_copy_loop_ctx`)."""
+    ctx = dict(ctx)
+    for key in ("state", "meta", "current_params"):
+        if isinstance(ctx.get(key), dict):
+            ctx[key] = dict(ctx[key])
+    if isinstance(ctx.get("collectors"), dict):
+        ctx["collectors"] = {
+            kind: dict(slot) if isinstance(slot, dict) else slot
+            for kind, slot in ctx["collectors"].items()
+        }
+    return ctx
+
+
+def _copy_loop_ctx(loop_ctx):
+    """Validate ``loop_ctx`` and return a copy-on-write copy to mutate.
+
+    Loop nodes only ever assign top-level keys of ``state`` / ``meta`` /
+    ``current_params`` and fields of individual collector slots, so exactly
+    those containers are copied (one level); everything deeper is shared
+    with the upstream (cached) output. ``params_list`` is never mutated and
+    is shared as-is: when the run's table is registered in RUNTIME_STORE
+    (see MieLoopStart) a deserialized copy is swapped for that single
+    instance. Per-node cost is O(state + meta keys), independent of the
+    params_list size that a full ``copy.deepcopy`` paid every round.
+    Range / decrement / file runs carry a ``params_source`` descriptor and
+    an empty params_list, so there is nothing to share.
+    """
+    ctx = _copy_ctx_containers(_validate_loop_ctx(loop_ctx))
+    run_meta = RUNTIME_STORE["meta"].get(str(ctx["run_id"]))
+    shared = run_meta.get("params_list") if isinstance(run_meta, dict) else None
+    if (
+        isinstance(shared, list)
+        and isinstance(ctx.get("params_list"), list)
+        and shared is not ctx["params_list"]
+        and len(shared) == len(ctx["params_list"])
+    ):
+        ctx["params_list"] = shared
+    return ctx
+
+
+# MieLoopResume payloads carry only this handle; the ctx itself stays in
+# RUNTIME_STORE["_ctx_snapshots"][run_id][index], keeping the expand prompt
+# (and ComfyUI history) independent of the params_list size. Besides
+# run_id / index the handle embeds the round's ``state`` (and an unrolled
+# chunk's ``unroll_first``), the parts that cannot be rebuilt server-side:
+# the rest of an evicted snapshot is rebuilt from the run's latest ctx,
+# kept in its run meta as ``resume_base``.
+_CTX_HANDLE_KEY = "__mie_ctx_handle__"
+_MAX_CTX_SNAPSHOTS_PER_RUN = 2
+
+
+def _resume_payload(next_ctx, keep=_MAX_CTX_SNAPSHOTS_PER_RUN):
+    """Snapshot ``next_ctx`` server-side and return the compact handle JSON
+    for the expand graph's MieLoopResume node. ``keep`` snapshots per run
+    survive (an unrolled expand has one pending Resume per round)."""
+    run_id = str(next_ctx["run_id"])
+    index = int(next_ctx.get("index", 0))
+    snapshots = RUNTIME_STORE.setdefault("_ctx_snapshots", {}).setdefault(run_id, {})
+    # Frozen copy: later in-place edits of next_ctx must not leak into it.
+    snapshots[index] = _copy_ctx_containers(next_ctx)
+    # Only the pending round (and one before it, for a re-executed Resume)
+    # can still be asked for.
+    for stale in sorted(snapshots)[:-keep]:
+        snapshots.pop(stale, None)
+    _ensure_runtime_meta(run_id)["resume_base"] = snapshots[index]
+    fallback = {"state": next_ctx.get("state", {})}
+    unroll_first = next_ctx.get("meta", {}).get("unroll_first")
+    if unroll_first is not None:
+        fallback["unroll_first"] = unroll_first
+    return json.dumps(
+        {
+            _CTX_HANDLE_KEY: {
+                "run_id": run_id,
+                "index": index,
+                "loop_id": next_ctx.get("loop_id"),
+                "fallback": fallback,
+            }
+        },
+        ensure_ascii=False,
+    )
+
+
+def _resolve_resume_payload(payload):
+    """Inverse of `_resume_payload`. A full loop_ctx object (legacy expand
+    graphs, hand-written / saved payloads) is passed through unchanged."""
+    handle = payload.get(_CTX_HANDLE_KEY)
+    if handle is None:
+        return payload
+    if not isinstance(handle, dict):
+        raise ValueError("loop_ctx_json handle must be an object")
+    run_id = str(handle.get("run_id", ""))
+    index = int(handle.get("index", -1))
+    ctx = RUNTIME_STORE.get("_ctx_snapshots", {}).get(run_id, {}).get(index)
+    if ctx is not None:
+        return ctx
+    run_meta = RUNTIME_STORE["meta"].get(run_id)
+    base = run_meta.get("resume_base") if isinstance(run_meta, dict) else None
+    fallback = handle.get("fallback")
+    if not isinstance(base, dict) or not isinstance(fallback, dict):
+        raise ValueError(
+            f"loop_ctx snapshot not found for run_id={run_id}, index={index} "
+            f"(server restarted or run pruned); resume the loop with "
+            f"MieLoopStart.resume_loop_ctx instead"
+        )
+    ctx = _copy_ctx_containers(base)
+    ctx["index"] = index
+    ctx["state"] = dict(fallback.get("state") or {})
+    ctx["current_params"] = _loop_params_at(ctx, index)
+    ctx["is_last"] = index == int(ctx.get("count", 0)) - 1
+    ctx["meta"].pop("unroll_first", None)
+    if fallback.get("unroll_first") is not None:
+        ctx["meta"]["unroll_first"] = fallback["unroll_first"]
+    mie_log(f"LoopResume: snapshot run_id={run_id}, index={index} evicted; rebuilt from the handle")
+    return ctx
+
+
 def _coerce_bool(value):
     if isinstance(value, bool):
         return value
@@ -425,7 +847,7 @@ def _ensure_runtime_meta(run_id):
         state_object_refs["image"], list
     ):
         state_object_refs["image"] = []
-    _runtime_store_timestamps[rid] = time.time()
+    _touch_runtime_run(rid)
     return meta
 
 
@@ -467,6 +889,24 @@ def _cleanup_disk_cache_paths(paths):
             pass
 
 
+# Finalize outputs whose delete failed (on Windows a file stays locked while
+# a returned tensor still maps it); retried on every later run cleanup.
+_pending_finalize_files = []
+
+
+def _remove_finalize_files(paths):
+    """Delete finalize output files (e.g. the stream_to_memmap audio buffer)."""
+    still_locked = []
+    for path in _pending_finalize_files + list(paths or []):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            still_locked.append(path)
+    _pending_finalize_files[:] = still_locked
+
+
 def _cleanup_disk_cache_items(items):
     _cleanup_disk_cache_paths(_collect_disk_paths(items))
 
@@ -487,17 +927,771 @@ def _resolve_offload_dir(ctx, offload_dir):
         return str(Path(raw))
     run_id = str(ctx.get("run_id", "norun")).strip() or "norun"
     safe_run = "".join([c if c.isalnum() or c in {"-", "_"} else "_" for c in run_id])
+    # A journaled run keeps its files next to the journal: ComfyUI empties
+    # its temp directory on startup, which is exactly when a resume needs them.
+    journal_dir = str(ctx.get("meta", {}).get("journal_dir") or "").strip()
+    if journal_dir:
+        return str(Path(journal_dir) / safe_run)
     return str(Path(_get_default_offload_dir()) / safe_run)
 
 
-def _offload_payload_to_disk(kind, ctx, ref, payload, offload_dir):
+# Upper bound on bytes queued-but-not-yet-written per run. A submit that
+# would exceed it blocks until the writer catches up, so a slow disk
+# throttles the loop instead of letting detached CPU tensors pile up in RAM.
+_MIE_LOOP_OFFLOAD_INFLIGHT_BYTES = 2 * 1024 ** 3
+
+# ``offload_codec`` choices (see core/mieraw.py CODECS). "raw" keeps the
+# uncompressed, memory-mappable container; the others trade CPU for disk.
+# uint8 quantization only makes sense for [0, 1] images, not waveforms.
+_MIE_LOOP_IMAGE_OFFLOAD_CODECS = ["raw", "lossless", "lossless_uint8", "fp16", "uint8"]
+_MIE_LOOP_AUDIO_OFFLOAD_CODECS = ["raw", "lossless", "fp16"]
+
+
+class _OffloadWriter:
+    """Per-run background writer for offloaded IMAGE batches.
+
+    ``submit`` hands a CPU tensor (owned by the writer from then on) to a
+    daemon thread that writes it with ``save_mieraw``, so the next round's
+    sampling does not wait on disk. Compressed codecs fan their blocks out
+    to mieraw's shared codec pool from this thread. In-flight bytes are capped at
+    ``max_inflight_bytes``; one oversized item is still admitted when the
+    queue is empty. Write errors are collected with the ``source`` node
+    that queued the job and raised by ``flush``.
+    ``call_after_writes`` queues a callback behind every write submitted so
+    far (the run journal uses it to log a round only once its files exist).
+    """
+
+    def __init__(self, run_id, max_inflight_bytes=_MIE_LOOP_OFFLOAD_INFLIGHT_BYTES):
+        self.run_id = str(run_id)
+        self.max_inflight_bytes = int(max_inflight_bytes)
+        self.inflight_bytes = 0
+        self.pending = 0
+        self.errors = []
+        self._queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name=f"mie-offload-{self.run_id}", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self, path, tensor, codec="raw", round_idx=None, on_written=None,
+        source="LoopCollectImage",
+    ):
+        nbytes = int(tensor.numel() * tensor.element_size())
+        wait_start = time.perf_counter()
+        with self._cond:
+            while self.pending and self.inflight_bytes + nbytes > self.max_inflight_bytes:
+                self._cond.wait()
+            self.inflight_bytes += nbytes
+            self.pending += 1
+        if round_idx is not None:
+            _record_round_metrics(
+                self.run_id, round_idx, accumulate=True,
+                offload_wait_s=time.perf_counter() - wait_start,
+            )
+        self._queue.put((str(path), tensor, nbytes, codec, round_idx, on_written, source))
+
+    def call_after_writes(self, fn, source="LoopJournal"):
+        with self._cond:
+            self.pending += 1
+        self._queue.put((fn, source))
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if len(job) == 2:
+                fn, source = job
+                try:
+                    fn()
+                except Exception as e:
+                    self.errors.append((source, "<callback>", e))
+                finally:
+                    with self._cond:
+                        self.pending -= 1
+                        self._cond.notify_all()
+                continue
+            path, tensor, nbytes, codec, round_idx, on_written, source = job
+            write_start = time.perf_counter()
+            try:
+                save_mieraw(tensor, path, codec=codec)
+                if round_idx is not None:
+                    _record_round_metrics(
+                        self.run_id, round_idx, accumulate=True,
+                        offload_write_s=time.perf_counter() - write_start,
+                        offload_bytes=nbytes,
+                    )
+                if on_written is not None:
+                    on_written()
+            except Exception as e:
+                self.errors.append((source, path, e))
+            finally:
+                del tensor
+                with self._cond:
+                    self.inflight_bytes -= nbytes
+                    self.pending -= 1
+                    self._cond.notify_all()
+
+    def flush(self, raise_errors=True):
+        """Block until every submitted write has finished."""
+        with self._cond:
+            while self.pending:
+                self._cond.wait()
+        if raise_errors and self.errors:
+            errors, self.errors = self.errors, []
+            _raise_offload_errors(errors)
+
+    def close(self):
+        """Drain the queue and stop the thread; errors stay in ``errors``."""
+        self.flush(raise_errors=False)
+        self._queue.put(None)
+        self._thread.join()
+
+
+def _raise_offload_errors(errors):
+    source, path, err = errors[0]
+    raise RuntimeError(
+        f"{source}: background offload write failed for {path}: {err}"
+    ) from err
+
+
+def _get_offload_writer(run_id):
+    writers = RUNTIME_STORE.setdefault("offload_writers", {})
+    writer = writers.get(str(run_id))
+    if writer is None:
+        writer = writers[str(run_id)] = _OffloadWriter(run_id)
+    return writer
+
+
+def _flush_offload_writer(run_id, raise_errors=True):
+    writer = RUNTIME_STORE.get("offload_writers", {}).get(str(run_id))
+    if writer is not None:
+        writer.flush(raise_errors=raise_errors)
+        return
+    # Already closed (the run reached its end): raise what the writer left.
+    errors = RUNTIME_STORE.get("meta", {}).get(str(run_id), {}).pop("offload_errors", None)
+    if raise_errors and errors:
+        _raise_offload_errors(errors)
+
+
+def _close_offload_writer(run_id):
+    """Drain and stop the run's writer thread.
+
+    Errors it still holds are parked in the run meta so the next
+    ``_flush_offload_writer`` (e.g. a finalize node) raises them.
+    """
+    writer = RUNTIME_STORE.get("offload_writers", {}).pop(str(run_id), None)
+    if writer is None:
+        return
+    writer.close()
+    run_meta = RUNTIME_STORE.get("meta", {}).get(str(run_id))
+    if writer.errors and run_meta is not None:
+        run_meta.setdefault("offload_errors", []).extend(writer.errors)
+
+
+def _offload_payload_to_disk(
+    kind, ctx, ref, payload, offload_dir, background=False, codec="raw", meta=None,
+    on_written=None, source="LoopCollectImage",
+):
     base_dir = Path(_resolve_offload_dir(ctx, offload_dir))
     base_dir.mkdir(parents=True, exist_ok=True)
     suffix = uuid.uuid4().hex[:10]
     safe_kind = "".join([c if c.isalnum() or c in {"-", "_"} else "_" for c in str(kind)])
-    path = base_dir / f"{safe_kind}_{suffix}.pt"
-    torch.save(payload, str(path))
-    return {"disk_path": str(path), "ref": str(ref)}
+    if isinstance(payload, torch.Tensor):
+        # Bare tensors (IMAGE batches, encoded waveforms) go to the mieraw
+        # container so the merge can memory-map or block-decode them
+        # instead of unpickling each one.
+        path = base_dir / f"{safe_kind}_{suffix}{MIERAW_SUFFIX}"
+        if background and meta is None:
+            item = {"disk_path": str(path), "ref": str(ref)}
+            _get_offload_writer(ctx.get("run_id", "")).submit(
+                path, payload, codec, round_idx=ctx.get("index"),
+                on_written=None if on_written is None else (lambda: on_written(item)),
+                source=source,
+            )
+            return item
+        write_start = time.perf_counter()
+        save_mieraw(payload, path, meta=meta, codec=codec)
+    else:
+        path = base_dir / f"{safe_kind}_{suffix}.pt"
+        write_start = time.perf_counter()
+        torch.save(payload, str(path))
+    if ctx.get("index") is not None:
+        _record_round_metrics(
+            ctx.get("run_id", ""), ctx["index"], accumulate=True,
+            offload_write_s=time.perf_counter() - write_start,
+            offload_bytes=os.path.getsize(path),
+        )
+    item = {"disk_path": str(path), "ref": str(ref)}
+    if on_written is not None:
+        on_written(item)
+    return item
+
+
+def _offload_audio_to_disk(ctx, ref, payload, offload_dir, codec="raw"):
+    codec = str(codec or "raw")
+    if codec == "raw":
+        disk_item = _offload_payload_to_disk("audio", ctx, ref, payload, offload_dir)
+    else:
+        disk_item = _offload_payload_to_disk(
+            "audio", ctx, ref, payload["waveform"], offload_dir,
+            codec=codec, meta={"sample_rate": payload["sample_rate"]},
+        )
+    # Shape/dtype/rate travel with the item so finalize can size its
+    # output buffer without loading every waveform twice.
+    disk_item["shape"] = [int(x) for x in payload["waveform"].shape]
+    disk_item["dtype"] = str(payload["waveform"].dtype).replace("torch.", "")
+    disk_item["sample_rate"] = int(payload["sample_rate"])
+    return disk_item
+
+
+# Global cap on collector payloads held in memory (IMAGE batches, AUDIO
+# waveforms), summed over every run. Past it, the least recently collected
+# resident items are spilled to their run's offload dir and replaced in
+# place by ordinary disk items, so finalize merges them exactly like
+# ``offload_to_disk`` output. 0 disables the cap. Set from a workflow with
+# MieLoopSetRuntimeBudget.
+_MIE_LOOP_RUNTIME_BUDGET_BYTES = 8 * 1024 ** 3
+_SPILL_KINDS = ("image", "audio")
+_resident_seq = itertools.count()
+
+
+def _resident_nbytes(item):
+    if isinstance(item, torch.Tensor):
+        return int(item.numel() * item.element_size())
+    if isinstance(item, dict) and not _is_disk_cache_item(item):
+        waveform = item.get("waveform")
+        if isinstance(waveform, torch.Tensor):
+            return int(waveform.numel() * waveform.element_size())
+    return 0
+
+
+def _ensure_resident_index(kind):
+    if not isinstance(RUNTIME_STORE.get("resident_index"), dict):
+        RUNTIME_STORE["resident_index"] = {}
+    index = RUNTIME_STORE["resident_index"]
+    if not isinstance(index.get(kind), dict):
+        index[kind] = {}
+    return index[kind]
+
+
+def _resident_total():
+    """Resident bytes of every tracked collector item, all runs and kinds."""
+    index = RUNTIME_STORE.get("resident_index")
+    return int(index.get("total_bytes", 0)) if isinstance(index, dict) else 0
+
+
+def _add_resident_bytes(entry, delta):
+    entry["resident"] = int(entry.get("resident", 0)) + int(delta)
+    RUNTIME_STORE["resident_index"]["total_bytes"] = _resident_total() + int(delta)
+
+
+def _drop_resident_ref(kind, ref):
+    """Forget ``ref``'s stamps; call wherever its collector list is popped."""
+    index = RUNTIME_STORE.get("resident_index")
+    by_ref = index.get(kind) if isinstance(index, dict) else None
+    entry = by_ref.pop(ref, None) if isinstance(by_ref, dict) else None
+    if isinstance(entry, dict):
+        _add_resident_bytes(entry, -int(entry.get("resident", 0)))
+
+
+def _track_collector_item(kind, ctx, ref, offload_dir=""):
+    """Stamp the item just appended to ``ref`` with a global collect order.
+
+    The stamps and each item's resident bytes live in lists parallel to the
+    collector list; the ref's ``resident`` sum and the global
+    ``total_bytes`` are updated by delta, so tracking is O(1) per item.
+    """
+    items = _ensure_runtime_collector_store(kind).get(ref, [])
+    entry = _ensure_resident_index(kind).setdefault(
+        ref, {"run_id": str(ctx.get("run_id", "")), "offload_dir": "", "seq": []}
+    )
+    if offload_dir:
+        entry["offload_dir"] = str(offload_dir)
+    seq = entry["seq"]
+    sizes = entry.setdefault("bytes", [])
+    if len(seq) >= len(items):
+        keep = max(0, len(items) - 1)
+        _add_resident_bytes(entry, -sum(sizes[keep:]))
+        del seq[keep:]
+        del sizes[keep:]
+    while len(seq) < len(items):
+        nbytes = _resident_nbytes(items[len(seq)])
+        seq.append(next(_resident_seq))
+        sizes.append(nbytes)
+        _add_resident_bytes(entry, nbytes)
+
+
+def _spill_collector_item(kind, ref, idx):
+    store = _ensure_runtime_collector_store(kind)
+    entry = _ensure_resident_index(kind).get(ref, {})
+    ctx = {"run_id": entry.get("run_id", "")}
+    offload_dir = entry.get("offload_dir", "")
+    item = store[ref][idx]
+    nbytes = _resident_nbytes(item)
+    if kind == "image":
+        # The stored batch is already a private clone, so the writer may own it.
+        disk_item = _offload_payload_to_disk(
+            "image", ctx, ref, item, offload_dir, background=True, source="LoopCollect"
+        )
+    else:
+        disk_item = _offload_audio_to_disk(ctx, ref, item, offload_dir)
+    disk_item["spilled_bytes"] = nbytes
+    store[ref][idx] = disk_item
+    sizes = entry.get("bytes", [])
+    if idx < len(sizes):
+        _add_resident_bytes(entry, -sizes[idx])
+        sizes[idx] = 0
+    return nbytes
+
+
+def _enforce_runtime_budget(budget=None):
+    """Spill the oldest resident collector items until RAM use fits ``budget``.
+
+    Under the budget this is one comparison against the tracked total; the
+    per-item stamps are only walked once it is crossed. Returns the number
+    of bytes spilled.
+    """
+    budget = _MIE_LOOP_RUNTIME_BUDGET_BYTES if budget is None else int(budget)
+    if budget <= 0 or _resident_total() <= budget:
+        return 0
+    candidates = []
+    for kind in _SPILL_KINDS:
+        store = _ensure_runtime_collector_store(kind)
+        index = _ensure_resident_index(kind)
+        for ref, entry in list(index.items()):
+            items = store.get(ref)
+            if not isinstance(items, list):
+                _drop_resident_ref(kind, ref)
+                continue
+            for idx, (order, nbytes) in enumerate(zip(entry["seq"], entry.get("bytes", []))):
+                if nbytes and idx < len(items):
+                    candidates.append((order, kind, ref, idx))
+    spilled = 0
+    count = 0
+    for _order, kind, ref, idx in sorted(candidates):
+        if _resident_total() <= budget:
+            break
+        nbytes = _spill_collector_item(kind, ref, idx)
+        spilled += nbytes
+        count += 1
+    resident = _resident_total()
+    mie_log(
+        f"LoopCollect: RAM budget exceeded, spilled {count} item(s) "
+        f"({spilled / 1e9:.2f} GB) to disk, resident={resident / 1e9:.2f} GB, "
+        f"budget={budget / 1e9:.2f} GB"
+    )
+    return spilled
+
+
+def _runtime_memory_stats():
+    """Resident vs spilled collector bytes, in total and per ref."""
+    by_ref = {}
+    resident_total = 0
+    spilled_total = 0
+    spilled_items = 0
+    for kind in _SPILL_KINDS:
+        index = _ensure_resident_index(kind)
+        for ref, items in _ensure_runtime_collector_store(kind).items():
+            if not isinstance(items, list):
+                continue
+            resident = sum(_resident_nbytes(x) for x in items)
+            spilled_list = [
+                int(x.get("spilled_bytes", 0))
+                for x in items
+                if _is_disk_cache_item(x) and "spilled_bytes" in x
+            ]
+            by_ref[ref] = {
+                "kind": kind,
+                "run_id": index.get(ref, {}).get("run_id", ""),
+                "resident_bytes": resident,
+                "spilled_bytes": sum(spilled_list),
+                "spilled_items": len(spilled_list),
+            }
+            resident_total += resident
+            spilled_total += sum(spilled_list)
+            spilled_items += len(spilled_list)
+    return {
+        "budget_bytes": int(_MIE_LOOP_RUNTIME_BUDGET_BYTES),
+        "resident_bytes": resident_total,
+        "spilled_bytes": spilled_total,
+        "spilled_items": spilled_items,
+        "by_ref": by_ref,
+    }
+
+
+# Per-run, per-round timings for finding where a long loop spends its wall
+# clock. Rounds are keyed by loop index; values recorded with
+# ``accumulate=True`` are summed over the round (several collectors, several
+# offload writes). When the run has a ``trace_path`` (MieLoopStart input,
+# kept in ``ctx["meta"]``) every record is also appended to that file as
+# one JSON line. Read back with MieLoopStats.
+_loop_metrics_lock = threading.Lock()
+
+
+def _loop_metrics(run_id):
+    store = RUNTIME_STORE.setdefault("loop_metrics", {})
+    rid = str(run_id)
+    metrics = store.get(rid)
+    if not isinstance(metrics, dict):
+        metrics = store[rid] = {
+            "run_id": rid,
+            "loop_id": "",
+            "trace_path": "",
+            "started_at": time.time(),
+            "rounds": {},
+            "finalize": {},
+            "_round_mark": time.perf_counter(),
+        }
+    return metrics
+
+
+def _trace_loop_event(run_id, event, **fields):
+    path = str(_loop_metrics(run_id).get("trace_path") or "")
+    if not path:
+        return
+    line = json.dumps(
+        {"ts": round(time.time(), 6), "run_id": str(run_id), "event": event, **fields},
+        ensure_ascii=False,
+        default=str,
+    )
+    try:
+        with _loop_metrics_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        mie_log(f"LoopStats: trace write failed for {path}: {e}")
+
+
+def _round_metric_value(value):
+    return round(value, 6) if isinstance(value, float) else value
+
+
+def _record_round_metrics(run_id, round_idx, accumulate=False, **values):
+    values = {k: _round_metric_value(v) for k, v in values.items()}
+    with _loop_metrics_lock:
+        rounds = _loop_metrics(run_id)["rounds"]
+        entry = rounds.setdefault(str(int(round_idx)), {})
+        for key, value in values.items():
+            if accumulate and isinstance(value, (int, float)):
+                entry[key] = _round_metric_value(entry.get(key, 0) + value)
+            else:
+                entry[key] = value
+    _trace_loop_event(run_id, "round", round=int(round_idx), **values)
+
+
+def _record_finalize_metrics(run_id, kind, **values):
+    values = {k: _round_metric_value(v) for k, v in values.items()}
+    with _loop_metrics_lock:
+        _loop_metrics(run_id)["finalize"][str(kind)] = values
+    _trace_loop_event(run_id, "finalize", kind=str(kind), **values)
+
+
+def _start_loop_metrics(ctx):
+    run_id = ctx.get("run_id", "")
+    with _loop_metrics_lock:
+        metrics = _loop_metrics(run_id)
+        metrics["loop_id"] = str(ctx.get("loop_id", ""))
+        metrics["trace_path"] = str(ctx.get("meta", {}).get("trace_path") or "")
+        metrics["_round_mark"] = time.perf_counter()
+    _trace_loop_event(
+        run_id, "start", loop_id=ctx.get("loop_id"), index=ctx.get("index"), count=ctx.get("count")
+    )
+
+
+def _mark_round_end(run_id, round_idx):
+    """Record the wall time since the previous round ended (or the loop started)."""
+    now = time.perf_counter()
+    with _loop_metrics_lock:
+        metrics = _loop_metrics(run_id)
+        elapsed = now - metrics.get("_round_mark", now)
+        metrics["_round_mark"] = now
+    _record_round_metrics(run_id, round_idx, round_wall_s=elapsed)
+
+
+def _loop_stats_snapshot(run_id):
+    """JSON-safe view of a run's metrics with per-key totals over rounds."""
+    rid = str(run_id)
+    with _loop_metrics_lock:
+        metrics = copy.deepcopy(RUNTIME_STORE.get("loop_metrics", {}).get(rid) or {})
+    rounds = metrics.get("rounds", {})
+    ordered = []
+    totals = {}
+    for key in sorted(rounds, key=int):
+        entry = dict(rounds[key], round=int(key))
+        ordered.append(entry)
+        for name, value in rounds[key].items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                totals[name] = _round_metric_value(totals.get(name, 0) + value)
+    memory = _runtime_memory_stats()
+    run_refs = {
+        ref: v for ref, v in memory["by_ref"].items() if v.get("run_id") == rid
+    }
+    return {
+        "run_id": rid,
+        "loop_id": metrics.get("loop_id", ""),
+        "trace_path": metrics.get("trace_path", ""),
+        "started_at": metrics.get("started_at"),
+        "rounds": ordered,
+        "totals": totals,
+        "finalize": metrics.get("finalize", {}),
+        "memory": {
+            "budget_bytes": memory["budget_bytes"],
+            "resident_bytes": sum(v["resident_bytes"] for v in run_refs.values()),
+            "spilled_bytes": sum(v["spilled_bytes"] for v in run_refs.values()),
+            "by_ref": run_refs,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Run journal (MieLoopStart ``journal_dir``)
+# ---------------------------------------------------------------------------
+# One append-only JSONL file per loop_id, ``<journal_dir>/<loop_id>.journal.jsonl``,
+# so the collected rounds of a run survive a ComfyUI crash / restart. Every
+# record carries the run_id and an ``event``:
+#   start  - count and a fingerprint of params + initial state
+#   item   - one collected item: kind, ref, round and its store entry
+#            (disk_path / shape / dtype for IMAGE and AUDIO, which a
+#            journaled run always writes to disk; the value for TEXT / JSON).
+#            Disk items are logged only once their file has been written.
+#   round  - a finished round: state patch, resulting state, collector counts
+#   resume - rounds >= ``round`` were dropped by a resume
+#   done   - the last round finished; the run is no longer resumable
+# ``round`` / ``done`` go through the run's offload writer queue so they land
+# after that round's item records. MieLoopStart replays the latest run of
+# its loop_id and, if it is unfinished and its fingerprint matches, picks it
+# up at the first round whose items are not all on disk.
+_loop_journal_lock = threading.Lock()
+
+
+def _journal_path(journal_dir, loop_id):
+    safe_loop = "".join([c if c.isalnum() or c in {"-", "_"} else "_" for c in str(loop_id)])
+    return str(Path(str(journal_dir)) / f"{safe_loop or 'loop'}.journal.jsonl")
+
+
+def _journal_write(path, run_id, event, sync=False, **fields):
+    line = json.dumps(
+        {"ts": round(time.time(), 6), "run_id": str(run_id), "event": event, **fields},
+        ensure_ascii=False,
+        default=str,
+    )
+    try:
+        with _loop_journal_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+    except OSError as e:
+        mie_log(f"LoopJournal: write failed for {path}: {e}")
+
+
+def _read_journal(path):
+    """Records of a journal file; a line torn by a crash mid-write is skipped."""
+    records = []
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _journal_fingerprint(count, params_list, params_source, initial_state):
+    payload = json.dumps(
+        [int(count), params_list, params_source, initial_state],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _journal_collected(ctx, kind, ref, item):
+    path = str(ctx.get("meta", {}).get("journal_path") or "")
+    if path:
+        _journal_write(
+            path, ctx.get("run_id", ""), "item",
+            round=int(ctx.get("index", 0)), kind=str(kind), ref=str(ref), item=item,
+        )
+
+
+def _journal_round_end(ctx, round_idx, state_patch, done, collectors=None):
+    path = str(ctx.get("meta", {}).get("journal_path") or "")
+    if not path:
+        return
+    run_id = str(ctx.get("run_id", ""))
+    collectors = {
+        kind: {"ref": slot.get("ref"), "count": int(slot.get("count", 0))}
+        for kind, slot in (ctx.get("collectors", {}) if collectors is None else collectors).items()
+        if isinstance(slot, dict)
+    }
+    # Frozen now: the ctx keeps changing while the records wait in the queue.
+    records = json.loads(json.dumps(
+        [["round", {"round": int(round_idx), "state_patch": state_patch,
+                    "state": ctx.get("state", {}), "collectors": collectors}]]
+        + ([["done", {"round": int(round_idx)}]] if done else []),
+        ensure_ascii=False,
+        default=str,
+    ))
+
+    def write():
+        for event, fields in records:
+            _journal_write(path, run_id, event, sync=True, **fields)
+
+    writer = RUNTIME_STORE.get("offload_writers", {}).get(run_id)
+    if writer is None:
+        write()
+    else:
+        writer.call_after_writes(write)
+
+
+def _journal_item_on_disk(item):
+    return not _is_disk_cache_item(item) or os.path.exists(str(item["disk_path"]))
+
+
+def _journal_resume_point(records, fingerprint=None, run_id=None, limit=None):
+    """Where a journaled run can pick up again, or None.
+
+    Replays the records of ``run_id`` (default: the latest run in the file,
+    which must be unfinished and match ``fingerprint``). Rounds count as
+    done while each has its round record and every item collected up to it
+    is still on disk; ``limit`` caps the resume round. Returns ``{"run_id", "index", "state", "collectors",
+    "items", "discard"}``: ``items`` maps ``(kind, ref)`` to the store
+    entries of the rounds before ``index``; ``discard`` lists the entries of
+    later, partial rounds.
+    """
+    start_at = None
+    for pos in range(len(records) - 1, -1, -1):
+        record = records[pos]
+        if record.get("event") == "start" and (
+            run_id is None or str(record.get("run_id")) == str(run_id)
+        ):
+            start_at = pos
+            break
+    if start_at is None:
+        return None
+    start = records[start_at]
+    if fingerprint is not None and start.get("fingerprint") != fingerprint:
+        return None
+    rid = str(start.get("run_id", ""))
+    items = []
+    rounds = {}
+    for record in records[start_at + 1:]:
+        if str(record.get("run_id", "")) != rid:
+            continue
+        event = record.get("event")
+        if event == "done" and run_id is None:
+            return None
+        if event == "item":
+            items.append(record)
+        elif event == "round":
+            rounds[int(record.get("round", -1))] = record
+        elif event == "resume":
+            cut = int(record.get("round", 0))
+            items = [r for r in items if int(r.get("round", 0)) < cut]
+            rounds = {k: v for k, v in rounds.items() if k < cut}
+    items_by_round = {}
+    for record in items:
+        items_by_round.setdefault(int(record.get("round", 0)), []).append(record)
+    counts = {}
+    index = 0
+    last = None
+    while index in rounds and (limit is None or index < int(limit)):
+        durable = True
+        for record in items_by_round.get(index, []):
+            key = (record.get("kind"), record.get("ref"))
+            counts[key] = counts.get(key, 0) + 1
+            durable = durable and _journal_item_on_disk(record.get("item"))
+        slots = rounds[index].get("collectors") or {}
+        if not durable or any(
+            counts.get((kind, slot.get("ref")), 0) != int(slot.get("count", 0))
+            for kind, slot in slots.items()
+            if isinstance(slot, dict) and slot.get("ref")
+        ):
+            break
+        last = rounds[index]
+        index += 1
+    if index >= int(start.get("count", 0)) and run_id is None:
+        return None
+    collectors = (last or {}).get("collectors") or {}
+    kept = {}
+    discard = []
+    for record in items:
+        kind, ref = record.get("kind"), record.get("ref")
+        slot = collectors.get(kind) or {}
+        if int(record.get("round", 0)) < index and ref and slot.get("ref") == ref:
+            kept.setdefault((kind, ref), []).append(record.get("item"))
+        else:
+            discard.append(record.get("item"))
+    return {
+        "run_id": rid,
+        "index": index,
+        "state": None if last is None else last.get("state"),
+        "collectors": collectors,
+        "items": kept,
+        "discard": discard,
+    }
+
+
+def _load_journal_resume_point(path, fingerprint=None, run_id=None, limit=None):
+    records = _read_journal(path)
+    point = _journal_resume_point(records, fingerprint, run_id, limit)
+    if point is not None and point["run_id"] in RUNTIME_STORE.get("offload_writers", {}):
+        # Same process (the run errored out mid-loop): let its queued writes
+        # and journal records land, then replay again.
+        _flush_offload_writer(point["run_id"], raise_errors=False)
+        point = _journal_resume_point(_read_journal(path), fingerprint, run_id, limit)
+    return point
+
+
+def _journal_reattach(ctx, point):
+    """Point ``ctx``'s collectors at the journaled items and rewind it to the
+    resume round; files of the dropped partial rounds are deleted."""
+    run_id = str(ctx.get("run_id", ""))
+    run_meta = _ensure_runtime_meta(run_id)
+    run_meta["journal_path"] = str(ctx["meta"]["journal_path"])
+    for cache in ("_detect_cache", "_node_index_cache", "_expand_template_cache", "_ctx_snapshots"):
+        RUNTIME_STORE.get(cache, {}).pop(run_id, None)
+    _ensure_collectors(ctx)
+    for kind in list(ctx["collectors"]):
+        slot = point["collectors"].get(kind) or {}
+        ref = slot.get("ref")
+        old_ref = ctx["collectors"][kind].get("ref")
+        if old_ref and old_ref != ref:
+            _ensure_runtime_collector_store(kind).pop(old_ref, None)
+            _drop_resident_ref(kind, old_ref)
+            _remove_runtime_collector_ref(run_meta, kind, old_ref)
+        if not ref:
+            ctx["collectors"][kind] = {"ref": None, "count": 0}
+            continue
+        _register_runtime_collector_ref(run_id, run_meta, kind, ref)
+        items = list(point["items"].get((kind, ref), []))
+        _ensure_runtime_collector_store(kind)[ref] = items
+        ctx["collectors"][kind] = {"ref": ref, "count": len(items)}
+    _cleanup_disk_cache_items(point["discard"])
+    if point["state"] is not None:
+        ctx["state"] = point["state"]
+    index = int(point["index"])
+    ctx["index"] = index
+    ctx["is_last"] = index == int(ctx["count"]) - 1
+    ctx["current_params"] = _loop_params_at(ctx, index)
+    _journal_write(run_meta["journal_path"], run_id, "resume", sync=True, round=index)
+    return ctx
 
 
 def _ensure_state_object_store(kind):
@@ -526,12 +1720,20 @@ def _ensure_runtime_collector_refs(run_meta, kind):
     return refs
 
 
+def _register_runtime_collector_ref(run_id, run_meta, kind, ref):
+    refs = _ensure_runtime_collector_refs(run_meta, kind)
+    if ref not in refs:
+        refs.append(ref)
+    _ref_owner_index("collectors", kind)[ref] = str(run_id)
+
+
 def _remove_runtime_collector_ref(run_meta, kind, ref):
     refs = _ensure_runtime_collector_refs(run_meta, kind)
     if ref in refs:
         run_meta["collector_refs"][kind] = [x for x in refs if x != ref]
         if kind == "image":
             run_meta["image_refs"] = run_meta["collector_refs"][kind]
+    _release_runtime_ref("collectors", kind, ref)
 
 
 def _ensure_runtime_state_object_refs(run_meta, kind):
@@ -546,15 +1748,24 @@ def _ensure_runtime_state_object_refs(run_meta, kind):
     return refs
 
 
+def _register_runtime_state_object_ref(run_id, run_meta, kind, ref):
+    refs = _ensure_runtime_state_object_refs(run_meta, kind)
+    if ref not in refs:
+        refs.append(ref)
+    _ref_owner_index("state_objects", kind)[ref] = str(run_id)
+
+
 def _remove_runtime_state_object_ref(run_meta, kind, ref):
     refs = _ensure_runtime_state_object_refs(run_meta, kind)
     if ref in refs:
         run_meta["state_object_refs"][kind] = [x for x in refs if x != ref]
+    _release_runtime_ref("state_objects", kind, ref)
 
 
 def _pop_collector_items(kind, ref):
     if not ref:
         return []
+    _drop_resident_ref(kind, ref)
     return _ensure_runtime_collector_store(kind).pop(ref, [])
 
 
@@ -575,7 +1786,7 @@ def _make_state_object_ref(prefix, ctx, key):
 
 
 def _state_object_put_image(loop_ctx, key, image):
-    ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+    ctx = _copy_loop_ctx(loop_ctx)
     if not str(key).strip():
         raise ValueError("key must not be empty")
     if "state" not in ctx or not isinstance(ctx["state"], dict):
@@ -588,11 +1799,9 @@ def _state_object_put_image(loop_ctx, key, image):
         store.pop(old_ref, None)
         _remove_runtime_state_object_ref(run_meta, "image", old_ref)
     new_ref = _make_state_object_ref("stateimg", ctx, str(key))
+    _register_runtime_state_object_ref(ctx.get("run_id", ""), run_meta, "image", new_ref)
     store[new_ref] = image.detach().clone()
     ctx["state"][state_key] = new_ref
-    refs = _ensure_runtime_state_object_refs(run_meta, "image")
-    if new_ref not in refs:
-        refs.append(new_ref)
     return ctx
 
 
@@ -609,7 +1818,7 @@ def _state_object_get_image(loop_ctx, key):
 
 
 def _state_object_remove_image(loop_ctx, key):
-    ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+    ctx = _copy_loop_ctx(loop_ctx)
     if "state" not in ctx or not isinstance(ctx["state"], dict):
         ctx["state"] = {}
     state_key = _state_ref_key(key)
@@ -623,16 +1832,25 @@ def _state_object_remove_image(loop_ctx, key):
 
 
 def _cleanup_runtime_for_run(run_id):
+    # Let queued offload writes land before their files are deleted below.
+    _close_offload_writer(run_id)
     run_meta = _ensure_runtime_meta(run_id)
+    # A journaled run's files outlive its RAM entries: they are what a
+    # later MieLoopStart resumes from.
+    keep_files = bool(run_meta.get("journal_path"))
     collector_refs = run_meta.get("collector_refs", {})
     if isinstance(collector_refs, dict):
         for kind, refs in list(collector_refs.items()):
             if not isinstance(refs, list):
                 continue
             store = _ensure_runtime_collector_store(kind)
+            owners = _ref_owner_index("collectors", kind)
             for ref in list(refs):
                 removed = store.pop(ref, None)
-                _cleanup_disk_cache_items(removed)
+                if not keep_files:
+                    _cleanup_disk_cache_items(removed)
+                _drop_resident_ref(kind, ref)
+                owners.pop(ref, None)
             collector_refs[kind] = []
     state_object_refs = run_meta.get("state_object_refs", {})
     if isinstance(state_object_refs, dict):
@@ -640,15 +1858,44 @@ def _cleanup_runtime_for_run(run_id):
             if not isinstance(refs, list):
                 continue
             store = _ensure_state_object_store(kind)
+            owners = _ref_owner_index("state_objects", kind)
             for ref in list(refs):
                 store.pop(ref, None)
+                owners.pop(ref, None)
             state_object_refs[kind] = []
     run_meta["image_refs"] = []
+    _remove_finalize_files(run_meta.pop("finalize_files", []))
+    RUNTIME_STORE.get("_node_index_cache", {}).pop(str(run_id), None)
+    RUNTIME_STORE.get("_expand_template_cache", {}).pop(str(run_id), None)
+    RUNTIME_STORE.get("_ctx_snapshots", {}).pop(str(run_id), None)
+    RUNTIME_STORE.get("loop_metrics", {}).pop(str(run_id), None)
     RUNTIME_STORE["meta"].pop(str(run_id), None)
+    # A heap entry left behind finds no timestamp and is skipped.
     _runtime_store_timestamps.pop(str(run_id), None)
 
 
 def _prune_runtime_store():
+    """Full reconcile of RUNTIME_STORE against every run's refs.
+
+    O(runs + stored refs): drops entries no run lists (including ones written
+    straight into the stores), reclaims runs idle past
+    ``_MAX_RUNTIME_STORE_AGE`` and rebuilds the owner index and expiry heap
+    from scratch. Not on the hot path any more -- MieLoopStart and a finished
+    MieLoopEnd run the O(expired) `_reclaim_expired_runtime` instead; this
+    stays for explicit maintenance / repair.
+    """
+    with _runtime_prune_lock:
+        _prune_runtime_store_locked()
+        _rebuild_runtime_index()
+
+
+def _prune_runtime_store_locked():
+    for rid in list(RUNTIME_STORE.get("offload_writers", {})):
+        if rid not in RUNTIME_STORE["meta"]:
+            _close_offload_writer(rid)
+    for rid in list(RUNTIME_STORE.get("loop_metrics", {})):
+        if rid not in RUNTIME_STORE["meta"]:
+            RUNTIME_STORE["loop_metrics"].pop(rid, None)
     collector_stores = RUNTIME_STORE.get("collectors", {})
     live_refs_by_kind = {kind: set() for kind in collector_stores.keys()}
     state_object_stores = RUNTIME_STORE.get("state_objects", {})
@@ -682,6 +1929,7 @@ def _prune_runtime_store():
             if ref not in live_refs:
                 removed = store.pop(ref, None)
                 _cleanup_disk_cache_items(removed)
+                _drop_resident_ref(kind, ref)
     for kind, store in list(state_object_stores.items()):
         live_refs = live_state_object_refs_by_kind.get(kind, set())
         for ref in list(store.keys()):
@@ -690,7 +1938,7 @@ def _prune_runtime_store():
     now = time.time()
     stale_run_ids = [
         rid
-        for rid, ts in _runtime_store_timestamps.items()
+        for rid, ts in list(_runtime_store_timestamps.items())
         if now - ts > _MAX_RUNTIME_STORE_AGE
     ]
     for rid in stale_run_ids:
@@ -698,6 +1946,123 @@ def _prune_runtime_store():
         _runtime_store_timestamps.pop(rid, None)
 
 
+def _rebuild_runtime_index():
+    """Owner index and expiry heap from the current meta / timestamps (the
+    reconcile step of `_prune_runtime_store`)."""
+    owners = {"collectors": {}, "state_objects": {}}
+    for rid, run_meta in list(RUNTIME_STORE["meta"].items()):
+        if not isinstance(run_meta, dict):
+            continue
+        collector_refs = run_meta.get("collector_refs", {})
+        if not isinstance(collector_refs, dict):
+            collector_refs = {}
+        legacy_image_refs = run_meta.get("image_refs")
+        if isinstance(legacy_image_refs, list):
+            collector_refs = dict(collector_refs)
+            collector_refs.setdefault("image", legacy_image_refs)
+        for section, by_kind in (
+            ("collectors", collector_refs),
+            ("state_objects", run_meta.get("state_object_refs", {})),
+        ):
+            if not isinstance(by_kind, dict):
+                continue
+            for kind, refs in by_kind.items():
+                if isinstance(refs, list):
+                    index = owners[section].setdefault(kind, {})
+                    for ref in refs:
+                        index[str(ref)] = str(rid)
+    RUNTIME_STORE["ref_owners"] = owners
+    RUNTIME_STORE["ref_orphans"] = []
+    with _runtime_expiry_lock:
+        _runtime_expiry_heap.clear()
+        _runtime_expiry_pending.clear()
+        for rid, ts in list(_runtime_store_timestamps.items()):
+            _arm_runtime_expiry(rid, ts + _MAX_RUNTIME_STORE_AGE)
+
+
+# ---------------------------------------------------------------------------
+# Incremental reclaim: owner index + expiry heap
+# ---------------------------------------------------------------------------
+# RUNTIME_STORE["ref_owners"][section][kind][ref] -> run_id is kept in step
+# with the runs' ref lists (run_id -> refs) by the register / remove helpers,
+# and refs a run lets go of are queued in RUNTIME_STORE["ref_orphans"]. Each
+# touched run has one entry in a min-heap of expiry times; an entry that
+# comes due for a run touched since is simply re-armed, so a touch is O(1)
+# and a reclaim pass is O(expired + orphaned), however many runs the server
+# has seen. Passes run on the executor thread (MieLoopStart, and MieLoopEnd
+# once a loop is done) so they never race the nodes that mutate the store.
+_runtime_expiry_heap = []  # (expires_at, run_id)
+_runtime_expiry_pending = {}  # run_id -> expires_at of its heap entry
+_runtime_expiry_lock = threading.Lock()
+_runtime_prune_lock = threading.RLock()
+
+
+def _ref_owner_index(section, kind):
+    owners = RUNTIME_STORE.setdefault("ref_owners", {})
+    return owners.setdefault(section, {}).setdefault(kind, {})
+
+
+def _release_runtime_ref(section, kind, ref):
+    """Drop ``ref``'s owner; its store entry (if any is left) is reclaimed by
+    the next `_reclaim_expired_runtime` pass."""
+    if _ref_owner_index(section, kind).pop(ref, None) is not None:
+        RUNTIME_STORE.setdefault("ref_orphans", []).append((section, kind, ref))
+
+
+def _arm_runtime_expiry(rid, expires_at):
+    # Caller holds _runtime_expiry_lock.
+    if rid not in _runtime_expiry_pending:
+        _runtime_expiry_pending[rid] = expires_at
+        heapq.heappush(_runtime_expiry_heap, (expires_at, rid))
+
+
+def _touch_runtime_run(rid):
+    now = time.time()
+    _runtime_store_timestamps[rid] = now
+    with _runtime_expiry_lock:
+        _arm_runtime_expiry(rid, now + _MAX_RUNTIME_STORE_AGE)
+
+
+def _reclaim_expired_runtime(now=None):
+    """Reclaim orphaned refs and runs idle past ``_MAX_RUNTIME_STORE_AGE``.
+
+    Only heap entries that are due and queued orphans are visited. Returns
+    the run ids that were cleaned up.
+    """
+    now = time.time() if now is None else now
+    reclaimed = []
+    with _runtime_prune_lock:
+        # Drain in place: a release queued while this pass runs stays queued.
+        queue = RUNTIME_STORE.setdefault("ref_orphans", [])
+        orphans = queue[:]
+        del queue[:len(orphans)]
+        for section, kind, ref in orphans:
+            if ref in _ref_owner_index(section, kind):
+                continue  # re-registered since it was released
+            if section == "collectors":
+                _cleanup_disk_cache_items(_ensure_runtime_collector_store(kind).pop(ref, None))
+                _drop_resident_ref(kind, ref)
+            else:
+                _ensure_state_object_store(kind).pop(ref, None)
+        while True:
+            with _runtime_expiry_lock:
+                if not _runtime_expiry_heap or _runtime_expiry_heap[0][0] > now:
+                    break
+                _expires_at, rid = heapq.heappop(_runtime_expiry_heap)
+                _runtime_expiry_pending.pop(rid, None)
+                ts = _runtime_store_timestamps.get(rid)
+                if ts is None:
+                    continue  # already cleaned up
+                if ts + _MAX_RUNTIME_STORE_AGE > now:
+                    _arm_runtime_expiry(rid, ts + _MAX_RUNTIME_STORE_AGE)
+                    continue
+            _cleanup_runtime_for_run(rid)
+            reclaimed.append(rid)
+    if reclaimed:
+        mie_log(f"LoopRuntime: reclaimed {len(reclaimed)} idle run(s): {', '.join(reclaimed)}")
+    return reclaimed
+
+
 def _base_class_type(class_type: str):
     raw = str(class_type or "")
     if "|" in raw:
@@ -740,6 +2105,7 @@ def _is_excluded_output_class(base_class_type: str):
         "MieLoopCleanupJSON",
         "MieLoopFinalizeAudio",
         "MieLoopCleanupAudio",
+        "MieLoopStats",
         "MieImageGrid",
         "SaveImage",
         "PreviewImage",
@@ -897,33 +2263,77 @@ def explore_backward_from_body_out(node_id, dynprompt, visited):
             explore_backward_from_body_out(src_id, dynprompt, visited)
 
 
-def explore_forward_from_body_in(node_id, dynprompt, visited, stop_ids=None):
-    nid = str(node_id)
-    if nid in visited:
-        return
-    visited.add(nid)
+class _NodeIndex:
+    """Reverse-adjacency (consumer) index over one prompt's nodes.
+
+    Built in a single O(V+E) pass so forward walks, the expand builder and
+    the cache-write post-pass never rescan every node's inputs per visited
+    node. ``consumers[src]`` lists the nodes with at least one input linked
+    to ``src`` (prompt order, de-duplicated); ``by_class`` groups node ids by
+    base class type.
+    """
+
+    def __init__(self, all_nodes):
+        self.nodes = all_nodes
+        self.order = {}
+        self.consumers = {}
+        self.by_class = {}
+        for pos, (node_id, node) in enumerate(all_nodes.items()):
+            nid = str(node_id)
+            self.order[nid] = pos
+            seen = set()
+            for input_value in _get_inputs(node).values():
+                if not is_link(input_value):
+                    continue
+                src_id = str(input_value[0])
+                if src_id in seen:
+                    continue
+                seen.add(src_id)
+                self.consumers.setdefault(src_id, []).append(nid)
+            base_class_type = _base_class_type(_get_class_type(node))
+            self.by_class.setdefault(base_class_type, []).append(nid)
+
+    def consumers_of(self, node_id):
+        return self.consumers.get(str(node_id), ())
+
+    def ids_of_classes(self, class_types):
+        ids = []
+        for class_type in class_types:
+            ids.extend(self.by_class.get(class_type, ()))
+        return sorted(ids, key=self.order.__getitem__)
+
+
+def _build_node_index(dynprompt):
+    return _NodeIndex(_get_all_nodes(dynprompt))
+
+
+def explore_forward_from_body_in(node_id, dynprompt, visited, stop_ids=None, node_index=None):
     normalized_stop_ids = {str(x) for x in (stop_ids or set())}
-    if nid in normalized_stop_ids:
-        return
-    all_nodes = _get_all_nodes(dynprompt)
-    for candidate_id, candidate_node in all_nodes.items():
-        inputs = _get_inputs(candidate_node)
-        for input_value in inputs.values():
-            if is_link(input_value) and str(input_value[0]) == nid:
-                explore_forward_from_body_in(
-                    candidate_id, dynprompt, visited, normalized_stop_ids
-                )
-                break
+    if node_index is None:
+        node_index = _build_node_index(dynprompt)
+    # Iterative DFS: deep bodies must not hit the recursion limit. Stop
+    # nodes are marked visited but not expanded, as before.
+    stack = [str(node_id)]
+    while stack:
+        nid = stack.pop()
+        if nid in visited:
+            continue
+        visited.add(nid)
+        if nid in normalized_stop_ids:
+            continue
+        stack.extend(node_index.consumers_of(nid))
 
 
-def collect_loop_body(body_in_id, body_out_id, dynprompt, end_id=None):
+def collect_loop_body(body_in_id, body_out_id, dynprompt, end_id=None, node_index=None):
     backward_set = set()
     forward_set = set()
     explore_backward_from_body_out(body_out_id, dynprompt, backward_set)
     stop_ids = {str(body_out_id)}
     if end_id:
         stop_ids.add(str(end_id))
-    explore_forward_from_body_in(body_in_id, dynprompt, forward_set, stop_ids)
+    explore_forward_from_body_in(
+        body_in_id, dynprompt, forward_set, stop_ids, node_index=node_index
+    )
     body_nodes_raw = sorted(backward_set & forward_set)
     body_nodes_filtered = []
     body_nodes_business = []
@@ -1000,8 +2410,252 @@ def collect_loop_body(body_in_id, body_out_id, dynprompt, end_id=None):
 # =============================================================================
 
 
+def loop_ctx_chain_has_stateful_dependency(dynprompt, body_in_id, node_id, visited=None):
+    """True when the loop_ctx chain ending at ``node_id`` (walked back to
+    BodyIn) passes through a StateSet* or Collect* node."""
+    nid = str(node_id)
+    if visited is None:
+        visited = set()
+    if nid in visited:
+        return False
+    visited.add(nid)
+    if nid == str(body_in_id):
+        return False
+    node = get_node(dynprompt, nid)
+    if not isinstance(node, dict):
+        return False
+    base_class_type = _base_class_type(_get_class_type(node))
+    if base_class_type.startswith("MieLoopStateSet") or _is_collector_class(
+        base_class_type
+    ):
+        return True
+    loop_ctx_input = _get_inputs(node).get("loop_ctx")
+    if is_link(loop_ctx_input):
+        return loop_ctx_chain_has_stateful_dependency(
+            dynprompt, body_in_id, loop_ctx_input[0], visited
+        )
+    return False
+
+
+def _loop_ctx_chain(dynprompt, body_in_id, node_id):
+    """Node ids on the loop_ctx chain ending at ``node_id``, walked back to
+    (not including) BodyIn."""
+    chain = []
+    nid = str(node_id)
+    while nid != str(body_in_id) and nid not in chain:
+        node = get_node(dynprompt, nid)
+        if not isinstance(node, dict):
+            break
+        chain.append(nid)
+        loop_ctx_input = _get_inputs(node).get("loop_ctx")
+        if not is_link(loop_ctx_input):
+            break
+        nid = str(loop_ctx_input[0])
+    return chain
+
+
+def _unroll_blocker(dynprompt, detect_result, body_in_id, body_out_id):
+    """Why the loop body cannot be unrolled, or "" when it can.
+
+    Unrolled rounds all start from ctx snapshots taken before any of them
+    runs, so no state may flow from one round into the next: no StateSet* /
+    state image nodes and no per-round ``state_json`` into BodyOut.
+    Collectors are fine as long as they sit on the BodyOut loop_ctx chain:
+    such a chunk runs its rounds one after another (see
+    `_ExpandTemplate.instantiate_unrolled`), so items keep round order.
+    """
+    body_out = get_node(dynprompt, str(body_out_id))
+    if not isinstance(body_out, dict):
+        return f"body_out {body_out_id} not found"
+    inputs = _get_inputs(body_out)
+    loop_ctx_input = inputs.get("loop_ctx")
+    chain = set()
+    if is_link(loop_ctx_input):
+        chain = set(_loop_ctx_chain(dynprompt, body_in_id, loop_ctx_input[0]))
+    for nid in sorted(chain):
+        base_class_type = _base_class_type(_get_class_type(get_node(dynprompt, nid)))
+        if base_class_type.startswith("MieLoopStateSet"):
+            return "BodyOut loop_ctx chain has StateSet nodes"
+    if is_link(inputs.get("state_json")):
+        return "BodyOut state_json is computed per round"
+    for nid, base_class_type in sorted(detect_result.get("node_types", {}).items()):
+        if (
+            base_class_type.startswith("MieLoopStateSet")
+            or base_class_type == "MieLoopStateCleanupImage"
+        ):
+            return f"body node {nid} ({base_class_type}) carries state across rounds"
+        if _is_collector_class(base_class_type) and str(nid) not in chain:
+            return (
+                f"body node {nid} ({base_class_type}) collects off the BodyOut "
+                "loop_ctx chain, so its round order cannot be kept"
+            )
+    return ""
+
+
+def _unrolled_round_ctxs(next_ctx, rounds):
+    """ctx snapshots for rounds ``next_ctx.index`` .. +rounds-1; the last one
+    records where its chunk began so its End can account for every round."""
+    first = int(next_ctx["index"])
+    count = int(next_ctx["count"])
+    ctxs = [next_ctx]
+    for idx in range(first + 1, first + rounds):
+        round_ctx = _copy_loop_ctx(next_ctx)
+        round_ctx["index"] = idx
+        round_ctx["current_params"] = _loop_params_at(round_ctx, idx)
+        round_ctx["is_last"] = idx == count - 1
+        ctxs.append(round_ctx)
+    ctxs[-1]["meta"]["unroll_first"] = first
+    return ctxs
+
+
+def _expand_prefix(next_ctx, end_id):
+    expand_root = str(next_ctx.get("meta", {}).get("expand_root") or end_id)
+    round_idx = int(next_ctx.get("index", 0))
+    return f"{expand_root}.r{round_idx}."
+
+
+_ROUND_IDX_INPUT = "__mie_loop_round_idx__"
+_UNROLL_JOIN_ID = "__mie_loop_unroll_join__"
+
+
+class _ExpandTemplate:
+    """Clone topology of one run's expand graph, compiled from the first
+    built round and re-instantiated for every later round.
+
+    Within a run everything that shapes the clone graph is fixed (template
+    prompt, cached detect_result, cached node index), so rounds differ only
+    in the id prefix, the MieLoopResume ``loop_ctx_json`` and the business
+    nodes' ``__mie_loop_round_idx__``. Each entry is
+    ``(local_id, class_type, override_display_id, inputs)`` in build order;
+    internal links are stored as ``(local_id, out_idx)`` tuples and re-
+    prefixed per round, everything else is passed through unchanged.
+    """
+
+    def __init__(self, entries, resume_local_id, end_local_id):
+        self.entries = entries
+        self.resume_local_id = resume_local_id
+        self.end_local_id = end_local_id
+        # Local id of the cloned BodyOut feeding the End clone (unroll joins it).
+        self.body_out_local_id = None
+        for local_id, _class_type, _display_id, inputs in entries:
+            if local_id == end_local_id and isinstance(inputs.get("loop_ctx"), tuple):
+                self.body_out_local_id = inputs["loop_ctx"][0]
+
+    @classmethod
+    def compile(cls, expand_graph, prefix, end_built_node):
+        local_ids = {
+            nid[len(prefix):]: nid for nid in expand_graph if str(nid).startswith(prefix)
+        }
+        if len(local_ids) != len(expand_graph):
+            return None
+        end_local_id = str(end_built_node.id)[len(prefix):]
+        resume_class = add_suffix("MieLoopResume")
+        resume_local_id = None
+        entries = []
+        for full_id, node in expand_graph.items():
+            local_id = full_id[len(prefix):]
+            if node.get("class_type") == resume_class:
+                resume_local_id = local_id
+            inputs = {}
+            for name, value in (node.get("inputs") or {}).items():
+                if is_link(value) and isinstance(value[0], str) and value[0].startswith(prefix) \
+                        and value[0][len(prefix):] in local_ids:
+                    inputs[name] = (value[0][len(prefix):], int(value[1]))
+                else:
+                    inputs[name] = value
+            entries.append(
+                (local_id, node.get("class_type"), node.get("override_display_id"), inputs)
+            )
+        if resume_local_id is None or end_local_id not in local_ids:
+            return None
+        return cls(entries, resume_local_id, end_local_id)
+
+    def _add_round(
+        self, graph, prefix, round_ctx, loop_ctx_json, with_end=True, end_inputs=None,
+        resume_inputs=None,
+    ):
+        """Clone one round into ``graph`` and return its End clone (if built);
+        ``end_inputs`` / ``resume_inputs`` add to the inputs of the End / Resume
+        clones."""
+        round_idx = int(round_ctx.get("index", 0))
+        end_built_node = None
+        for local_id, class_type, display_id, inputs in self.entries:
+            is_end = local_id == self.end_local_id
+            if is_end and not with_end:
+                continue
+            new_inputs = {}
+            for name, value in inputs.items():
+                if isinstance(value, tuple):
+                    new_inputs[name] = [prefix + value[0], value[1]]
+                else:
+                    new_inputs[name] = value
+            if local_id == self.resume_local_id:
+                new_inputs["loop_ctx_json"] = loop_ctx_json
+                if resume_inputs:
+                    new_inputs.update(resume_inputs)
+            if _ROUND_IDX_INPUT in new_inputs:
+                new_inputs[_ROUND_IDX_INPUT] = round_idx
+            if is_end and end_inputs:
+                new_inputs.update(end_inputs)
+            node = graph.node(class_type, local_id, **new_inputs)
+            if display_id is not None:
+                node.set_override_display_id(display_id)
+            if is_end:
+                end_built_node = node
+        return end_built_node
+
+    def instantiate(self, next_ctx, end_id):
+        prefix = _expand_prefix(next_ctx, end_id)
+        graph = GraphBuilder(prefix=prefix)
+        end_built_node = self._add_round(graph, prefix, next_ctx, _resume_payload(next_ctx))
+        return graph.finalize(), end_built_node
+
+    def instantiate_unrolled(self, round_ctxs, end_id, serial=False):
+        """Clone several consecutive rounds of a stateless body into one graph.
+
+        Each round keeps its own prefix and Resume snapshot; only the last
+        one gets an End clone. MieLoopUnrollJoin nodes chain the rounds'
+        BodyOut outputs into that End, so it runs once every round of the
+        chunk has reached BodyOut while the bodies stay independent.
+        ``serial`` (bodies with collectors) also hangs each round's Resume
+        off the previous round's BodyOut: the rounds then run in order and
+        carry the collector slots forward, so items land in round order.
+        """
+        expand_graph = {}
+        end_built_node = None
+        after = None
+        prev_body_out = None
+        keep = len(round_ctxs) + 1
+        for pos, round_ctx in enumerate(round_ctxs):
+            prefix = _expand_prefix(round_ctx, end_id)
+            graph = GraphBuilder(prefix=prefix)
+            body_out = prefix + self.body_out_local_id
+            tail = [body_out, 0], [body_out, 1]
+            if after is not None:
+                join = graph.node(
+                    add_suffix("MieLoopUnrollJoin"), _UNROLL_JOIN_ID,
+                    loop_ctx=[body_out, 0], state_json=[body_out, 1], after=after,
+                )
+                tail = join.out(0), join.out(1)
+            last = pos == len(round_ctxs) - 1
+            built = self._add_round(
+                graph, prefix, round_ctx, _resume_payload(round_ctx, keep=keep),
+                with_end=last, end_inputs={"loop_ctx": tail[0], "state_json": tail[1]},
+                resume_inputs=(
+                    {"after": [prev_body_out, 0]} if serial and prev_body_out else None
+                ),
+            )
+            if last:
+                end_built_node = built
+            after = tail[0]
+            prev_body_out = body_out
+            expand_graph.update(graph.finalize())
+        return expand_graph, end_built_node
+
+
 def _build_expand_graph_for_next_round(
-    next_ctx, dynprompt, body_in_id, body_out_id, end_id, detect_result, debug=False
+    next_ctx, dynprompt, body_in_id, body_out_id, end_id, detect_result, debug=False,
+    node_index=None,
 ):
     if GraphBuilder is None:
         raise ValueError("GraphBuilder is unavailable in current ComfyUI runtime")
@@ -1009,7 +2663,9 @@ def _build_expand_graph_for_next_round(
     backward_set = {str(x) for x in detect_result.get("backward_set", [])}
     forward_set = {str(x) for x in detect_result.get("forward_set", [])}
     protocol_nodes = {str(body_out_id), str(end_id)}
-    all_nodes = _get_all_nodes(dynprompt)
+    if node_index is None:
+        node_index = _build_node_index(dynprompt)
+    all_nodes = node_index.nodes
     # Plan A (Flat Prefix): build with an explicit prefix so execution depth and
     # round count decouple. ComfyUI's engine registers expand-graph node ids as-is
     # (execution.py: add_ephemeral_node(node_id, ...)); the default GraphBuilder()
@@ -1018,9 +2674,7 @@ def _build_expand_graph_for_next_round(
     # used as-is, so ids stay flat (e.g. 453.r5.369) regardless of depth.
     # expand_root is pinned for the whole run_id lifetime by MieLoopEnd.execute;
     # fall back to end_id for old loop_ctx / fixtures that never set it.
-    expand_root = str(next_ctx.get("meta", {}).get("expand_root") or end_id)
-    round_idx = int(next_ctx.get("index", 0))
-    flat_prefix = f"{expand_root}.r{round_idx}."
+    flat_prefix = _expand_prefix(next_ctx, end_id)
     graph = GraphBuilder(prefix=flat_prefix)
     resume_node_id = "__mie_loop_resume__"
     while resume_node_id in all_nodes:
@@ -1028,7 +2682,7 @@ def _build_expand_graph_for_next_round(
     resume_node = graph.node(
         add_suffix("MieLoopResume"),
         resume_node_id,
-        loop_ctx_json=json.dumps(next_ctx, ensure_ascii=False),
+        loop_ctx_json=_resume_payload(next_ctx),
     )
     built_nodes = {}
     visiting = set()
@@ -1051,29 +2705,7 @@ def _build_expand_graph_for_next_round(
             return False
         node = get_node(dynprompt, nid)
         base_class_type = _base_class_type(_get_class_type(node))
-        return not _is_excluded_output_class(base_class_type)
-
-    def loop_ctx_chain_has_stateful_dependency(node_id, visited=None):
-        nid = str(node_id)
-        if visited is None:
-            visited = set()
-        if nid in visited:
-            return False
-        visited.add(nid)
-        if nid == str(body_in_id):
-            return False
-        node = get_node(dynprompt, nid)
-        if not isinstance(node, dict):
-            return False
-        base_class_type = _base_class_type(_get_class_type(node))
-        if base_class_type.startswith("MieLoopStateSet") or _is_collector_class(
-            base_class_type
-        ):
-            return True
-        loop_ctx_input = _get_inputs(node).get("loop_ctx")
-        if is_link(loop_ctx_input):
-            return loop_ctx_chain_has_stateful_dependency(loop_ctx_input[0], visited)
-        return False
+        return not _is_excluded_output_class(base_class_type)
 
     def build_node(old_id):
         oid = str(old_id)
@@ -1129,7 +2761,9 @@ def _build_expand_graph_for_next_round(
                 original_loop_ctx = old_inputs.get("loop_ctx")
                 if is_link(original_loop_ctx):
                     original_src_id = str(original_loop_ctx[0])
-                    if not loop_ctx_chain_has_stateful_dependency(original_src_id):
+                    if not loop_ctx_chain_has_stateful_dependency(
+                        dynprompt, body_in_id, original_src_id
+                    ):
                         new_inputs["loop_ctx"] = resume_node.out(0)
                 else:
                     new_inputs["loop_ctx"] = resume_node.out(0)
@@ -1140,7 +2774,7 @@ def _build_expand_graph_for_next_round(
                 new_inputs["loop_ctx"] = body_out_node.out(0)
                 new_inputs["state_json"] = body_out_node.out(1)
             if oid in business_set:
-                new_inputs["__mie_loop_round_idx__"] = int(next_ctx.get("index", 0))
+                new_inputs[_ROUND_IDX_INPUT] = int(next_ctx.get("index", 0))
             # Plan B: protocol close-nodes (End/BodyOut) are keyed by a fixed Recurse
             # sentinel so repeated nesting doesn't stack the template id in the path.
             # All other nodes (business/intermediate) keep their template id as the
@@ -1163,16 +2797,7 @@ def _build_expand_graph_for_next_round(
         if nid in walked:
             return
         walked.add(nid)
-        for candidate_id, candidate_node in all_nodes.items():
-            cid = str(candidate_id)
-            inputs = _get_inputs(candidate_node)
-            has_edge = False
-            for input_value in inputs.values():
-                if is_link(input_value) and str(input_value[0]) == nid:
-                    has_edge = True
-                    break
-            if not has_edge:
-                continue
+        for cid in node_index.consumers_of(nid):
             if should_clone(cid):
                 build_node(cid)
             walk_from_body_in(cid)
@@ -1193,19 +2818,19 @@ def _build_expand_graph_for_next_round(
     # in body_nodes_raw (backward chain ∩ forward chain) because:
     #   - backward chain from body_out (450) walks input chain, doesn't reach OUTPUT_NODE leaves
     #   - forward chain from body_in (446) walks downstream of 446, doesn't reach 351 output users
-    # So we must scan all_nodes directly. All other body nodes (in built_nodes) are kept
-    # as-is; this pass only ADDS whitelist nodes that were missed.
+    # So we must look them up over the whole graph (via node_index.by_class, no full
+    # scan). All other body nodes (in built_nodes) are kept as-is; this pass only
+    # ADDS whitelist nodes that were missed.
     cache_write_set = _get_cache_write_whitelist()
     post_pass_candidates = []
-    for nid, n in all_nodes.items():
-        if str(nid) in built_nodes:
+    for nid in node_index.ids_of_classes(cache_write_set):
+        if nid in built_nodes:
             continue
-        if not isinstance(n, dict):
+        if not isinstance(all_nodes.get(nid), dict):
             continue
-        base_class_type = _base_class_type(_get_class_type(n))
-        if base_class_type in cache_write_set:
-            post_pass_candidates.append((str(nid), base_class_type))
-            build_node(str(nid))
+        base_class_type = _base_class_type(_get_class_type(all_nodes[nid]))
+        post_pass_candidates.append((nid, base_class_type))
+        build_node(nid)
     mie_log(
         f"LoopEndPostPass: candidates={post_pass_candidates}, "
         f"total_built_after={len(built_nodes)}"
@@ -1237,6 +2862,247 @@ def _build_expand_graph_for_next_round(
     return finalize_result, end_built_node
 
 
+def _close_round(ctx, state_patch, first_index=None):
+    """Apply BodyOut's state patch and advance ``ctx`` past its round.
+
+    Shared by MieLoopEnd and the inline driver; ``first_index`` is where an
+    unrolled chunk began (every round from there is journaled). Returns
+    ``done``.
+    """
+    ctx["state"].update(state_patch)
+    curr_index = int(ctx["index"])
+    count = int(ctx["count"])
+    _mark_round_end(ctx.get("run_id", ""), curr_index)
+    first_index = curr_index if first_index is None else int(first_index)
+    # Collector slots of a serial unrolled chunk's earlier rounds (MieLoopResume).
+    round_collectors = ctx["meta"].pop("unroll_collectors", None) or {}
+    for round_idx in range(first_index, curr_index):
+        _journal_round_end(
+            ctx, round_idx, state_patch, done=False,
+            collectors=round_collectors.get(str(round_idx)),
+        )
+    _journal_round_end(ctx, curr_index, state_patch, done=curr_index + 1 >= count)
+    if count >= 30:
+        mie_log(
+            f"LoopEnd: warning large loop count={count}, loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
+        )
+    if curr_index + 1 < count:
+        next_index = curr_index + 1
+        ctx["index"] = next_index
+        ctx["current_params"] = _loop_params_at(ctx, next_index)
+        ctx["is_last"] = next_index == count - 1
+        mie_log(
+            f"LoopEnd: loop continue: round={curr_index} -> {next_index}, count={count}, is_last={ctx['is_last']}, "
+            f"loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
+        )
+        return False
+    ctx["index"] = count - 1
+    ctx["is_last"] = True
+    _ensure_runtime_meta(ctx["run_id"])["status"] = "completed"
+    mie_log(
+        f"LoopEnd: loop completed: final_round={curr_index}, count={count}, "
+        f"loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
+    )
+    return True
+
+
+def _release_run_caches(run_id):
+    """Drop the per-run expand caches and stop the offload writer once the loop is done."""
+    # The last round's writes and its "done" journal record are queued
+    # already; nothing submits after this, so the thread can go.
+    _close_offload_writer(run_id)
+    if "_detect_cache" in RUNTIME_STORE:
+        RUNTIME_STORE["_detect_cache"].pop(run_id, None)
+    RUNTIME_STORE.get("_node_index_cache", {}).pop(run_id, None)
+    RUNTIME_STORE.get("_expand_template_cache", {}).pop(run_id, None)
+    RUNTIME_STORE.get("_ctx_snapshots", {}).pop(run_id, None)
+
+
+# =============================================================================
+# Inline driver (MieLoopEnd driver="inline")
+# ----------------------------------------------------------------------------
+# 默认的 expand 驱动每轮都让 ComfyUI 注册一批 ephemeral 节点，长循环下
+# execution id 空间、节点注册和 cache 压力随轮数线性增长。inline 驱动在第
+# 0 轮 End 处把本 run 的 expand 模板编译成一个节点调用计划（_InlineBody），
+# 只 expand 一个 MieLoopInlineRun 节点，由它在同一次节点执行内把剩余轮次
+# 依次跑完：节点实例、调用顺序、外链输入全部复用，每轮只换 loop_ctx。
+# 协议语义不变：Collector / StateSet / BodyOut 仍是同样的节点调用，
+# 每轮结束走与 End 相同的 _close_round（state 合并、journal、metrics）。
+# =============================================================================
+_INLINE_RUN_ID = "__mie_loop_inline__"
+_INLINE_EXT_PREFIX = "ext_"
+_INLINE_HIDDEN_KINDS = {"UNIQUE_ID", "DYNPROMPT", "PROMPT", "EXTRA_PNGINFO"}
+_own_node_classes = None
+
+
+def _inline_node_class(class_type):
+    """Node class for ``class_type``: ComfyUI's registry first, then this module."""
+    global _own_node_classes
+    registry = getattr(sys.modules.get("nodes"), "NODE_CLASS_MAPPINGS", None)
+    if isinstance(registry, dict) and class_type in registry:
+        return registry[class_type]
+    if _own_node_classes is None:
+        _own_node_classes = {
+            add_suffix(name): obj
+            for name, obj in globals().items()
+            if name.startswith("Mie") and isinstance(obj, type) and hasattr(obj, "FUNCTION")
+        }
+    return _own_node_classes.get(class_type)
+
+
+def _inline_call_node(node_cls, instance, inputs, hidden):
+    """Call one node the way ComfyUI's executor does for a single-item input.
+
+    Non-link values the node does not declare are dropped (as ComfyUI drops
+    them); declared hidden inputs are filled from ``hidden``. Returns the raw
+    FUNCTION result.
+    """
+    input_types = node_cls.INPUT_TYPES()
+    declared = set(input_types.get("required", {})) | set(input_types.get("optional", {}))
+    kwargs = {}
+    for name, (is_link_value, value) in inputs.items():
+        if is_link_value or name in declared:
+            kwargs[name] = value
+    for name, kind in input_types.get("hidden", {}).items():
+        if kind in _INLINE_HIDDEN_KINDS:
+            kwargs[name] = hidden.get(kind)
+    return getattr(instance, node_cls.FUNCTION)(**kwargs)
+
+
+def _inline_node_blocker(class_type, node_cls):
+    if node_cls is None:
+        return f"class {class_type} is not registered"
+    if not isinstance(getattr(node_cls, "FUNCTION", None), str):
+        return f"class {class_type} has no FUNCTION"
+    if getattr(node_cls, "INPUT_IS_LIST", False) or any(getattr(node_cls, "OUTPUT_IS_LIST", ()) or ()):
+        return f"class {class_type} uses list inputs/outputs"
+    if hasattr(node_cls, "check_lazy_status"):
+        return f"class {class_type} has lazy inputs"
+    # Direct calls return no UI results to the frontend and skip ComfyUI's
+    # per-node validation, so output / validated nodes stay on expand.
+    if getattr(node_cls, "OUTPUT_NODE", False):
+        return f"class {class_type} is an output node"
+    if hasattr(node_cls, "VALIDATE_INPUTS"):
+        return f"class {class_type} has VALIDATE_INPUTS"
+    input_types = node_cls.INPUT_TYPES()
+    for section in ("required", "optional"):
+        for spec in input_types.get(section, {}).values():
+            if isinstance(spec, (list, tuple)) and len(spec) > 1 and isinstance(spec[1], dict) \
+                    and spec[1].get("lazy"):
+                return f"class {class_type} has lazy inputs"
+    return ""
+
+
+class _InlineBody:
+    """One run's expand template compiled into direct node calls.
+
+    ``steps`` are ``(local_id, node_cls, instance, inputs)`` in template build
+    order (dependencies first). Each input is ``(kind, value)``: ``"local"``
+    with a ``(local_id, out_idx)`` tuple, ``"ext"`` with the runner input name
+    that carries an outside link, or ``"value"`` with a constant. Outside links
+    are handed to MieLoopInlineRun as inputs so ComfyUI resolves them once.
+    """
+
+    def __init__(self, steps, externals, resume_local_id, end_inputs):
+        self.steps = steps
+        self.externals = externals
+        self.resume_local_id = resume_local_id
+        self.end_inputs = end_inputs
+
+    @classmethod
+    def compile(cls, template):
+        """Return ``(plan, "")`` or ``(None, reason)``."""
+        externals = {}
+        ext_names = {}
+
+        def convert(value):
+            if isinstance(value, tuple):
+                return ("local", value)
+            if is_link(value):
+                key = (str(value[0]), int(value[1]))
+                if key not in ext_names:
+                    ext_names[key] = f"{_INLINE_EXT_PREFIX}{len(ext_names)}"
+                    externals[ext_names[key]] = [key[0], key[1]]
+                return ("ext", ext_names[key])
+            return ("value", value)
+
+        steps = []
+        end_inputs = None
+        for local_id, class_type, _display_id, inputs in template.entries:
+            converted = {name: convert(value) for name, value in inputs.items()}
+            if local_id == template.end_local_id:
+                end_inputs = converted
+                continue
+            if local_id == template.resume_local_id:
+                continue
+            node_cls = _inline_node_class(class_type)
+            reason = _inline_node_blocker(class_type, node_cls)
+            if reason:
+                return None, f"node {local_id}: {reason}"
+            steps.append((local_id, node_cls, node_cls(), converted))
+        if end_inputs is None or not all(
+            name in end_inputs for name in ("loop_ctx", "state_json")
+        ):
+            return None, "End clone has no loop_ctx/state_json link"
+        return cls(steps, externals, template.resume_local_id, end_inputs), ""
+
+    def instantiate(self, next_ctx, end_id):
+        """Expand graph holding just the runner for the remaining rounds."""
+        graph = GraphBuilder(prefix=_expand_prefix(next_ctx, end_id))
+        runner = graph.node(
+            add_suffix("MieLoopInlineRun"), _INLINE_RUN_ID,
+            loop_ctx_json=_resume_payload(next_ctx), **self.externals,
+        )
+        runner.set_override_display_id(str(end_id))
+        return graph.finalize(), runner
+
+    def run_round(self, ctx, prefix, ext_values, hidden):
+        """Run the body once for ``ctx``; returns End's ``(loop_ctx, state_json)``."""
+        outputs = {self.resume_local_id: (_copy_loop_ctx(ctx),)}
+
+        def resolve(kind, value):
+            if kind == "local":
+                return True, outputs[value[0]][value[1]]
+            if kind == "ext":
+                return True, ext_values[value]
+            return False, value
+
+        for local_id, node_cls, instance, inputs in self.steps:
+            if _comfy_model_management is not None:
+                _comfy_model_management.throw_exception_if_processing_interrupted()
+            node_hidden = dict(hidden, UNIQUE_ID=prefix + local_id)
+            result = _inline_call_node(
+                node_cls, instance,
+                {name: resolve(*spec) for name, spec in inputs.items()}, node_hidden,
+            )
+            if isinstance(result, dict):
+                if "expand" in result:
+                    raise ValueError(
+                        f"LoopInlineRun: node {local_id} ({node_cls.__name__}) returned an "
+                        f"expand graph; use MieLoopEnd driver=expand for this loop"
+                    )
+                result = result.get("result") or ()
+            outputs[local_id] = tuple(result)
+        return tuple(resolve(*self.end_inputs[name])[1] for name in ("loop_ctx", "state_json"))
+
+
+def _inline_plan(template, detect_result, run_id):
+    """The run's inline plan, or None (reason logged once) to stay on expand."""
+    if "inline_blocker" not in detect_result:
+        plan, reason = (None, "expand template unavailable")
+        if template is not None:
+            plan, reason = _InlineBody.compile(template)
+            template.inline_plan = plan
+        detect_result["inline_blocker"] = reason
+        if reason:
+            mie_log(f"LoopEnd: driver=inline ignored, expanding per round: {reason}, run_id={run_id}")
+    if detect_result["inline_blocker"] or template is None:
+        return None
+    if getattr(template, "inline_plan", None) is None:
+        template.inline_plan, _ = _InlineBody.compile(template)
+    return template.inline_plan
+
+
 def _merge_tensor_batches_incremental(
     raw_batches, *, load_disk_item, validate_batch, cat_dim=0, log_progress=None
 ):
@@ -1331,6 +3197,11 @@ def _log_finalize_merge_failed(kind, ctx, disk_paths):
 # mid-loop. 5 batches per chunk keeps phase-1 peak at ~2x per-batch bytes
 # (~7 GB for the SCAIL-2 30-batch case).
 _MIE_LOOP_IMG_MERGE_CHUNK_SIZE = 5
+# Single-pass merge copies each batch straight into the pre-sized memmap
+# (no _mie_chunk_*.pt files). Off by default until it has been compared
+# against the chunked path on real runs; the merge-stats log line below
+# reports bytes_written / peak_rss for whichever mode ran.
+_MIE_LOOP_IMG_MERGE_SINGLE_PASS = False
 
 
 def _merge_images_for_ctx(loop_ctx, *, avoid_oom=True):
@@ -1355,6 +3226,15 @@ def _merge_images_for_ctx(loop_ctx, *, avoid_oom=True):
     ref = _ensure_collector_slot(ctx, "image").get("ref")
     if not ref:
         return EMPTY_IMAGES, ""
+    # Background offload writes must be on disk before the merge reads them;
+    # a failed write raises here, before the collector items are popped.
+    phase_start = time.perf_counter()
+    run_id = ctx.get("run_id", "")
+    _flush_offload_writer(run_id)
+    if RUNTIME_STORE.get("meta", {}).get(run_id, {}).get("status") == "completed":
+        # Finalized: no further rounds will submit to this run's writer.
+        _close_offload_writer(run_id)
+    finalize_metrics = {"flush_s": time.perf_counter() - phase_start}
     raw_batches = _pop_collector_items("image", ref)
     run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
     _remove_runtime_collector_ref(run_meta, "image", ref)
@@ -1387,7 +3267,11 @@ def _merge_images_for_ctx(loop_ctx, *, avoid_oom=True):
     try:
         out_path.parent.mkdir(parents=True, exist_ok=True)
         # Materialize any in-memory batches so the chunked merge sees disk items.
+        phase_start = time.perf_counter()
         disk_items = _save_inmem_batches_to_disk(raw_batches, out_path.parent, "image")
+        finalize_metrics["materialize_s"] = time.perf_counter() - phase_start
+        merge_stats = {}
+        phase_start = time.perf_counter()
         try:
             _chunked_disk_merge(
                 disk_items,
@@ -1397,6 +3281,16 @@ def _merge_images_for_ctx(loop_ctx, *, avoid_oom=True):
                 validate_batch=validate,
                 log_progress=progress_cb,
                 avoid_oom=avoid_oom,
+                single_pass=_MIE_LOOP_IMG_MERGE_SINGLE_PASS,
+                stats=merge_stats,
+            )
+            finalize_metrics["merge_s"] = time.perf_counter() - phase_start
+            peak_rss = merge_stats.get("peak_rss_bytes")
+            mie_log(
+                f"LoopFinalizeImages: merge stats loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, "
+                f"mode={merge_stats.get('mode')}, frames={merge_stats.get('frames')}, "
+                f"bytes_written={merge_stats.get('bytes_written', 0) / 1e9:.2f} GB, "
+                f"peak_rss={'n/a' if peak_rss is None else f'{peak_rss / 1e9:.2f} GB'}"
             )
         finally:
             # Cleanup the inmem-saved temp .pt files (they live next to out_path).
@@ -1410,14 +3304,28 @@ def _merge_images_for_ctx(loop_ctx, *, avoid_oom=True):
         # Best-effort load for the IMAGE output. If the final tensor is too big
         # for the system RAM, fall back to EMPTY_IMAGES and let the user recover
         # via LoadAny on merged_path.
+        phase_start = time.perf_counter()
         try:
-            loaded = torch.load(str(out_path), map_location="cpu", weights_only=False)
+            # mmap: the IMAGE is a copy-on-write view over merged.pt, so the
+            # merged run is paged in as consumers read it, not up front.
+            loaded = load_tensor_file(out_path, mmap=True)
         except Exception as e:
             mie_log(
                 f"LoopFinalizeImages: post-merge load failed for {out_path}: {e}; "
                 "returning EMPTY_IMAGES -- use MERGED_PATH with LoadAny|Mie to recover."
             )
             loaded = EMPTY_IMAGES
+        finalize_metrics["load_s"] = time.perf_counter() - phase_start
+        _record_finalize_metrics(
+            ctx.get("run_id", ""), "image",
+            batches=len(raw_batches),
+            **finalize_metrics,
+            merge_mode=merge_stats.get("mode"),
+            merge_phase_s=merge_stats.get("phase_s", {}),
+            frames=merge_stats.get("frames"),
+            bytes_written=merge_stats.get("bytes_written"),
+            peak_rss_bytes=merge_stats.get("peak_rss_bytes"),
+        )
         merged_path = str(out_path)
         merged_ok = True
         return loaded, merged_path
@@ -1443,21 +3351,20 @@ def _grid_images(images, cols=2, pad=4):
         cols = 1
     if pad < 0:
         pad = 0
-    for idx in range(1, b):
-        if tuple(images[idx].shape) != (h, w, c):
-            raise ValueError("MieImageGrid received mismatched image sizes")
     cols = min(cols, b)
     rows = (b + cols - 1) // cols
     grid_h = rows * h + (rows - 1) * pad
     grid_w = cols * w + (cols - 1) * pad
-    grid = torch.zeros((1, grid_h, grid_w, c), dtype=images.dtype, device=images.device)
-    for i in range(b):
-        r = i // cols
-        cc = i % cols
-        y = r * (h + pad)
-        x = cc * (w + pad)
-        grid[0, y : y + h, x : x + w, :] = images[i]
-    return grid
+    # One pad op fills the last row with blank tiles and gives every tile a
+    # right/bottom gutter; the tiles then fold into the grid by reshape and
+    # the trailing gutter is trimmed.
+    tiles = torch.nn.functional.pad(images, (0, 0, 0, pad, 0, pad, 0, rows * cols - b))
+    grid = (
+        tiles.reshape(rows, cols, h + pad, w + pad, c)
+        .permute(0, 2, 1, 3, 4)
+        .reshape(rows * (h + pad), cols * (w + pad), c)
+    )
+    return grid[:grid_h, :grid_w].unsqueeze(0).contiguous()
 
 
 class MieLoopStart:
@@ -1471,7 +3378,7 @@ class MieLoopStart:
                     {"default": "int"},
                 ),
                 "param_mode": (
-                    ["list", "range", "decrement"],
+                    ["list", "range", "decrement", "file"],
                     {"default": "list"},
                 ),
             },
@@ -1500,8 +3407,43 @@ class MieLoopStart:
                 "int_decrement_step": ("INT", {"default": 2, "min": 1}),
                 "float_decrement_total": ("FLOAT", {"default": 5.0, "min": 0.0}),
                 "float_decrement_step": ("FLOAT", {"default": 2.0, "min": 1e-9}),
+                "params_file": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": (
+                            "param_mode=file: a .jsonl / .ndjson or .csv file, one round per row. "
+                            "JSONL rows are objects (json) or values; CSV needs a header and, for "
+                            "int/float/string, a 'value' column. Rows are read one per round."
+                        ),
+                    },
+                ),
                 "meta_json": ("STRING", {"default": "{}"}),
                 "resume_loop_ctx": ("STRING", {"default": ""}),
+                "trace_path": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": (
+                            "Optional JSONL file. Every per-round timing (expand build, body "
+                            "detect, collector bytes, offload writes, finalize phases) is "
+                            "appended as one JSON line. Empty = no trace; MieLoopStats still works."
+                        ),
+                    },
+                ),
+                "journal_dir": (
+                    "STRING",
+                    {
+                        "default": "",
+                        "tooltip": (
+                            "Optional directory for a crash-safe run journal. Collected images / "
+                            "audio are written there (as with offload_to_disk) and every finished "
+                            "round is logged to <loop_id>.journal.jsonl. Queueing the same workflow "
+                            "again after a crash resumes at the first unfinished round with all "
+                            "collected items re-attached. Empty = no journal."
+                        ),
+                    },
+                ),
             },
         }
 
@@ -1533,18 +3475,41 @@ class MieLoopStart:
         meta_json="{}",
         resume_loop_ctx="",
         params_mode=None,
+        trace_path="",
+        params_file="",
+        journal_dir="",
     ):
-        _prune_runtime_store()
+        # O(expired + orphaned): due heap entries and released refs only.
+        _reclaim_expired_runtime()
+        trace_path = str(trace_path or "").strip()
+        journal_dir = str(journal_dir or "").strip()
         resume_raw = (resume_loop_ctx or "").strip()
         if resume_raw:
             resumed = _parse_json_object(resume_raw, "resume_loop_ctx")
-            ctx = copy.deepcopy(_validate_loop_ctx(resumed))
+            ctx = _copy_loop_ctx(resumed)
             if str(ctx.get("loop_id", "")) != str(loop_id):
                 raise ValueError("resume_loop_ctx.loop_id does not match loop_id input")
             if int(ctx.get("index", 0)) >= int(ctx.get("count", 0)):
                 raise ValueError("resume_loop_ctx.index is out of range")
             _ensure_collectors(ctx)
             _ensure_meta_fields(ctx)
+            if trace_path:
+                ctx["meta"]["trace_path"] = trace_path
+            journal_path = str(ctx["meta"].get("journal_path") or "")
+            if journal_path:
+                # After a restart RUNTIME_STORE is empty: rebuild the collectors
+                # from the journal, up to the requested index.
+                point = _load_journal_resume_point(
+                    journal_path, run_id=ctx["run_id"], limit=int(ctx["index"])
+                )
+                if point is not None:
+                    if point["index"] < int(ctx["index"]):
+                        mie_log(
+                            f"LoopStart: journal has rounds up to {point['index']} on disk, "
+                            f"resuming there instead of index={ctx['index']}"
+                        )
+                    _journal_reattach(ctx, point)
+            _start_loop_metrics(ctx)
             mie_log(
                 f"LoopStart: resumed loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, index={ctx['index']}, count={ctx['count']}"
             )
@@ -1552,13 +3517,9 @@ class MieLoopStart:
         resolved_param_type, resolved_param_mode = _resolve_param_selection(
             param_type, param_mode, params_mode=params_mode
         )
-        params_list = _parse_params_list(
-            param_type=resolved_param_type,
-            param_mode=resolved_param_mode,
-            int_list=int_list,
-            float_list=float_list,
-            string_list=string_list,
-            json_list=json_list,
+        params_source, params_offsets = _params_source(
+            resolved_param_type,
+            resolved_param_mode,
             int_range_start=int_range_start,
             int_range_end=int_range_end,
             int_range_step=int_range_step,
@@ -1569,12 +3530,36 @@ class MieLoopStart:
             int_decrement_step=int_decrement_step,
             float_decrement_total=float_decrement_total,
             float_decrement_step=float_decrement_step,
+            params_file=params_file,
         )
+        if params_source is None:
+            params_list = _parse_params_list(
+                param_type=resolved_param_type,
+                param_mode=resolved_param_mode,
+                int_list=int_list,
+                float_list=float_list,
+                string_list=string_list,
+                json_list=json_list,
+            )
+            count = len(params_list)
+        else:
+            # Computed per round by _loop_params_at; the ctx stays O(1).
+            params_list = []
+            count = params_source["count"]
         initial_state = _parse_json_object(initial_state_json, "initial_state_json")
         meta = _parse_json_object(meta_json, "meta_json")
-        count = len(params_list)
+        if trace_path:
+            meta["trace_path"] = trace_path
+        run_id = uuid.uuid4().hex[:24]
+        resume_point = None
+        if journal_dir and count > 0:
+            meta["journal_dir"] = journal_dir
+            meta["journal_path"] = _journal_path(journal_dir, loop_id)
+            fingerprint = _journal_fingerprint(count, params_list, params_source, initial_state)
+            resume_point = _load_journal_resume_point(meta["journal_path"], fingerprint)
+            if resume_point is not None:
+                run_id = resume_point["run_id"]
         if count == 0:
-            run_id = uuid.uuid4().hex[:24]
             loop_ctx = {
                 "version": 3,
                 "loop_id": str(loop_id),
@@ -1610,7 +3595,6 @@ class MieLoopStart:
                 f"LoopStart: empty params, loop_id={loop_ctx['loop_id']}, run_id={run_id}"
             )
             return (loop_ctx, 0, 0, True)
-        run_id = uuid.uuid4().hex[:24]
         loop_ctx = {
             "version": 3,
             "loop_id": str(loop_id),
@@ -1620,7 +3604,7 @@ class MieLoopStart:
             "count": count,
             "is_last": count == 1,
             "params_list": params_list,
-            "current_params": params_list[0],
+            "current_params": {},
             "state": initial_state,
             "collectors": {
                 "image": {"ref": None, "count": 0},
@@ -1642,11 +3626,38 @@ class MieLoopStart:
         RUNTIME_STORE["meta"][run_id]["loop_id"] = str(loop_id)
         RUNTIME_STORE["meta"][run_id]["count"] = count
         RUNTIME_STORE["meta"][run_id]["status"] = "running"
-        mie_log(
-            f"LoopStart: initialized loop_id={loop_ctx['loop_id']}, run_id={run_id}, count={count}, "
-            f"param_type={resolved_param_type}, param_mode={resolved_param_mode}"
-        )
-        return (loop_ctx, 0, count, loop_ctx["is_last"])
+        if params_source is None:
+            # Single shared params table for the run; _copy_loop_ctx re-attaches it.
+            RUNTIME_STORE["meta"][run_id]["params_list"] = params_list
+        else:
+            loop_ctx["params_source"] = params_source
+            if params_offsets is not None:
+                RUNTIME_STORE["meta"][run_id]["params_offsets"] = {
+                    "path": params_source["path"],
+                    "mtime_ns": params_source["mtime_ns"],
+                    "offsets": params_offsets,
+                }
+        loop_ctx["current_params"] = _loop_params_at(loop_ctx, 0)
+        if resume_point is not None:
+            _journal_reattach(loop_ctx, resume_point)
+        elif journal_dir:
+            RUNTIME_STORE["meta"][run_id]["journal_path"] = meta["journal_path"]
+            _journal_write(
+                meta["journal_path"], run_id, "start", sync=True,
+                loop_id=str(loop_id), count=count, fingerprint=fingerprint,
+            )
+        _start_loop_metrics(loop_ctx)
+        if resume_point is not None:
+            mie_log(
+                f"LoopStart: resumed from journal loop_id={loop_ctx['loop_id']}, run_id={run_id}, "
+                f"index={loop_ctx['index']}, count={count}, journal={meta['journal_path']}"
+            )
+        else:
+            mie_log(
+                f"LoopStart: initialized loop_id={loop_ctx['loop_id']}, run_id={run_id}, count={count}, "
+                f"param_type={resolved_param_type}, param_mode={resolved_param_mode}"
+            )
+        return (loop_ctx, int(loop_ctx["index"]), count, loop_ctx["is_last"])
 
 
 # =============================================================================
@@ -1654,6 +3665,8 @@ class MieLoopStart:
 # ----------------------------------------------------------------------------
 # 这是 expand 图内部节点，用于注入下一轮的 loop_ctx。
 # 用户不应在工作流中手动创建此节点。
+# loop_ctx_json 通常只是 {"__mie_ctx_handle__": {run_id, index}} 句柄，
+# 由 RUNTIME_STORE["_ctx_snapshots"] 解析；完整 loop_ctx JSON 仍兼容。
 # =============================================================================
 class MieLoopResume:
     @classmethod
@@ -1661,7 +3674,10 @@ class MieLoopResume:
         return {
             "required": {
                 "loop_ctx_json": ("STRING", {"default": "{}"}),
-            }
+            },
+            "optional": {
+                "after": ("MIE_LOOP_CTX",),
+            },
         }
 
     RETURN_TYPES = ("MIE_LOOP_CTX",)
@@ -1669,13 +3685,123 @@ class MieLoopResume:
     FUNCTION = "execute"
     CATEGORY = f"{MY_CATEGORY}/_internal"
 
-    def execute(self, loop_ctx_json):
-        ctx = _parse_json_object(loop_ctx_json, "loop_ctx_json")
-        ctx = copy.deepcopy(_validate_loop_ctx(ctx))
+    def execute(self, loop_ctx_json, after=None):
+        payload = _parse_json_object(loop_ctx_json, "loop_ctx_json")
+        ctx = _copy_loop_ctx(_resolve_resume_payload(payload))
         _ensure_meta_fields(ctx)
+        if isinstance(after, dict):
+            # Serial unroll: continue the previous round's collectors and keep
+            # its slots for the journal record End writes for that round.
+            collectors = {
+                kind: dict(slot)
+                for kind, slot in (after.get("collectors") or {}).items()
+                if isinstance(slot, dict)
+            }
+            ctx["collectors"] = collectors
+            per_round = dict(after.get("meta", {}).get("unroll_collectors") or {})
+            per_round[str(after.get("index", 0))] = {
+                kind: dict(slot) for kind, slot in collectors.items()
+            }
+            ctx["meta"]["unroll_collectors"] = per_round
         return (ctx,)
 
 
+# =============================================================================
+# MieLoopUnrollJoin - expand graph internal use only
+# ----------------------------------------------------------------------------
+# MieLoopEnd(unroll>1) 一次 expand 多轮时，用它把各轮 BodyOut 串成一条链，
+# 最后一轮的 End 依赖链尾，从而在本批所有轮次到达 BodyOut 之后才执行。
+# loop_ctx / state_json 原样透传；after 只用于建立依赖。
+# 用户不应在工作流中手动创建此节点。
+# =============================================================================
+class MieLoopUnrollJoin:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "loop_ctx": ("MIE_LOOP_CTX",),
+                "state_json": ("STRING", {"default": "{}"}),
+            },
+            "optional": {
+                "after": (any_typ,),
+            },
+        }
+
+    RETURN_TYPES = ("MIE_LOOP_CTX", "STRING")
+    RETURN_NAMES = ("loop_ctx", "state_json")
+    FUNCTION = "execute"
+    CATEGORY = f"{MY_CATEGORY}/_internal"
+
+    def execute(self, loop_ctx, state_json="{}", after=None):
+        _ = after
+        return (loop_ctx, state_json)
+
+
+# =============================================================================
+# MieLoopInlineRun - expand graph internal use only
+# ----------------------------------------------------------------------------
+# MieLoopEnd(driver="inline") 在第 0 轮只 expand 这一个节点。它按本 run 的
+# _InlineBody 计划在一次执行内跑完剩余所有轮次，输出与最后一轮 End 相同的
+# (loop_ctx, done)。ext_* 输入是循环体引用的循环外连线，由 ComfyUI 解析一次。
+# 用户不应在工作流中手动创建此节点。
+# =============================================================================
+class MieLoopInlineRun:
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "loop_ctx_json": ("STRING", {"default": "{}"}),
+            },
+            "hidden": {
+                "dynprompt": "DYNPROMPT",
+                "prompt": "PROMPT",
+                "unique_id": "UNIQUE_ID",
+                "extra_pnginfo": "EXTRA_PNGINFO",
+            },
+        }
+
+    RETURN_TYPES = ("MIE_LOOP_CTX", "BOOLEAN")
+    RETURN_NAMES = ("loop_ctx", "done")
+    FUNCTION = "execute"
+    CATEGORY = f"{MY_CATEGORY}/_internal"
+
+    def execute(
+        self, loop_ctx_json, dynprompt=None, prompt=None, unique_id=None, extra_pnginfo=None,
+        **ext_values,
+    ):
+        payload = _parse_json_object(loop_ctx_json, "loop_ctx_json")
+        ctx = _copy_loop_ctx(_resolve_resume_payload(payload))
+        _ensure_meta_fields(ctx)
+        run_id = ctx.get("run_id", "")
+        template = RUNTIME_STORE.get("_expand_template_cache", {}).get(run_id)
+        plan = getattr(template, "inline_plan", None)
+        if plan is None:
+            raise ValueError(f"LoopInlineRun: no inline plan for run_id={run_id}")
+        end_id = ctx["meta"].get("end_id")
+        hidden = {"DYNPROMPT": dynprompt, "PROMPT": prompt, "EXTRA_PNGINFO": extra_pnginfo}
+        first_index = int(ctx["index"])
+        done = False
+        while not done:
+            round_idx = int(ctx["index"])
+            body_start = time.perf_counter()
+            out_ctx, state_json = plan.run_round(
+                ctx, _expand_prefix(ctx, end_id), ext_values, hidden
+            )
+            _record_round_metrics(
+                run_id, round_idx, inline_body_s=time.perf_counter() - body_start
+            )
+            ctx = _copy_loop_ctx(out_ctx)
+            _ensure_meta_fields(ctx)
+            done = _close_round(ctx, _parse_json_object(state_json, "state_json"))
+        _release_run_caches(run_id)
+        _reclaim_expired_runtime()
+        mie_log(
+            f"LoopInlineRun: loop_id={ctx['loop_id']}, run_id={run_id}, "
+            f"rounds={int(ctx['index']) - first_index + 1}, node_id={unique_id}, done={done}"
+        )
+        return (ctx, done)
+
+
 class MieLoopBodyIn:
     @classmethod
     def INPUT_TYPES(cls):
@@ -1698,7 +3824,7 @@ class MieLoopBodyIn:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, anchor=None, unique_id=None, dynprompt=None):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         _ensure_meta_fields(ctx)
         current_node_id = _resolve_current_node_id(
             unique_id=unique_id, dynprompt=dynprompt
@@ -1736,7 +3862,7 @@ class MieLoopBodyOut:
         unique_id=None,
         dynprompt=None,
     ):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         _ensure_meta_fields(ctx)
         current_node_id = _resolve_current_node_id(
             unique_id=unique_id, dynprompt=dynprompt
@@ -1761,6 +3887,37 @@ class MieLoopEnd:
             "optional": {
                 "state_json": ("STRING", {"default": "{}"}),
                 "debug": ("BOOLEAN", {"default": False}),
+                "unroll": (
+                    "INT",
+                    {
+                        "default": 1,
+                        "min": 1,
+                        "max": 64,
+                        "tooltip": (
+                            "Rounds per expand graph. >1 applies to bodies without StateSet* "
+                            "nodes and with a constant state_json: the next N rounds are cloned "
+                            "into one graph and the per-round expand overhead is paid once per N. "
+                            "Pure for-each bodies let ComfyUI interleave the rounds' work; bodies "
+                            "with Collect* nodes (on the BodyOut loop_ctx chain) run the rounds "
+                            "in order so items keep round order. Other bodies keep 1 round per "
+                            "expand."
+                        ),
+                    },
+                ),
+                "driver": (
+                    ["expand", "inline"],
+                    {
+                        "default": "expand",
+                        "tooltip": (
+                            "expand: every round is a new expand graph. inline: after round 0 "
+                            "the body runs for all remaining rounds inside one internal node "
+                            "(no per-round graph expansion). Bodies with unregistered, lazy, "
+                            "list-input, OUTPUT_NODE or VALIDATE_INPUTS nodes stay on expand. "
+                            "Inline rounds show no UI results and skip IS_CHANGED: every body "
+                            "node simply runs each round."
+                        ),
+                    },
+                ),
             },
             "hidden": {
                 "dynprompt": "DYNPROMPT",
@@ -1782,42 +3939,23 @@ class MieLoopEnd:
         dynprompt=None,
         unique_id=None,
         extra_pnginfo=None,
+        unroll=1,
+        driver="expand",
     ):
         _ = extra_pnginfo
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         _ensure_meta_fields(ctx)
+        # Set on the last round of an unrolled chunk: this End closes all of them.
+        unroll_first = ctx["meta"].pop("unroll_first", None)
         current_node_id = _resolve_current_node_id(
             unique_id=unique_id, dynprompt=dynprompt
         )
         if _should_record_protocol_node_id(ctx["meta"].get("end_id"), current_node_id):
             ctx["meta"]["end_id"] = current_node_id
         state_patch = _parse_json_object(state_json, "state_json")
-        ctx["state"].update(state_patch)
         curr_index = int(ctx["index"])
         count = int(ctx["count"])
-        done = False
-        if count >= 30:
-            mie_log(
-                f"LoopEnd: warning large loop count={count}, loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
-            )
-        if curr_index + 1 < count:
-            next_index = curr_index + 1
-            ctx["index"] = next_index
-            ctx["current_params"] = ctx["params_list"][next_index]
-            ctx["is_last"] = next_index == count - 1
-            mie_log(
-                f"LoopEnd: loop continue: round={curr_index} -> {next_index}, count={count}, is_last={ctx['is_last']}, "
-                f"loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
-            )
-        else:
-            done = True
-            ctx["index"] = count - 1
-            ctx["is_last"] = True
-            _ensure_runtime_meta(ctx["run_id"])["status"] = "completed"
-            mie_log(
-                f"LoopEnd: loop completed: final_round={curr_index}, count={count}, "
-                f"loop_id={ctx['loop_id']}, run_id={ctx['run_id']}"
-            )
+        done = _close_round(ctx, state_patch, first_index=unroll_first)
         body_in_id = ctx.get("meta", {}).get("body_in_id")
         body_out_id = ctx.get("meta", {}).get("body_out_id")
         detect_result = {
@@ -1836,16 +3974,29 @@ class MieLoopEnd:
         # 后续 expand 轮次直接复用。不能用 ctx 传递因为 expand 图中
         # BodyOut 的 loop_ctx 来自原始 CollectImage（无缓存）。
         run_id = ctx.get("run_id", "")
+        # Consumer index of the template prompt, built once per run_id (round 0)
+        # and shared by detection, the expand builder and its cache-write post-pass.
+        node_index = RUNTIME_STORE.setdefault("_node_index_cache", {}).get(run_id)
+        if node_index is None and dynprompt is not None:
+            node_index = _build_node_index(dynprompt)
+            RUNTIME_STORE["_node_index_cache"][run_id] = node_index
         cached_detect = RUNTIME_STORE.get("_detect_cache", {}).get(run_id)
         if cached_detect is not None:
             detect_result = cached_detect
             body_nodes_filtered = cached_detect.get("body_nodes_filtered", [])
+            _record_round_metrics(run_id, curr_index, detect_s=0.0, detect_cached=True)
         elif dynprompt is not None and body_in_id and body_out_id:
+            detect_start = time.perf_counter()
             body_nodes_filtered, detect_result = collect_loop_body(
                 body_in_id,
                 body_out_id,
                 dynprompt,
                 ctx.get("meta", {}).get("end_id"),
+                node_index=node_index,
+            )
+            _record_round_metrics(
+                run_id, curr_index,
+                detect_s=time.perf_counter() - detect_start, detect_cached=False,
             )
             # 缓存供后续 expand 轮次使用
             if "_detect_cache" not in RUNTIME_STORE:
@@ -1877,22 +4028,79 @@ class MieLoopEnd:
             # present — the enclosing expand guard checks it is truthy).
             if "expand_root" not in ctx.get("meta", {}):
                 ctx["meta"]["expand_root"] = str(ctx.get("meta", {}).get("end_id"))
-            expand_graph, end_built_node = _build_expand_graph_for_next_round(
-                next_ctx=ctx,
-                dynprompt=dynprompt,
-                body_in_id=body_in_id,
-                body_out_id=body_out_id,
-                end_id=ctx.get("meta", {}).get("end_id"),
-                detect_result=detect_result,
-                debug=bool(debug),
-            )
+            end_id = ctx.get("meta", {}).get("end_id")
+            # Compiled clone topology for this run: later rounds only patch the
+            # prefix / Resume JSON / round idx. Debug always rebuilds so the
+            # per-node ExpandNode log stays available.
+            template_cache = RUNTIME_STORE.setdefault("_expand_template_cache", {})
+            template = None if debug else template_cache.get(run_id)
+            template_hit = template is not None
+            rounds = 1
+            if int(unroll) > 1:
+                # Decided once per run; cached with the detect result.
+                if "unroll_blocker" not in detect_result:
+                    detect_result["unroll_blocker"] = _unroll_blocker(
+                        dynprompt, detect_result, body_in_id, body_out_id
+                    )
+                    if detect_result["unroll_blocker"]:
+                        mie_log(
+                            f"LoopEnd: unroll={int(unroll)} ignored, one round per expand: "
+                            f"{detect_result['unroll_blocker']}, run_id={run_id}"
+                        )
+                if not detect_result["unroll_blocker"]:
+                    rounds = min(int(unroll), count - int(ctx["index"]))
+            expand_start = time.perf_counter()
+            if template_hit:
+                expand_graph, end_built_node = None, None
+            else:
+                expand_graph, end_built_node = _build_expand_graph_for_next_round(
+                    next_ctx=ctx,
+                    dynprompt=dynprompt,
+                    body_in_id=body_in_id,
+                    body_out_id=body_out_id,
+                    end_id=end_id,
+                    detect_result=detect_result,
+                    debug=bool(debug),
+                    node_index=node_index,
+                )
+                if end_built_node is not None:
+                    template = _ExpandTemplate.compile(
+                        expand_graph, _expand_prefix(ctx, end_id), end_built_node
+                    )
+                    if template is not None:
+                        template_cache[run_id] = template
+            inline_plan = None
+            if driver == "inline":
+                inline_plan = _inline_plan(template, detect_result, run_id)
+            if inline_plan is not None:
+                rounds = count - int(ctx["index"])
+                expand_graph, end_built_node = inline_plan.instantiate(ctx, end_id)
+            elif rounds > 1 and template is not None and template.body_out_local_id:
+                expand_graph, end_built_node = template.instantiate_unrolled(
+                    _unrolled_round_ctxs(ctx, rounds), end_id,
+                    serial=bool(detect_result.get("collector_nodes")),
+                )
+            elif template_hit:
+                rounds = 1
+                expand_graph, end_built_node = template.instantiate(ctx, end_id)
+            else:
+                rounds = 1
             if end_built_node is None:
                 raise ValueError(
                     "LoopEnd.expand failed: cloned end node not found in expand graph"
                 )
+            _record_round_metrics(
+                run_id, curr_index,
+                expand_build_s=time.perf_counter() - expand_start,
+                expand_nodes=len(expand_graph),
+                expand_template="reused" if template_hit else "built",
+                expand_rounds=rounds,
+                driver="inline" if inline_plan is not None else "expand",
+            )
             mie_log(
                 f"LoopEndExpand: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, "
-                f"next_index={ctx['index']}, expand_nodes={len(expand_graph)}, "
+                f"next_index={ctx['index']}, rounds={rounds}, expand_nodes={len(expand_graph)}, "
+                f"template={'reused' if template_hit else 'built'}, "
                 f"end_node_id={_truncate_for_log(end_built_node.id)}"
             )
             # result 必须包含 is_link() 值（指向 expand 图中克隆的 LoopEnd 节点输出）
@@ -1911,9 +4119,8 @@ class MieLoopEnd:
                 f"LoopEnd.expand failed: body_in_id/body_out_id missing, meta={ctx.get('meta', {})}"
             )
         if done:
-            run_id_for_cleanup = ctx.get("run_id", "")
-            if "_detect_cache" in RUNTIME_STORE:
-                RUNTIME_STORE["_detect_cache"].pop(run_id_for_cleanup, None)
+            _release_run_caches(ctx.get("run_id", ""))
+            _reclaim_expired_runtime()
         mie_log(
             f"LoopEnd: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, next_index={ctx['index']}, done={done}"
         )
@@ -2508,7 +4715,7 @@ class MieLoopStateSetInt:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, key, value):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not str(key).strip():
             raise ValueError("key must not be empty")
         if "state" not in ctx or not isinstance(ctx["state"], dict):
@@ -2537,7 +4744,7 @@ class MieLoopStateSetFloat:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, key, value):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not str(key).strip():
             raise ValueError("key must not be empty")
         if "state" not in ctx or not isinstance(ctx["state"], dict):
@@ -2566,7 +4773,7 @@ class MieLoopStateSetString:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, key, value):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not str(key).strip():
             raise ValueError("key must not be empty")
         if "state" not in ctx or not isinstance(ctx["state"], dict):
@@ -2595,7 +4802,7 @@ class MieLoopStateSetBool:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, key, value):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not str(key).strip():
             raise ValueError("key must not be empty")
         if "state" not in ctx or not isinstance(ctx["state"], dict):
@@ -2670,6 +4877,18 @@ class MieLoopCollectImage:
             "optional": {
                 "offload_to_disk": ("BOOLEAN", {"default": False}),
                 "offload_dir": ("STRING", {"default": ""}),
+                "offload_codec": (
+                    _MIE_LOOP_IMAGE_OFFLOAD_CODECS,
+                    {
+                        "default": "raw",
+                        "tooltip": (
+                            "Encoding of offloaded batches. raw: uncompressed, fastest merge. "
+                            "lossless: compressed, bit-exact. lossless_uint8: stores 8-bit "
+                            "values when that round-trips exactly (images loaded from files), "
+                            "else lossless. fp16 / uint8: lossy, visually lossless, smallest."
+                        ),
+                    },
+                ),
             },
         }
 
@@ -2678,8 +4897,8 @@ class MieLoopCollectImage:
     FUNCTION = "execute"
     CATEGORY = MY_CATEGORY
 
-    def execute(self, loop_ctx, image, offload_to_disk=False, offload_dir=""):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+    def execute(self, loop_ctx, image, offload_to_disk=False, offload_dir="", offload_codec="raw"):
+        ctx = _copy_loop_ctx(loop_ctx)
         run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
         images_collector = _ensure_collector_slot(ctx, "image")
         ref = images_collector.get("ref")
@@ -2687,19 +4906,43 @@ class MieLoopCollectImage:
         if not ref:
             ref = _create_collector_ref("imgcol", ctx)
             images_collector["ref"] = ref
-            image_store[ref] = []
-            image_refs = _ensure_runtime_collector_refs(run_meta, "image")
-            if ref not in image_refs:
-                image_refs.append(ref)
         if ref not in image_store:
+            _register_runtime_collector_ref(ctx.get("run_id", ""), run_meta, "image", ref)
             image_store[ref] = []
-        if bool(offload_to_disk):
+        journaled = bool(ctx.get("meta", {}).get("journal_path"))
+        if bool(offload_to_disk) or journaled:
             payload = image.detach().to("cpu")
+            if payload.data_ptr() == image.data_ptr():
+                # Already on CPU: the writer must own its copy, not alias an
+                # upstream output that may be reused while the write is queued.
+                payload = payload.clone()
+            on_written = None
+            if journaled:
+                journal_ctx = {"run_id": ctx["run_id"], "index": ctx["index"], "meta": ctx["meta"]}
+                extra = {
+                    "shape": [int(x) for x in payload.shape],
+                    "dtype": str(payload.dtype).replace("torch.", ""),
+                }
+
+                def on_written(item):
+                    # Writer thread, once the batch is on disk.
+                    _journal_collected(journal_ctx, "image", ref, {**item, **extra})
+
             image_store[ref].append(
-                _offload_payload_to_disk("image", ctx, ref, payload, offload_dir)
+                _offload_payload_to_disk(
+                    "image", ctx, ref, payload, offload_dir,
+                    background=True, codec=str(offload_codec or "raw"),
+                    on_written=on_written,
+                )
             )
         else:
             image_store[ref].append(image.detach().clone())
+        _record_round_metrics(
+            ctx.get("run_id", ""), ctx.get("index", 0), accumulate=True,
+            collector_bytes=int(image.numel() * image.element_size()),
+        )
+        _track_collector_item("image", ctx, ref, offload_dir)
+        _enforce_runtime_budget()
         images_collector["count"] = len(image_store[ref])
         mie_log(
             f"LoopCollectImage: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, count={images_collector['count']}"
@@ -2757,7 +5000,7 @@ class MieLoopFinalizeImages:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, done, avoid_oom=True):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not bool(done):
             return (EMPTY_IMAGES, "")
         merged, merged_path = _merge_images_for_ctx(
@@ -2782,10 +5025,11 @@ class MieLoopCleanupImages:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         ref = _ensure_collector_slot(ctx, "image").get("ref")
         if not ref:
             return (ctx, False)
+        _flush_offload_writer(ctx.get("run_id", ""), raise_errors=False)
         removed = _pop_collector_items("image", ref)
         _cleanup_disk_cache_items(removed)
         run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
@@ -2830,7 +5074,7 @@ class MieLoopCollectText:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, text):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
         text_collector = _ensure_collector_slot(ctx, "text")
         ref = text_collector.get("ref")
@@ -2838,13 +5082,11 @@ class MieLoopCollectText:
         if not ref:
             ref = _create_collector_ref("txtcol", ctx)
             text_collector["ref"] = ref
-            text_store[ref] = []
-            text_refs = _ensure_runtime_collector_refs(run_meta, "text")
-            if ref not in text_refs:
-                text_refs.append(ref)
         if ref not in text_store:
+            _register_runtime_collector_ref(ctx.get("run_id", ""), run_meta, "text", ref)
             text_store[ref] = []
         text_store[ref].append(str(text))
+        _journal_collected(ctx, "text", ref, str(text))
         text_collector["count"] = len(text_store[ref])
         mie_log(
             f"LoopCollectText: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, count={text_collector['count']}"
@@ -2868,7 +5110,7 @@ class MieLoopFinalizeTextList:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, done):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not bool(done):
             return (json.dumps([], ensure_ascii=False),)
         ref = _ensure_collector_slot(ctx, "text").get("ref")
@@ -2898,7 +5140,7 @@ class MieLoopCleanupText:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         ref = _ensure_collector_slot(ctx, "text").get("ref")
         if not ref:
             return (ctx, False)
@@ -2929,7 +5171,7 @@ class MieLoopCollectJSON:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, item_json):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
         json_collector = _ensure_collector_slot(ctx, "json")
         ref = json_collector.get("ref")
@@ -2941,13 +5183,11 @@ class MieLoopCollectJSON:
         if not ref:
             ref = _create_collector_ref("jsoncol", ctx)
             json_collector["ref"] = ref
-            json_store[ref] = []
-            json_refs = _ensure_runtime_collector_refs(run_meta, "json")
-            if ref not in json_refs:
-                json_refs.append(ref)
         if ref not in json_store:
+            _register_runtime_collector_ref(ctx.get("run_id", ""), run_meta, "json", ref)
             json_store[ref] = []
         json_store[ref].append(parsed)
+        _journal_collected(ctx, "json", ref, parsed)
         json_collector["count"] = len(json_store[ref])
         mie_log(
             f"LoopCollectJSON: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, count={json_collector['count']}"
@@ -2966,6 +5206,16 @@ class MieLoopCollectAudio:
             "optional": {
                 "offload_to_disk": ("BOOLEAN", {"default": False}),
                 "offload_dir": ("STRING", {"default": ""}),
+                "offload_codec": (
+                    _MIE_LOOP_AUDIO_OFFLOAD_CODECS,
+                    {
+                        "default": "raw",
+                        "tooltip": (
+                            "Encoding of offloaded waveforms. raw: pickled as before. "
+                            "lossless: compressed, bit-exact. fp16: lossy, inaudible."
+                        ),
+                    },
+                ),
             },
         }
 
@@ -2974,8 +5224,8 @@ class MieLoopCollectAudio:
     FUNCTION = "execute"
     CATEGORY = MY_CATEGORY
 
-    def execute(self, loop_ctx, audio, offload_to_disk=False, offload_dir=""):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+    def execute(self, loop_ctx, audio, offload_to_disk=False, offload_dir="", offload_codec="raw"):
+        ctx = _copy_loop_ctx(loop_ctx)
         run_meta = _ensure_runtime_meta(ctx.get("run_id", ""))
         audio_collector = _ensure_collector_slot(ctx, "audio")
         ref = audio_collector.get("ref")
@@ -2983,20 +5233,17 @@ class MieLoopCollectAudio:
         if not ref:
             ref = _create_collector_ref("audiocol", ctx)
             audio_collector["ref"] = ref
-            audio_store[ref] = []
-            audio_refs = _ensure_runtime_collector_refs(run_meta, "audio")
-            if ref not in audio_refs:
-                audio_refs.append(ref)
         if ref not in audio_store:
+            _register_runtime_collector_ref(ctx.get("run_id", ""), run_meta, "audio", ref)
             audio_store[ref] = []
-        if bool(offload_to_disk):
+        if bool(offload_to_disk) or ctx.get("meta", {}).get("journal_path"):
             payload = {
                 "waveform": audio["waveform"].detach().to("cpu"),
                 "sample_rate": int(audio["sample_rate"]),
             }
-            audio_store[ref].append(
-                _offload_payload_to_disk("audio", ctx, ref, payload, offload_dir)
-            )
+            disk_item = _offload_audio_to_disk(ctx, ref, payload, offload_dir, offload_codec)
+            audio_store[ref].append(disk_item)
+            _journal_collected(ctx, "audio", ref, disk_item)
         else:
             audio_store[ref].append(
                 {
@@ -3004,6 +5251,12 @@ class MieLoopCollectAudio:
                     "sample_rate": int(audio["sample_rate"]),
                 }
             )
+        _record_round_metrics(
+            ctx.get("run_id", ""), ctx.get("index", 0), accumulate=True,
+            collector_bytes=int(audio["waveform"].numel() * audio["waveform"].element_size()),
+        )
+        _track_collector_item("audio", ctx, ref, offload_dir)
+        _enforce_runtime_budget()
         audio_collector["count"] = len(audio_store[ref])
         mie_log(
             f"LoopCollectAudio: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, count={audio_collector['count']}"
@@ -3011,6 +5264,20 @@ class MieLoopCollectAudio:
         return (ctx,)
 
 
+def _load_disk_audio_item(item):
+    path = str(item["disk_path"])
+    if is_mieraw(path):
+        from_header = read_header(path)["meta"]
+        return {
+            "waveform": load_mieraw(path, mmap=False),
+            "sample_rate": int(from_header.get("sample_rate", item.get("sample_rate", 0))),
+        }
+    loaded = torch.load(path, map_location="cpu")
+    if not isinstance(loaded, dict):
+        raise ValueError("disk cached audio is not an object")
+    return loaded
+
+
 class MieLoopFinalizeAudio:
     @classmethod
     def INPUT_TYPES(cls):
@@ -3018,7 +5285,10 @@ class MieLoopFinalizeAudio:
             "required": {
                 "loop_ctx": ("MIE_LOOP_CTX",),
                 "done": ("BOOLEAN", {"forceInput": True}),
-            }
+            },
+            "optional": {
+                "stream_to_memmap": ("BOOLEAN", {"default": False}),
+            },
         }
 
     RETURN_TYPES = ("AUDIO",)
@@ -3026,8 +5296,8 @@ class MieLoopFinalizeAudio:
     FUNCTION = "execute"
     CATEGORY = MY_CATEGORY
 
-    def execute(self, loop_ctx, done):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+    def execute(self, loop_ctx, done, stream_to_memmap=False):
+        ctx = _copy_loop_ctx(loop_ctx)
         if not bool(done):
             return (EMPTY_AUDIO,)
         ref = _ensure_collector_slot(ctx, "audio").get("ref")
@@ -3047,40 +5317,36 @@ class MieLoopFinalizeAudio:
         )
         merged_ok = False
         try:
-            # Incremental merge: load one item, validate sample_rate, cat waveform,
-            # release the ref (gc only for disk items). Avoids holding all waveforms.
-            sample_rate = None
-            merged_waveform = None
-            for idx, item in enumerate(raw_items):
-                is_disk = _is_disk_cache_item(item)
-                if is_disk:
-                    loaded = torch.load(str(item["disk_path"]), map_location="cpu")
-                    if not isinstance(loaded, dict):
-                        raise ValueError("disk cached audio is not an object")
-                    current = loaded
-                else:
-                    current = item
-                current_rate = int(current["sample_rate"])
-                if sample_rate is None:
-                    sample_rate = current_rate
-                elif current_rate != sample_rate:
-                    raise ValueError(
-                        f"audio sample rate mismatch at index {idx}: {current_rate} != {sample_rate}"
-                    )
-                wf = current["waveform"]
-                if merged_waveform is None:
-                    merged_waveform = wf
-                else:
-                    merged_waveform = torch.cat([merged_waveform, wf], dim=-1)
-                    del wf
-                    if is_disk:
-                        gc.collect()
-                if progress_cb is not None:
-                    progress_cb(idx + 1, len(raw_items))
-            merged = {
-                "waveform": merged_waveform,
-                "sample_rate": int(sample_rate),
-            }
+            # Two-pass merge: probe shapes/rates first, then copy each segment
+            # into one preallocated buffer (no O(N^2) running torch.cat).
+            # stream_to_memmap backs the buffer with a file next to the
+            # offloaded segments (or the run's default offload dir) so the
+            # merged waveform need not fit in RAM. The name is unique per
+            # finalize (an earlier result may still be mapped) and the file
+            # is deleted with the run's runtime state.
+            mmap_path = None
+            if bool(stream_to_memmap):
+                mmap_dir = (
+                    Path(disk_paths[0]).parent
+                    if disk_paths
+                    else Path(_resolve_offload_dir(ctx, ""))
+                )
+                mmap_path = mmap_dir / f"merged_audio_{ref}_{uuid.uuid4().hex[:8]}.mmap"
+                run_meta.setdefault("finalize_files", []).append(str(mmap_path))
+            merge_start = time.perf_counter()
+            merged = _preallocated_audio_merge(
+                raw_items,
+                load_disk_item=_load_disk_audio_item,
+                mmap_path=mmap_path,
+                log_progress=progress_cb,
+            )
+            _record_finalize_metrics(
+                ctx.get("run_id", ""), "audio",
+                items=len(raw_items),
+                merge_s=time.perf_counter() - merge_start,
+                samples=int(merged["waveform"].shape[-1]),
+                stream_to_memmap=bool(stream_to_memmap),
+            )
             merged_ok = True
             mie_log(
                 f"LoopFinalizeAudio: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, count={len(raw_items)}"
@@ -3110,7 +5376,7 @@ class MieLoopCleanupAudio:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         ref = _ensure_collector_slot(ctx, "audio").get("ref")
         if not ref:
             return (ctx, False)
@@ -3142,7 +5408,7 @@ class MieLoopFinalizeJSONList:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx, done):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         if not bool(done):
             return (json.dumps([], ensure_ascii=False),)
         ref = _ensure_collector_slot(ctx, "json").get("ref")
@@ -3172,7 +5438,7 @@ class MieLoopCleanupJSON:
     CATEGORY = MY_CATEGORY
 
     def execute(self, loop_ctx):
-        ctx = copy.deepcopy(_validate_loop_ctx(loop_ctx))
+        ctx = _copy_loop_ctx(loop_ctx)
         ref = _ensure_collector_slot(ctx, "json").get("ref")
         if not ref:
             return (ctx, False)
@@ -3185,3 +5451,86 @@ class MieLoopCleanupJSON:
             f"LoopCleanupJSON: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, ref={ref}, cleaned={cleaned}"
         )
         return (ctx, cleaned)
+
+
+class MieLoopStats:
+    """Machine-readable per-round timings for a loop run.
+
+    Returns the run's metrics as JSON: one entry per round (round wall time,
+    body detect, expand-graph build, collector bytes, offload write/wait
+    time), their totals, the finalize merge phases, and resident vs spilled
+    collector memory. Wire it after ``MieLoopEnd.done`` / the finalize nodes
+    to see the whole run.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "loop_ctx": ("MIE_LOOP_CTX",),
+            },
+            "optional": {
+                "trigger": (any_typ,),
+            },
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("stats_json",)
+    FUNCTION = "execute"
+    CATEGORY = MY_CATEGORY
+
+    def execute(self, loop_ctx, trigger=None):
+        _ = trigger
+        ctx = _copy_loop_ctx(loop_ctx)
+        stats = _loop_stats_snapshot(ctx.get("run_id", ""))
+        mie_log(
+            f"LoopStats: loop_id={ctx['loop_id']}, run_id={ctx['run_id']}, "
+            f"rounds={len(stats['rounds'])}, "
+            f"round_wall_s={stats['totals'].get('round_wall_s', 0)}"
+        )
+        return (json.dumps(stats, ensure_ascii=False, indent=2),)
+
+
+class MieLoopSetRuntimeBudget:
+    """Set the process-wide RAM budget for resident loop collector items.
+
+    Past ``budget_gb`` (summed over every run), the least recently collected
+    IMAGE / AUDIO items are spilled to their run's offload dir; 0 disables
+    the cap. Wire it between MieLoopStart and MieLoopBodyIn: the new budget
+    applies right away and stays in effect for later runs until changed.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "loop_ctx": ("MIE_LOOP_CTX",),
+                "budget_gb": (
+                    "FLOAT",
+                    {
+                        "default": _MIE_LOOP_RUNTIME_BUDGET_BYTES / 1024 ** 3,
+                        "min": 0.0,
+                        "max": 1024.0,
+                        "step": 0.5,
+                        "tooltip": "RAM cap for in-memory collector items across all runs (GB). 0 = no cap.",
+                    },
+                ),
+            },
+        }
+
+    RETURN_TYPES = ("MIE_LOOP_CTX", "STRING")
+    RETURN_NAMES = ("loop_ctx", "log")
+    FUNCTION = "execute"
+    CATEGORY = MY_CATEGORY
+
+    def execute(self, loop_ctx, budget_gb=8.0):
+        global _MIE_LOOP_RUNTIME_BUDGET_BYTES
+        ctx = _copy_loop_ctx(loop_ctx)
+        _MIE_LOOP_RUNTIME_BUDGET_BYTES = max(0, int(float(budget_gb) * 1024 ** 3))
+        spilled = _enforce_runtime_budget()
+        log = mie_log(
+            f"LoopRuntimeBudget: budget={_MIE_LOOP_RUNTIME_BUDGET_BYTES / 1e9:.2f} GB, "
+            f"resident={_resident_total() / 1e9:.2f} GB, spilled_now={spilled / 1e9:.2f} GB, "
+            f"run_id={ctx['run_id']}"
+        )
+        return (ctx, log)
@@ -182,7 +182,14 @@ class AddNumberWatermarkForImage:
                 "thickness": ("INT", {"default": 2, "min": 1, "max": 20}),
                 "outline": ("BOOLEAN", {"default": True}),
                 "outline_thickness": ("INT", {"default": 2, "min": 1, "max": 10}),
-            }
+            },
+            "optional": {
+                # batched: each distinct number is drawn once into small alpha
+                # masks that are blended onto the whole batch in one tensor op
+                # (on the input device). per_frame: legacy cv2 round trip of
+                # every frame through uint8 BGR.
+                "render_mode": (["batched", "per_frame"], {"default": "batched"}),
+            },
         }
 
     RETURN_TYPES = ("IMAGE",)
@@ -214,11 +221,107 @@ class AddNumberWatermarkForImage:
 
         cv2.putText(img_bgr, text, (x, y), font, font_scale, color, thickness, cv2.LINE_AA)
 
-    def apply_watermark(self, images, start_number, position_x, position_y, font_scale, color_r, color_g, color_b, thickness, outline, outline_thickness):
+    def _text_origin(self, text, w, h, position_x, position_y, font_scale, thickness):
+        # Top-left of the text box from the percentage position, kept inside
+        # the image; returns the cv2 baseline origin and the text metrics.
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        x = int(np.clip(position_x / 100.0 * (w - text_w), 0, max(0, w - text_w)))
+        y_top = int(np.clip(position_y / 100.0 * (h - text_h), 0, max(0, h - text_h)))
+        return (x, y_top + text_h), (text_w, text_h), baseline
+
+    def _render_text_masks(self, text, font_scale, thickness, outline, outline_thickness):
+        """Coverage masks (uint8) of the outline and the fill of ``text``.
+
+        Drawn with 255 on a black canvas just big enough for the strokes, so
+        blending ``img * (1 - a) + color * a`` per mask gives what the legacy
+        path gets by drawing straight into each frame. Returns
+        ``(outline_mask or None, fill_mask, (x0, y0))`` with the canvas
+        offset relative to the baseline origin.
+        """
+        (text_w, text_h), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        margin = thickness + (outline_thickness if outline else 0) + 2
+        canvas_h = text_h + baseline + 2 * margin
+        canvas_w = text_w + 2 * margin
+        org = (margin, margin + text_h)
+
+        fill = np.zeros((canvas_h, canvas_w), dtype=np.uint8)
+        cv2.putText(fill, text, org, cv2.FONT_HERSHEY_SIMPLEX, font_scale, 255, thickness, cv2.LINE_AA)
+        outline_mask = None
+        if outline:
+            # Same offset passes as _draw_text_with_optional_outline.
+            outline_mask = np.zeros_like(fill)
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    if dx == 0 and dy == 0:
+                        continue
+                    cv2.putText(
+                        outline_mask, text, (org[0] + dx, org[1] + dy), cv2.FONT_HERSHEY_SIMPLEX,
+                        font_scale, 255, thickness + outline_thickness, cv2.LINE_AA,
+                    )
+        return outline_mask, fill, (-margin, -(margin + text_h))
+
+    def _apply_watermark_batched(self, images, texts, position_x, position_y, font_scale, color, thickness, outline, outline_thickness):
+        b, h, w = images.shape[:3]
+        placed = []  # (frame, outline_mask, fill_mask, top, left)
+        masks = {}
+        for i, text in enumerate(texts):
+            if text not in masks:
+                (x, y), _size, _baseline = self._text_origin(text, w, h, position_x, position_y, font_scale, thickness)
+                outline_mask, fill, (dx, dy) = self._render_text_masks(
+                    text, font_scale, thickness, outline, outline_thickness
+                )
+                masks[text] = (outline_mask, fill, y + dy, x + dx)
+            placed.append((i,) + masks[text])
+
+        # Blend only inside the union of the text boxes, clipped to the frame.
+        top = max(0, min(p[3] for p in placed))
+        left = max(0, min(p[4] for p in placed))
+        bottom = min(h, max(p[3] + p[2].shape[0] for p in placed))
+        right = min(w, max(p[4] + p[2].shape[1] for p in placed))
+        if bottom <= top or right <= left:
+            return images.clone()
+        region_h, region_w = bottom - top, right - left
+        fill_a = np.zeros((b, region_h, region_w), dtype=np.uint8)
+        outline_a = np.zeros_like(fill_a) if outline else None
+        for i, outline_mask, fill, y0, x0 in placed:
+            # Canvas rows/cols that land inside the region.
+            cy0, cx0 = max(0, top - y0), max(0, left - x0)
+            cy1 = min(fill.shape[0], bottom - y0)
+            cx1 = min(fill.shape[1], right - x0)
+            if cy1 <= cy0 or cx1 <= cx0:
+                continue
+            ry, rx = y0 + cy0 - top, x0 + cx0 - left
+            dst = (i, slice(ry, ry + cy1 - cy0), slice(rx, rx + cx1 - cx0))
+            fill_a[dst] = fill[cy0:cy1, cx0:cx1]
+            if outline_a is not None:
+                outline_a[dst] = outline_mask[cy0:cy1, cx0:cx1]
+
+        device, dtype = images.device, images.dtype
+        out = images.clone()
+        region = out[:, top:bottom, left:right, :3]
+        fill_t = torch.from_numpy(fill_a).to(device=device, dtype=dtype).unsqueeze(-1) / 255.0
+        blended = region
+        if outline_a is not None:
+            outline_t = torch.from_numpy(outline_a).to(device=device, dtype=dtype).unsqueeze(-1) / 255.0
+            blended = blended * (1.0 - outline_t)
+        color_t = torch.tensor(color, device=device, dtype=dtype) / 255.0
+        out[:, top:bottom, left:right, :3] = blended * (1.0 - fill_t) + color_t * fill_t
+        return out
+
+    def apply_watermark(self, images, start_number, position_x, position_y, font_scale, color_r, color_g, color_b, thickness, outline, outline_thickness, render_mode="batched"):
         if images is None or images.shape[0] == 0:
             raise ValueError("No images provided to watermark.")
 
-        mie_log(f"Applying numeric watermark to {images.shape[0]} images. start_number={start_number}, pos=({position_x}%, {position_y}%), font_scale={font_scale}, color=({color_r},{color_g},{color_b}), thickness={thickness}, outline={outline}")
+        mie_log(f"Applying numeric watermark to {images.shape[0]} images. start_number={start_number}, pos=({position_x}%, {position_y}%), font_scale={font_scale}, color=({color_r},{color_g},{color_b}), thickness={thickness}, outline={outline}, render_mode={render_mode}")
+
+        if render_mode == "batched":
+            texts = [str(start_number + i) for i in range(images.shape[0])]
+            result = self._apply_watermark_batched(
+                images, texts, position_x, position_y, font_scale,
+                (int(color_r), int(color_g), int(color_b)),
+                int(thickness), bool(outline), int(outline_thickness),
+            )
+            return (result,)
 
         device = images.device
         dtype = images.dtype
@@ -231,15 +334,7 @@ class AddNumberWatermarkForImage:
             img_bgr = self._tensor_to_cv2(images[i])
 
             h, w = img_bgr.shape[:2]
-            font = cv2.FONT_HERSHEY_SIMPLEX
-            # Measure text size to keep it inside the image
-            (text_w, text_h), baseline = cv2.getTextSize(number_text, font, font_scale, thickness)
-
-            # Place top-left of text bounding box according to percentage, then convert to baseline org
-            x = int(np.clip(position_x / 100.0 * (w - text_w), 0, max(0, w - text_w)))
-            y_top = int(np.clip(position_y / 100.0 * (h - text_h), 0, max(0, h - text_h)))
-            # cv2.putText uses baseline y (bottom of text)
-            y = y_top + text_h
+            (x, y), _size, _baseline = self._text_origin(number_text, w, h, position_x, position_y, font_scale, thickness)
 
             self._draw_text_with_optional_outline(
                 img_bgr,
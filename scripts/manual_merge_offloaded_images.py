@@ -3,7 +3,7 @@
 
 When a ComfyUI loop run produces too many on-disk IMAGE batches and the
 in-process `MieLoopFinalizeImages` merge OOMs mid-way, the per-batch
-`image_*.pt` files are intentionally preserved (preserve-on-failure contract).
+`image_*.mieraw` / `image_*.pt` files are intentionally preserved (preserve-on-failure contract).
 This script reads them from `<comfyui>/temp/mie_loop_offload/<run_id>/`,
 runs them through the same chunked+memmap merge the live node uses, and
 writes a single `.pt` file that can be loaded back via `LoadAny|Mie`.
@@ -29,6 +29,11 @@ Usage (run on the ComfyUI machine where the .pt files live):
         --offload-dir F:/ComfyUI_Mie_2026_V8.0_Base/ComfyUI/temp/mie_loop_offload/5e81e5f1a4b24e58a721371f ^
         --out F:/ComfyUI_Mie_2026_V8.0_Base/ComfyUI/temp/mie_loop_offload/merged_5e81e5f1.pt
 
+    # Single pass: no intermediate chunk files, output written once to
+    # <run_dir>/merged.mieraw; compare the printed bytes_written / peak_rss
+    # against a default run
+    python scripts/manual_merge_offloaded_images.py --single-pass
+
     # Dry-run: just print what would be merged
     python scripts/manual_merge_offloaded_images.py --dry-run
 
@@ -79,7 +84,10 @@ def _discover_latest_run(offload_root: Path) -> Path:
 
 
 def _list_batches(run_dir: Path) -> list[Path]:
-    return sorted(Path(p) for p in glob.glob(str(run_dir / "image_*.pt")))
+    # Per-batch offloads are .mieraw since the raw container landed; older
+    # runs (and in-memory spills) are .pt. The merge reads both.
+    found = glob.glob(str(run_dir / "image_*.pt")) + glob.glob(str(run_dir / "image_*.mieraw"))
+    return sorted(Path(p) for p in found)
 
 
 def _format_eta(elapsed: float, done: int, total: int) -> str:
@@ -108,10 +116,11 @@ def merge(
     dry_run: bool,
     chunk_size: int = 5,
     avoid_oom: bool = True,
+    single_pass: bool = False,
 ) -> dict:
     paths = _list_batches(run_dir)
     if not paths:
-        raise FileNotFoundError(f"no image_*.pt files in {run_dir}")
+        raise FileNotFoundError(f"no image_*.pt / image_*.mieraw files in {run_dir}")
     sizes = [p.stat().st_size for p in paths]
     total_bytes = sum(sizes)
     summary = {
@@ -157,6 +166,7 @@ def merge(
     # phase 2 (with current == total at the end of phase 2).
     progress_cb = _progress_chunk("merge")
 
+    merge_stats: dict = {}
     try:
         written = chunked_disk_merge(
             disk_items,
@@ -165,6 +175,8 @@ def merge(
             kind="image",
             log_progress=progress_cb,
             avoid_oom=avoid_oom,
+            single_pass=single_pass,
+            stats=merge_stats,
         )
     except Exception:
         # Mirror the in-process contract: on failure, keep input batches so
@@ -174,9 +186,13 @@ def merge(
         raise
 
     out_size = Path(written).stat().st_size
+    peak_rss = merge_stats.get("peak_rss_bytes")
     print(
         f"[merge] wrote {written}\n"
-        f"       size={out_size / 1e9:.2f} GB",
+        f"       size={out_size / 1e9:.2f} GB  mode={merge_stats.get('mode')}\n"
+        f"       bytes_written={merge_stats.get('bytes_written', 0) / 1e9:.2f} GB  "
+        f"peak_rss={'n/a' if peak_rss is None else f'{peak_rss / 1e9:.2f} GB'}  "
+        f"elapsed={time.time() - t0:.1f}s",
         flush=True,
     )
     if cleanup:
@@ -192,6 +208,9 @@ def merge(
             "n_chunks": n_chunks,
             "chunk_size": chunk_size,
             "avoid_oom": avoid_oom,
+            "single_pass": single_pass,
+            "bytes_written": merge_stats.get("bytes_written"),
+            "peak_rss_bytes": peak_rss,
         }
     )
     return summary
@@ -224,7 +243,11 @@ def main() -> int:
     ap.add_argument(
         "--out",
         default=None,
-        help="Output .pt path (default: <run_dir>/merged.pt).",
+        help=(
+            "Output path (default: <run_dir>/merged.pt, or merged.mieraw with "
+            "--single-pass). A .mieraw suffix writes the raw container instead, "
+            "which LoadImageBatch|Mie memory-maps."
+        ),
     )
     ap.add_argument(
         "--chunk-size",
@@ -244,10 +267,21 @@ def main() -> int:
             "for the whole result (~25 GB for SCAIL-2 30-batch)."
         ),
     )
+    ap.add_argument(
+        "--single-pass",
+        action="store_true",
+        help=(
+            "Skip the phase-1 chunk files: copy every batch straight into the "
+            "pre-sized output. Only a .mieraw output is written once (the "
+            "default --out in this mode); a .pt output is still written twice. "
+            "--chunk-size is ignored. Compare bytes_written / peak_rss against "
+            "the default."
+        ),
+    )
     ap.add_argument(
         "--cleanup",
         action="store_true",
-        help="Delete the input image_*.pt files after a successful merge.",
+        help="Delete the input image_* batch files after a successful merge.",
     )
     ap.add_argument(
         "--dry-run",
@@ -267,7 +301,10 @@ def main() -> int:
         print(f"error: offload dir does not exist: {run_dir}", file=sys.stderr)
         return 2
 
-    out_path = Path(args.out) if args.out else run_dir / "merged.pt"
+    if args.out:
+        out_path = Path(args.out)
+    else:
+        out_path = run_dir / ("merged.mieraw" if args.single_pass else "merged.pt")
 
     try:
         merge(
@@ -277,6 +314,7 @@ def main() -> int:
             dry_run=args.dry_run,
             chunk_size=max(1, int(args.chunk_size)),
             avoid_oom=not bool(args.no_avoid_oom),
+            single_pass=bool(args.single_pass),
         )
     except FileNotFoundError as e:
         print(f"error: {e}", file=sys.stderr)
@@ -0,0 +1,248 @@
+"""Pooled keep-alive HTTP transport shared by every LLM connector.
+
+`requests.post` builds a throwaway `Session` per call, so every LLM request
+in a loop pays DNS + TCP + TLS again. `HTTP_POOL` keeps one `requests.Session`
+per (base URL, proxy) and reuses its urllib3 connection pool across calls and
+across connector instances (all connector subclasses share the registry).
+
+Sessions idle longer than ``idle_seconds`` are closed the next time the
+registry is touched, unless a request is still running on them. Pool size
+and idle timeout are set per process with `HTTP_POOL.configure()` (exposed
+as the ``SetLLMHttpPool`` node). Every connection the pool opens is timed around its
+`connect()` (TCP + TLS handshake), so `stats()` can report how many requests
+reused a warm connection and how much time handshakes cost.
+"""
+import functools
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_SIZE = 8
+DEFAULT_IDLE_SECONDS = 90.0
+
+
+class _PoolStats:
+    """Request / connection counters for one pooled session."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.handshake_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record_handshake(self, seconds):
+        with self._lock:
+            self.connections += 1
+            self.handshake_seconds += seconds
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def as_dict(self):
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections,
+                "reused": reused,
+                "handshake_seconds": round(self.handshake_seconds, 4),
+                "avg_handshake_ms": round(
+                    self.handshake_seconds * 1000 / self.connections, 2
+                ) if self.connections else 0.0,
+            }
+
+
+class _TimedConnectMixin:
+    """Time `connect()` (TCP + TLS) and report it to ``_mie_stats``."""
+
+    _mie_stats = None
+
+    def connect(self):
+        t0 = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            if self._mie_stats is not None:
+                self._mie_stats.record_handshake(time.perf_counter() - t0)
+
+
+def _timed_pool_classes(stats):
+    http_conn = type("MieHTTPConnection", (_TimedConnectMixin, HTTPConnection), {"_mie_stats": stats})
+    https_conn = type("MieHTTPSConnection", (_TimedConnectMixin, HTTPSConnection), {"_mie_stats": stats})
+    return {
+        "http": type("MieHTTPConnectionPool", (HTTPConnectionPool,), {"ConnectionCls": http_conn}),
+        "https": type("MieHTTPSConnectionPool", (HTTPSConnectionPool,), {"ConnectionCls": https_conn}),
+    }
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pool managers open timed connections."""
+
+    def __init__(self, stats, **kwargs):
+        self._mie_pool_classes = _timed_pool_classes(stats)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = dict(self._mie_pool_classes)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # SOCKS managers bring their own pool classes; leave them alone.
+        if not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = dict(self._mie_pool_classes)
+        return manager
+
+
+class _PoolEntry:
+    def __init__(self, session, stats):
+        self.session = session
+        self.stats = stats
+        self.last_used = time.monotonic()
+        # Requests currently running on ``session``; busy sessions are never
+        # closed, a retired one is closed by its last request instead.
+        self.in_flight = 0
+        self.retired = False
+
+
+@functools.lru_cache(maxsize=256)
+def _environ_proxy(base, scheme):
+    """Environment proxy for ``base``, looked up once per process."""
+    env = requests.utils.get_environ_proxies(base)
+    return env.get(scheme) or env.get("all") or ""
+
+
+def pool_key(url, proxy=None):
+    """Registry key for ``url``: ``(scheme://netloc, proxy)``.
+
+    Path and query are dropped so e.g. every Gemini model (and its
+    ``?key=`` query) on the same host shares one pool. When no explicit
+    ``proxy`` is given the environment proxy for ``url`` is used, because
+    that is what `requests` would route through anyway.
+    """
+    parts = urlsplit(url)
+    base = f"{parts.scheme}://{parts.netloc}".lower()
+    if proxy is None:
+        proxy = _environ_proxy(base, parts.scheme)
+    return base, proxy or ""
+
+
+class PooledSessionRegistry:
+    """Process-wide registry of keep-alive sessions keyed by `pool_key`."""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_seconds=DEFAULT_IDLE_SECONDS):
+        self.pool_size = int(pool_size)
+        self.idle_seconds = float(idle_seconds)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def configure(self, pool_size=None, idle_seconds=None):
+        """Change pool size / idle eviction. A new pool size retires the
+        existing sessions so it applies to every subsequent request; an
+        unchanged configuration is a no-op."""
+        with self._lock:
+            if idle_seconds is not None:
+                self.idle_seconds = float(idle_seconds)
+            if pool_size is None or max(1, int(pool_size)) == self.pool_size:
+                return
+            self.pool_size = max(1, int(pool_size))
+            entries, self._entries = self._entries, {}
+            idle = self._retire_locked(entries.values())
+        for entry in idle:
+            entry.session.close()
+
+    @staticmethod
+    def _retire_locked(entries):
+        """Mark ``entries`` retired; returns those that can be closed now."""
+        idle = []
+        for entry in entries:
+            entry.retired = True
+            if entry.in_flight == 0:
+                idle.append(entry)
+        return idle
+
+    def _new_entry(self):
+        stats = _PoolStats()
+        session = requests.Session()
+        adapter = _TimedHTTPAdapter(
+            stats, pool_connections=self.pool_size, pool_maxsize=self.pool_size
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        # requests speaks HTTP/1.1 and keeps connections alive by default;
+        # pin the header so a proxy or server default cannot silently
+        # downgrade us to one connection per request.
+        session.headers["Connection"] = "keep-alive"
+        return _PoolEntry(session, stats)
+
+    def _evict_idle_locked(self, now):
+        stale = [
+            k for k, e in self._entries.items()
+            if e.in_flight == 0 and now - e.last_used > self.idle_seconds
+        ]
+        return [self._entries.pop(k) for k in stale]
+
+    def entry_for(self, url, proxy=None, acquire=False):
+        """Pooled entry for ``url``; ``acquire`` counts a request in flight
+        on it until `_release`."""
+        key = pool_key(url, proxy)
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._evict_idle_locked(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = self._new_entry()
+            entry.last_used = now
+            if acquire:
+                entry.in_flight += 1
+        for old in evicted:
+            old.session.close()
+        return entry
+
+    def _release(self, entry):
+        with self._lock:
+            entry.in_flight -= 1
+            entry.last_used = time.monotonic()
+            close = entry.retired and entry.in_flight == 0
+        if close:
+            entry.session.close()
+
+    def post(self, url, proxy=None, **kwargs):
+        """`requests.post` over the pooled session for ``url`` / ``proxy``."""
+        entry = self.entry_for(url, proxy, acquire=True)
+        if proxy:
+            kwargs.setdefault("proxies", {"http": proxy, "https": proxy})
+        entry.stats.record_request()
+        try:
+            return entry.session.post(url, **kwargs)
+        finally:
+            self._release(entry)
+
+    def stats(self, url=None, proxy=None):
+        """Per-pool counters. With ``url`` only that pool's dict is returned
+        (empty when nothing was sent there yet)."""
+        with self._lock:
+            if url is not None:
+                entry = self._entries.get(pool_key(url, proxy))
+                return entry.stats.as_dict() if entry else {}
+            return {
+                f"{base} via {proxy}" if proxy else base: e.stats.as_dict()
+                for (base, proxy), e in self._entries.items()
+            }
+
+    def close_all(self):
+        """Drop every session; ones with a request running close afterwards."""
+        with self._lock:
+            entries, self._entries = self._entries, {}
+            idle = self._retire_locked(entries.values())
+        for entry in idle:
+            entry.session.close()
+
+
+HTTP_POOL = PooledSessionRegistry()
@@ -1,6 +1,9 @@
+import copy
+import json
 import re
 import requests
 import time
+from concurrent.futures import ThreadPoolExecutor
 import base64
 import numpy as np
 import cv2
@@ -23,6 +26,13 @@ except ImportError:
         build_multimodal_user_content,
     )
 
+try:
+    from _mienodes_internal.services.http_pool import HTTP_POOL, DEFAULT_POOL_SIZE, DEFAULT_IDLE_SECONDS
+    from _mienodes_internal.services.llm_cache import get_response_cache, DEFAULT_MAX_BYTES
+except ImportError:
+    from .http_pool import HTTP_POOL, DEFAULT_POOL_SIZE, DEFAULT_IDLE_SECONDS
+    from .llm_cache import get_response_cache, DEFAULT_MAX_BYTES
+
 MY_CATEGORY = "🐑 MieNodes/🐑 LLM Service Config"
 
 
@@ -79,7 +89,7 @@ def _drop_image_detail_auto(messages):
 
 class GeneralLLMServiceConnector:
     def __init__(self, api_url, manual_token, model, timeout=30, max_retries=3, retry_delay=5, 
-                 config_file="mie_llm_keys.json", config_key=None, prefer_local_config=True):
+                 config_file="mie_llm_keys.json", config_key=None, prefer_local_config=True, proxy=None):
         self.api_url = api_url
         self.manual_token = manual_token
         self.model = model
@@ -89,6 +99,11 @@ class GeneralLLMServiceConnector:
         self.config_file = config_file
         self.config_key = config_key
         self.prefer_local_config = prefer_local_config
+        # Optional explicit proxy URL. None falls back to the environment
+        # proxy, exactly like a bare `requests.post` would.
+        self.proxy = proxy
+        # Optional `LLMResponseCache` (see `SetLLMResponseCache`). None = off.
+        self.response_cache = None
 
     @property
     def api_token(self):
@@ -175,6 +190,9 @@ class GeneralLLMServiceConnector:
         # before generate_payload so it cannot leak into the request body.
         preserve_thinking = bool(kwargs.pop("preserve_thinking", False))
         payload = self.generate_payload(messages, **kwargs)
+        cache_key, cached = self._cache_lookup(payload, kwargs, preserve_thinking)
+        if cached is not None:
+            return cached
 
         headers = {
             "Authorization": f"Bearer {self.api_token}",
@@ -189,7 +207,7 @@ class GeneralLLMServiceConnector:
             attempt_t0 = time.perf_counter()
 
             try:
-                response = requests.post(
+                response = self._post(
                     self.api_url, json=payload, headers=headers, timeout=self.timeout
                 )
                 attempt_elapsed = time.perf_counter() - attempt_t0
@@ -231,6 +249,7 @@ class GeneralLLMServiceConnector:
                         f"{tag} ok in {attempt_elapsed:.2f}s "
                         f"response_chars={len(cleaned or '')}"
                     )
+                    self._cache_store(cache_key, cleaned)
                     return cleaned
 
                 # 5xx: 瞬时错误，包含响应体前 200 字符方便诊断
@@ -282,11 +301,78 @@ class GeneralLLMServiceConnector:
             f"LLM Service failed after {self.max_retries} attempts due to an unknown error."
         )
 
+    def invoke_many(self, messages_list, max_concurrency=4, **kwargs):
+        """并发调用 `invoke`，每个元素是一组独立的 messages。
+
+        - 最多 ``max_concurrency`` 个请求同时在途（线程池；HTTP 层共享
+          `HTTP_POOL` 的 keep-alive 连接）。
+        - 返回值与 ``messages_list`` 顺序一一对应。
+        - 每个元素各自走 `invoke` 的 5xx / Timeout / ConnectionError 重试策略。
+        - 单个元素失败不会让整批失败：该位置返回抛出的 Exception 实例
+          （与 ``asyncio.gather(return_exceptions=True)`` 同样的约定）。
+        其余 kwargs 原样转发给每一次 `invoke`。
+        """
+        messages_list = list(messages_list or [])
+        if not messages_list:
+            return []
+
+        def _one(messages):
+            try:
+                return self.invoke(messages, **dict(kwargs))
+            except Exception as e:  # noqa: BLE001 - captured per item
+                return e
+
+        workers = max(1, min(int(max_concurrency), len(messages_list)))
+        if workers == 1:
+            return [_one(m) for m in messages_list]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mie-llm") as pool:
+            return list(pool.map(_one, messages_list))
+
+    def _cache_lookup(self, payload, kwargs, preserve_thinking):
+        """Return ``(key, cached_text)``; both None when no cache is set.
+
+        The key covers the endpoint, the exact provider payload and the
+        caller's ``seed`` (most payloads do not carry it, but nodes bump it
+        to force a fresh answer). The token is deliberately excluded.
+        """
+        cache = getattr(self, "response_cache", None)
+        if cache is None:
+            return None, None
+        key = cache.key_for(
+            self.api_url, payload,
+            seed=kwargs.get("seed"), preserve_thinking=preserve_thinking,
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            mie_log(f"[{self.model}] response cache hit {key[:12]} response_chars={len(cached)}")
+        return key, cached
+
+    def _cache_store(self, key, text):
+        cache = getattr(self, "response_cache", None)
+        # Empty answers are usually a provider hiccup; never pin them.
+        if cache is None or key is None or not text:
+            return
+        try:
+            cache.put(key, text)
+        except OSError as e:
+            mie_log(f"[{self.model}] response cache write failed: {e}")
+
+    def _post(self, url, **kwargs):
+        """POST through the shared keep-alive pool for ``url`` (see
+        `services.http_pool`), so repeated calls skip DNS / TCP / TLS."""
+        return HTTP_POOL.post(url, proxy=getattr(self, "proxy", None), **kwargs)
+
     def get_state(self):
         """返回用于比较状态的字符串表示"""
         # 恢复为原先的无分隔符形式，保证与历史行为一致（避免回归）
         return f"{self.api_url}{self.api_token}{self.model}"
 
+    def get_transport_stats(self):
+        """Connection-reuse counters of the pooled session this connector
+        posts through. Diagnostic only; deliberately not part of `get_state`
+        so cache keys do not change as the counters move."""
+        return HTTP_POOL.stats(self.api_url, getattr(self, "proxy", None))
+
 
 class StandardOpenAICompatibleConnector(GeneralLLMServiceConnector):
     """
@@ -596,6 +682,9 @@ class GeminiConnectorGeneral(GeneralLLMServiceConnector):
         # Same response-side flag as the base class; pop before payload build.
         preserve_thinking = bool(kwargs.pop("preserve_thinking", False))
         payload = self.generate_payload(messages, **kwargs)
+        cache_key, cached = self._cache_lookup(payload, kwargs, preserve_thinking)
+        if cached is not None:
+            return cached
         headers = {"Content-Type": "application/json"}
         # Gemini 认证方式：Token 作为 URL 参数
         url = f"{self.api_url}?key={self.api_token}"
@@ -608,7 +697,7 @@ class GeminiConnectorGeneral(GeneralLLMServiceConnector):
             attempt_t0 = time.perf_counter()
 
             try:
-                response = requests.post(url, json=payload, headers=headers, timeout=self.timeout)
+                response = self._post(url, json=payload, headers=headers, timeout=self.timeout)
                 attempt_elapsed = time.perf_counter() - attempt_t0
 
                 if response.status_code == 200:
@@ -645,6 +734,7 @@ class GeminiConnectorGeneral(GeneralLLMServiceConnector):
                         f"{tag} ok in {attempt_elapsed:.2f}s "
                         f"response_chars={len(cleaned or '')}"
                     )
+                    self._cache_store(cache_key, cleaned)
                     return cleaned
 
                 if 500 <= response.status_code < 600:
@@ -1328,6 +1418,77 @@ class SetBailianLLMServiceConnector(object):
         return (BailianLLMServiceConnector(api_token, model, config_file=config_file, config_key=config_key, prefer_local_config=prefer_local_config),)
 
 
+class SetLLMResponseCache(object):
+    """给任意 LLMServiceConnector 挂上磁盘响应缓存（默认关闭，需显式接入）。
+
+    缓存键 = endpoint + generate_payload 的完整输出（模型、messages 含图片、
+    采样参数）+ seed 的 sha256；相同请求重跑时直接返回缓存，不再调用 API。
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "llm_service_connector": ("LLMServiceConnector",),
+                "enabled": ("BOOLEAN", {"default": True}),
+            },
+            "optional": {
+                "cache_dir": ("STRING", {"default": ""}),
+                "max_size_mb": ("INT", {"default": DEFAULT_MAX_BYTES // (1024 * 1024), "min": 1, "max": 1048576}),
+                "ttl_hours": ("FLOAT", {"default": 0.0, "min": 0.0, "max": 87600.0, "step": 0.5}),
+            },
+        }
+
+    RETURN_TYPES = ("LLMServiceConnector", "STRING")
+    RETURN_NAMES = ("llm_service_connector", "log")
+    FUNCTION = "execute"
+    CATEGORY = MY_CATEGORY
+
+    def execute(self, llm_service_connector, enabled, cache_dir="", max_size_mb=DEFAULT_MAX_BYTES // (1024 * 1024), ttl_hours=0.0):
+        # Shallow copy: the upstream connector (and anything else wired to
+        # it) keeps its own cache setting.
+        connector = copy.copy(llm_service_connector)
+        if not enabled:
+            connector.response_cache = None
+            return connector, mie_log("LLM响应缓存: 已关闭")
+        cache = get_response_cache(
+            cache_dir.strip() or None,
+            max_bytes=int(max_size_mb) * 1024 * 1024,
+            ttl_seconds=float(ttl_hours) * 3600.0,
+        )
+        connector.response_cache = cache
+        return connector, mie_log(f"LLM响应缓存: {cache.stats()}")
+
+
+class SetLLMHttpPool(object):
+    """设置所有 LLMServiceConnector 共用的 keep-alive 连接池（进程级）。
+
+    pool_size 为每个 (host, proxy) 保留的连接数，改动后旧会话在其请求
+    结束后关闭；idle_seconds 为空闲会话的回收时间，进行中的请求不受影响。
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "llm_service_connector": ("LLMServiceConnector",),
+                "pool_size": ("INT", {"default": DEFAULT_POOL_SIZE, "min": 1, "max": 256}),
+                "idle_seconds": ("FLOAT", {"default": DEFAULT_IDLE_SECONDS, "min": 0.0, "max": 86400.0, "step": 1.0}),
+            },
+        }
+
+    RETURN_TYPES = ("LLMServiceConnector", "STRING")
+    RETURN_NAMES = ("llm_service_connector", "log")
+    FUNCTION = "execute"
+    CATEGORY = MY_CATEGORY
+
+    def execute(self, llm_service_connector, pool_size=DEFAULT_POOL_SIZE, idle_seconds=DEFAULT_IDLE_SECONDS):
+        HTTP_POOL.configure(pool_size=pool_size, idle_seconds=idle_seconds)
+        return llm_service_connector, mie_log(
+            f"LLM连接池: pool_size={HTTP_POOL.pool_size}, idle_seconds={HTTP_POOL.idle_seconds}"
+        )
+
+
 class CheckLLMServiceConnectivity(object):
     @classmethod
     def INPUT_TYPES(cls):
@@ -1348,7 +1509,8 @@ class CheckLLMServiceConnectivity(object):
             test_messages = [{"role": "user", "content": "你是什么模型？"}]
             result = llm_service_connector.invoke(test_messages)
             # 只要没报错，说明服务可联通
-            return mie_log(f"LLM服务接口可联通 (HTTP 200 + 正常响应), 返回内容: {result}"),
+            stats = getattr(llm_service_connector, "get_transport_stats", dict)()
+            return mie_log(f"LLM服务接口可联通 (HTTP 200 + 正常响应), 返回内容: {result}, 连接池: {stats}"),
         except Exception as e:
             return mie_log(f"LLM服务检测失败: {str(e)}"),
 
@@ -1408,3 +1570,79 @@ class CallLLMService(object):
         result = llm_service_connector.invoke(messages, seed=seed, temperature=temperature, top_p=top_p,
                                               max_tokens=max_tokens)
         return (result.strip(),)
+
+
+def _split_batch_inputs(input_texts, split_mode):
+    """Split the batch node's text input into individual prompts.
+
+    ``json_list`` expects a JSON array (e.g. the output of
+    MieLoopFinalizeTextList); ``blank_line`` separates prompts by empty
+    lines so each prompt may span several lines; ``newline`` is one prompt
+    per non-empty line.
+    """
+    text = input_texts or ""
+    if split_mode == "json_list":
+        items = json.loads(text) if text.strip() else []
+        if not isinstance(items, list):
+            raise ValueError("input_texts must be a JSON list when split_mode is json_list")
+        return ["" if item is None else str(item) for item in items]
+    if split_mode == "blank_line":
+        return [chunk.strip() for chunk in re.split(r"\n\s*\n", text) if chunk.strip()]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+# 批量调用节点：把多条 input_text 并发发给同一个 LLMServiceConnector
+class CallLLMServiceBatch(object):
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "llm_service_connector": ("LLMServiceConnector",),
+                "input_texts": ("STRING", {"default": "", "multiline": True}),
+                "split_mode": (["newline", "blank_line", "json_list"], {"default": "newline"}),
+            },
+            "optional": {
+                "max_concurrency": ("INT", {"default": 4, "min": 1, "max": 32}),
+                "temperature": ("FLOAT", {"default": 0.7, "min": 0.0, "max": 2.0}),
+                "top_p": ("FLOAT", {"default": 0.9, "min": 0.0, "max": 1.0}),
+                "max_tokens": ("INT", {"default": 512, "min": 1}),
+                "seed": ("INT", {"default": 0, "min": 0}),
+            },
+        }
+
+    RETURN_TYPES = ("STRING", "STRING")
+    RETURN_NAMES = ("responses_json", "errors_json")
+    FUNCTION = "call"
+    CATEGORY = MY_CATEGORY
+
+    def call(self, llm_service_connector, input_texts, split_mode="newline", max_concurrency=4,
+             temperature=0.7, top_p=0.9, max_tokens=512, seed=None):
+        """
+        将 input_texts 拆成多条纯文本用户消息，通过 connector.invoke_many 并发调用。
+
+        输出两个与输入顺序一致的 JSON 列表：
+          - responses_json: 每条的回复（失败的位置为空字符串）
+          - errors_json:    每条的错误信息（成功的位置为 null）
+        单条失败不会中断整批。
+        """
+        texts = _split_batch_inputs(input_texts, split_mode)
+        messages_list = [[{"role": "user", "content": t}] for t in texts]
+        t0 = time.perf_counter()
+        results = llm_service_connector.invoke_many(
+            messages_list, max_concurrency=max_concurrency,
+            seed=seed, temperature=temperature, top_p=top_p, max_tokens=max_tokens,
+        )
+        responses, errors = [], []
+        for r in results:
+            if isinstance(r, Exception):
+                responses.append("")
+                errors.append(str(r))
+            else:
+                responses.append((r or "").strip())
+                errors.append(None)
+        failed = sum(1 for e in errors if e is not None)
+        mie_log(
+            f"CallLLMServiceBatch: {len(texts)} items, {failed} failed, "
+            f"max_concurrency={max_concurrency} in {time.perf_counter() - t0:.2f}s"
+        )
+        return (json.dumps(responses, ensure_ascii=False), json.dumps(errors, ensure_ascii=False))
@@ -0,0 +1,178 @@
+"""Opt-in persistent, content-addressed cache for LLM responses.
+
+Prompt-generator nodes re-hit the provider whenever ComfyUI's in-memory
+cache is evicted or the server restarts, even for a byte-identical request.
+`LLMResponseCache` stores each successful response on disk under the
+sha256 of the exact request: endpoint, the full `generate_payload` output
+(model, messages including inline image data, sampling params) and the
+caller's seed. Re-running the same workflow therefore costs zero API calls.
+
+One JSON file per entry. File mtime doubles as the LRU clock (touched on
+every hit); when the directory grows past ``max_bytes`` the least recently
+used entries are deleted. The directory size is tracked incrementally after
+one initial scan, so a write only rescans the directory when the tracked
+total crosses the bound (which also resyncs with other processes sharing
+it). Entries older than ``ttl_seconds`` (0 = never
+expire) are treated as misses and removed.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_DIR = os.path.join(_REPO_ROOT, "llm_response_cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class LLMResponseCache:
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=0):
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = int(max_bytes)
+        self.ttl_seconds = float(ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Tracked size of the directory; None until the first scan.
+        self._total_bytes = None
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key_for(api_url, payload, **extra):
+        """sha256 over the endpoint, the request payload and ``extra``
+        (e.g. ``seed``), serialized canonically so dict order cannot matter."""
+        blob = json.dumps(
+            {"url": api_url, "payload": payload, "extra": extra},
+            sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str,
+        )
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key):
+        """Return the cached response text, or None on miss / expiry."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        if self.ttl_seconds > 0 and now - float(entry.get("created", 0)) > self.ttl_seconds:
+            self._remove(path)
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get("response")
+
+    def put(self, key, response):
+        """Store ``response`` atomically, then enforce the size bound."""
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "response": response}, f, ensure_ascii=False)
+        old_size = self._size_of(path)
+        os.replace(tmp, path)
+        delta = self._size_of(path) - old_size
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += delta
+            over = self._total_bytes is None or self._total_bytes > self.max_bytes
+        if over:
+            self._evict_to_budget()
+
+    @staticmethod
+    def _size_of(path):
+        try:
+            return os.stat(path).st_size
+        except OSError:
+            return 0
+
+    def _remove(self, path):
+        size = self._size_of(path)
+        try:
+            os.remove(path)
+        except OSError:
+            return False
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+        return True
+
+    def _entries(self):
+        out = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, name))
+        return out
+
+    def _evict_to_budget(self):
+        """Rescan the directory and delete LRU entries past ``max_bytes``."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+        with self._lock:
+            self._total_bytes = total
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            return {
+                "cache_dir": self.cache_dir,
+                "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        for _, _, name in self._entries():
+            self._remove(os.path.join(self.cache_dir, name))
+
+
+_CACHES = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_response_cache(cache_dir=None, max_bytes=DEFAULT_MAX_BYTES, ttl_seconds=0):
+    """Shared cache instance per directory, so hit/miss counters survive
+    across connector copies. Size / TTL limits are updated in place."""
+    cache_dir = os.path.abspath(cache_dir or DEFAULT_CACHE_DIR)
+    with _CACHES_LOCK:
+        cache = _CACHES.get(cache_dir)
+        if cache is None:
+            cache = _CACHES[cache_dir] = LLMResponseCache(cache_dir, max_bytes, ttl_seconds)
+        else:
+            cache.max_bytes = int(max_bytes)
+            cache.ttl_seconds = float(ttl_seconds)
+        return cache
@@ -129,11 +129,29 @@ def reset_runtime_store():
     store["state_objects"] = {"image": {}}
     store["meta"] = {}
     store["_detect_cache"] = {}
+    store["_node_index_cache"] = {}
+    store["_expand_template_cache"] = {}
+    store["_ctx_snapshots"] = {}
+    store["offload_writers"] = {}
+    store["resident_index"] = {}
+    store["loop_metrics"] = {}
+    store["ref_owners"] = {}
+    store["ref_orphans"] = []
     yield
+    for writer in list(store.get("offload_writers", {}).values()):
+        writer.close()
     store["collectors"] = {"image": {}, "text": {}, "json": {}, "audio": {}}
     store["state_objects"] = {"image": {}}
     store["meta"] = {}
     store["_detect_cache"] = {}
+    store["_node_index_cache"] = {}
+    store["_expand_template_cache"] = {}
+    store["_ctx_snapshots"] = {}
+    store["offload_writers"] = {}
+    store["resident_index"] = {}
+    store["loop_metrics"] = {}
+    store["ref_owners"] = {}
+    store["ref_orphans"] = []
 
 
 @pytest.fixture
@@ -292,3 +310,30 @@ class FakeGraphBuilder:
 def fake_graph_builder():
     """Provide a FakeGraphBuilder instance for testing."""
     return FakeGraphBuilder()
+
+
+# ---------------------------------------------------------------------------
+# Prompt-enhancer helpers
+# ---------------------------------------------------------------------------
+def canned_frame_plan(n):
+    """``FramePlan`` stand-in: any non-None media is an ``n``-frame batch
+    whose frames all encode to the same canned data URL."""
+
+    class _Plan:
+        def __init__(self, image, name="", fmt=".jpg"):
+            self.total = 0 if image is None else n
+
+        def __len__(self):
+            return self.total
+
+        def urls(self, indices=None):
+            idx = range(self.total) if indices is None else set(indices)
+            return ["data:image/jpeg;base64,AAAA" for _ in idx] if self.total else []
+
+        def sample(self, k, sampler):
+            return self.urls(sampler(self.total, k))
+
+        def describe(self):
+            return "canned"
+
+    return _Plan
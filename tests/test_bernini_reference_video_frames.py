@@ -222,3 +222,63 @@ def test_is_changed_includes_reference_video_frames(bernini):
     )
     assert h2 != h4, "is_changed should differ when reference_video_frames changes"
     assert h2 != h0, "is_changed should differ when toggling 0 vs n"
+
+
+def test_only_sampled_frames_are_encoded(bernini):
+    """An 81-frame source sampled to 3 must pay 3 JPEG encodes, not 81."""
+    utils = sys.modules["_mienodes_internal.core.utils"]
+    real_encode = utils.image_tensor_to_data_url
+    calls = []
+
+    def counting_encode(image, fmt=".jpg"):
+        calls.append(1)
+        return real_encode(image, fmt=fmt)
+
+    captured, patcher = _capture_chat(bernini)
+    with patch.object(utils, "image_tensor_to_data_url", counting_encode):
+        with patch.object(bernini, "mie_log"):
+            with patcher:
+                enhancer = bernini.BerniniPromptEnhancer(
+                    _make_connector(),
+                    video_frames=3,
+                    reference_video_frames=2,
+                )
+                enhancer(
+                    "vrc2v - 参考内容视频编辑",
+                    "edit me",
+                    source=_make_video_batch(81),
+                    reference_video=_make_video_batch(81),
+                )
+    assert len(captured[0]) == 5
+    assert len(calls) == 5, f"expected 3 + 2 encodes, got {len(calls)}"
+
+
+def test_text_only_task_encodes_nothing(bernini):
+    utils = sys.modules["_mienodes_internal.core.utils"]
+    captured, patcher = _capture_chat(bernini)
+    with patch.object(utils, "image_tensor_to_data_url", MagicMock(return_value="x")) as enc:
+        with patch.object(bernini, "mie_log"):
+            with patcher:
+                enhancer = bernini.BerniniPromptEnhancer(_make_connector())
+                enhancer("t2i - 文生图", "a cat", source=_make_video_batch(10))
+    assert captured == [[]]
+    enc.assert_not_called()
+
+
+def test_is_changed_senses_pixels_without_encoding(bernini):
+    """Same shape, different content must change the hash, and computing
+    it must not JPEG-encode anything."""
+    node = bernini.BerniniPromptGenerator()
+    connector = _make_connector()
+    a = torch.zeros(8, 4, 4, 3)
+    b = a.clone()
+    b[5, 2, 2, 1] = 0.5
+    with patch.object(bernini, "FramePlan") as plan, \
+            patch.object(sys.modules["_mienodes_internal.core.utils"], "image_tensor_to_data_url") as enc:
+        ha = node.is_changed(connector, "i2v - 图生视频", "hi", 0, source=a)
+        ha2 = node.is_changed(connector, "i2v - 图生视频", "hi", 0, source=a.clone())
+        hb = node.is_changed(connector, "i2v - 图生视频", "hi", 0, source=b)
+    plan.assert_not_called()
+    enc.assert_not_called()
+    assert ha == ha2
+    assert ha != hb
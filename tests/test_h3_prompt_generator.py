@@ -6,7 +6,7 @@ Uses the same ``_mienodes_internal`` loader-stub injection as
 imported as a normal package).
 
 Coverage:
-* Frame-sampling helpers (``_sample_indices`` / ``_sample_urls``).
+* Frame-sampling helper (``_sample_indices``).
 * ``is_changed`` is a stable hash that varies when meaningful inputs
   change but is robust to identical re-runs.
 * ``H3PromptEnhancer.__call__`` graceful degradation: returns the original
@@ -23,6 +23,8 @@ from pathlib import Path
 
 import pytest
 
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+
 PROJECT_DIR = Path(__file__).resolve().parents[1]
 H3_GEN_PATH = PROJECT_DIR / "nodes" / "llm" / "h3_prompt_generator.py"
 H3_PROMPTS_PATH = PROJECT_DIR / "nodes" / "llm" / "h3_prompts.py"
@@ -92,6 +94,9 @@ def h3():
     return _load_h3()
 
 
+_canned_frame_plan = _conftest_mod.canned_frame_plan
+
+
 class FakeConnector:
     """Minimal connector double: exposes ``get_state`` + ``model`` so
     ``is_changed`` and ``mie_log`` work without a real LLM backend."""
@@ -117,14 +122,6 @@ def test_sample_indices(h3):
     assert gen._sample_indices(1, 8) == [0]
 
 
-def test_sample_urls_dedupes_endpoints(h3):
-    _, gen = h3
-    urls = [f"http://x/{i}" for i in range(4)]
-    assert gen._sample_urls(urls, 1) == ["http://x/2"]
-    assert gen._sample_urls(urls, 2) == ["http://x/0", "http://x/3"]
-    assert gen._sample_urls([], 5) == []
-
-
 # --------------------------------------------------------------------------- #
 # is_changed
 # --------------------------------------------------------------------------- #
@@ -225,7 +222,7 @@ def test_enhancer_empty_prompt_runs_pipeline(h3, monkeypatch):
             return "An H3 prompt synthesized from a default idea."
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls", lambda t: [] if t is None else ["data:image/jpeg;base64,AAAA"]
+        gen, "FramePlan", _canned_frame_plan(1)
     )
     enhancer = gen.H3PromptEnhancer(_Conn())
     # Empty string and whitespace-only both trigger the fallback.
@@ -304,7 +301,7 @@ def test_enhancer_t2v_single_invoke(h3, monkeypatch):
             return "An H3 T2VA structured prompt."
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls", lambda t: [] if t is None else ["data:image/jpeg;base64,AAAA"]
+        gen, "FramePlan", _canned_frame_plan(1)
     )
     enhancer = gen.H3PromptEnhancer(_Conn())
     out = enhancer("t2v - 文生视频", "a neon city", seed=7)
@@ -326,8 +323,7 @@ def test_enhancer_reference_two_stage_pipeline(h3, monkeypatch):
             return "An H3 Ref2VA structured prompt."
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls",
-        lambda t: ["data:image/jpeg;base64,AAAA"] * 4 if t is not None else [],
+        gen, "FramePlan", _canned_frame_plan(4)
     )
     enhancer = gen.H3PromptEnhancer(_Conn(), caption_sample_frames=8)
     out = enhancer(
@@ -352,8 +348,7 @@ def test_enhancer_reference_empty_caption_short_circuits(h3, monkeypatch):
             return ""  # empty response
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls",
-        lambda t: ["data:image/jpeg;base64,AAAA"] * 4 if t is not None else [],
+        gen, "FramePlan", _canned_frame_plan(4)
     )
     enhancer = gen.H3PromptEnhancer(_Conn())
     out = enhancer(
@@ -375,8 +370,7 @@ def test_enhancer_i2v_first_single_invoke(h3, monkeypatch):
             return "An H3 I2VA structured prompt."
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls",
-        lambda t: ["data:image/jpeg;base64,AAAA"] if t is not None else [],
+        gen, "FramePlan", _canned_frame_plan(1)
     )
     enhancer = gen.H3PromptEnhancer(_Conn())
     out = enhancer(
@@ -396,7 +390,7 @@ def test_enhancer_empty_llm_response_falls_back(h3, monkeypatch):
             return ""
 
     monkeypatch.setattr(
-        gen, "image_tensor_batch_to_data_urls", lambda t: [] if t is None else ["data:image/jpeg;base64,AAAA"]
+        gen, "FramePlan", _canned_frame_plan(1)
     )
     enhancer = gen.H3PromptEnhancer(_Conn())
     out = enhancer("t2v - 文生视频", "a neon city")
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Tests for SaveImageBatch|Mie / LoadImageBatch|Mie."""
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_show_and_save_anything_log import _load_module  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def general():
+    return _load_module()
+
+
+@pytest.mark.parametrize("name", ["cache.pt", "cache.mieraw"])
+def test_save_then_load_roundtrip(general, tmp_path, name):
+    images = torch.rand(3, 8, 8, 3)
+    path = str(tmp_path / "sub" / name)
+    general.SaveImageBatch().execute(images, path)
+    (loaded,) = general.LoadImageBatch().execute(path)
+    assert torch.equal(loaded, images)
+
+
+def test_mieraw_suffix_writes_raw_container(general, tmp_path):
+    path = tmp_path / "cache.mieraw"
+    general.SaveImageBatch().execute(torch.rand(1, 2, 2, 3), str(path))
+    assert general.is_mieraw(path)
+
+
+def test_missing_file_falls_back(general, tmp_path):
+    fallback = torch.ones(1, 2, 2, 3)
+    (out,) = general.LoadImageBatch().execute(str(tmp_path / "nope.mieraw"), fallback)
+    assert out is fallback
+    (out,) = general.LoadImageBatch().execute(str(tmp_path / "nope.mieraw"))
+    assert out.shape == (0, 1, 1, 3)
+
+
+@pytest.mark.parametrize("name", ["cache.pt", "cache.mieraw"])
+@pytest.mark.parametrize(
+    "start,count,stride", [(2, 3, 1), (1, 0, 2), (0, 4, 3), (7, 5, 1), (20, 1, 1)]
+)
+def test_frame_window_matches_slice(general, tmp_path, name, start, count, stride):
+    images = torch.rand(9, 4, 4, 3)
+    path = str(tmp_path / name)
+    general.SaveImageBatch().execute(images, path)
+    stop = None if count == 0 else start + count * stride
+    want = images[start:stop:stride]
+    (loaded,) = general.LoadImageBatch().execute(path, None, start, count, stride)
+    assert torch.equal(loaded, want)
+    # A miss applies the same window to the fallback.
+    (missed,) = general.LoadImageBatch().execute(
+        str(tmp_path / "missing.pt"), images, start, count, stride
+    )
+    assert torch.equal(missed, want)
+
+
+def test_pt_cache_hit_is_memory_mapped(general, tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.pt")
+    general.SaveImageBatch().execute(torch.rand(4, 2, 2, 3), path)
+    seen = []
+    real_load = torch.load
+
+    def spy(*args, **kwargs):
+        seen.append(kwargs.get("mmap"))
+        return real_load(*args, **kwargs)
+
+    monkeypatch.setattr(general.torch, "load", spy)
+    general.LoadImageBatch().execute(path, None, 1, 2, 1)
+    assert seen == [True]
+
+
+@pytest.mark.parametrize("name", ["cache.pt", "cache.mieraw"])
+def test_cache_hit_does_not_alias_the_file(general, tmp_path, name):
+    path = tmp_path / name
+    general.SaveImageBatch().execute(torch.zeros(4, 8, 8, 3), str(path))
+    (loaded,) = general.LoadImageBatch().execute(str(path), None, 1, 2, 1)
+    # Overwrite the payload in place: a mapped view would see the new bytes.
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        f.seek(size - 4 * 8 * 8 * 3 * 4)
+        f.write(b"\x7f" * (4 * 8 * 8 * 3 * 4))
+    assert torch.count_nonzero(loaded) == 0
+    path.unlink()
+    assert torch.count_nonzero(loaded) == 0
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""Tests for the pooled keep-alive transport in services/http_pool.py."""
+import importlib.util
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_llm_retry_logging import _load_llm_module  # noqa: E402
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+POOL_PATH = PROJECT_DIR / "services" / "http_pool.py"
+
+
+def _load_pool_module():
+    spec = importlib.util.spec_from_file_location("_mie_http_pool_under_test", str(POOL_PATH))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = json.dumps({"choices": [{"message": {"content": "pong"}}]}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _ChatHandler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_pool_key_drops_path_and_query():
+    pool = _load_pool_module()
+    a = pool.pool_key("https://Host.example/v1/models/a:generateContent?key=x", proxy="")
+    b = pool.pool_key("https://host.example/v1/models/b:generateContent?key=y", proxy="")
+    assert a == b == ("https://host.example", "")
+    assert pool.pool_key("https://host.example/x", proxy="http://p:8080")[1] == "http://p:8080"
+
+
+def test_repeated_posts_reuse_one_connection(server):
+    pool = _load_pool_module()
+    registry = pool.PooledSessionRegistry(pool_size=2)
+    for _ in range(5):
+        r = registry.post(server + "/v1/chat/completions", proxy="", json={"x": 1}, timeout=5)
+        assert r.status_code == 200
+        r.json()
+    stats = registry.stats(server + "/other/path", proxy="")
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["reused"] == 4
+    assert stats["handshake_seconds"] >= 0.0
+    registry.close_all()
+    assert registry.stats() == {}
+
+
+def test_idle_sessions_are_evicted(server):
+    pool = _load_pool_module()
+    registry = pool.PooledSessionRegistry(idle_seconds=0.0)
+    registry.post(server + "/a", proxy="", json={}, timeout=5).json()
+    first = registry.entry_for(server + "/a", proxy="")
+    # idle_seconds=0 -> the next touch evicts the old session and opens a new one.
+    with patch.object(pool.time, "monotonic", return_value=first.last_used + 1.0):
+        second = registry.entry_for(server + "/a", proxy="")
+    assert first is not second
+
+
+def test_connectors_share_pool_and_expose_stats(server):
+    llm = _load_llm_module()
+    llm.HTTP_POOL.close_all()
+    url = server + "/v1/chat/completions"
+    with patch.object(llm, "mie_log"), patch.object(llm, "resolve_token", return_value="tok"):
+        a = llm.GeneralLLMServiceConnector(url, "tok", "m1", proxy="")
+        b = llm.StandardOpenAICompatibleConnector(url, "tok", "m2", proxy="")
+        assert a.invoke([{"role": "user", "content": "hi"}]) == "pong"
+        assert b.invoke([{"role": "user", "content": "hi"}]) == "pong"
+    stats = a.get_transport_stats()
+    assert stats == b.get_transport_stats()
+    assert stats["requests"] == 2
+    assert stats["connections_opened"] == 1
+    # Diagnostics must not leak into the cache-key state string.
+    assert a.get_state() == f"{url}tokm1"
+    llm.HTTP_POOL.close_all()
+
+
+def test_busy_sessions_are_not_closed_until_their_request_ends():
+    pool = _load_pool_module()
+    registry = pool.PooledSessionRegistry(idle_seconds=0.0)
+    busy = registry.entry_for("http://a.example/x", proxy="", acquire=True)
+    with patch.object(pool.time, "monotonic", return_value=busy.last_used + 10.0), \
+            patch.object(busy.session, "close") as close:
+        assert registry.entry_for("http://a.example/x", proxy="") is busy
+        registry.configure(pool_size=registry.pool_size + 1)
+        close.assert_not_called()
+        registry._release(busy)
+        close.assert_called_once()
+
+
+def test_configure_without_changes_keeps_sessions():
+    pool = _load_pool_module()
+    registry = pool.PooledSessionRegistry(pool_size=4)
+    entry = registry.entry_for("http://a.example/x", proxy="")
+    registry.configure(pool_size=4, idle_seconds=30.0)
+    assert registry.idle_seconds == 30.0
+    assert registry.entry_for("http://a.example/y", proxy="") is entry
+
+
+def test_environment_proxy_is_looked_up_once_per_host():
+    pool = _load_pool_module()
+    with patch.object(pool.requests.utils, "get_environ_proxies", return_value={}) as lookup:
+        for _ in range(3):
+            pool.pool_key("https://h.example/v1/chat?x=1")
+    assert lookup.call_count == 1
+
+
+def test_set_http_pool_node_configures_the_shared_pool():
+    llm = _load_llm_module()
+    connector = object()
+    with patch.object(llm, "mie_log", side_effect=lambda m: m):
+        out, log = llm.SetLLMHttpPool().execute(connector, pool_size=3, idle_seconds=12.0)
+    assert out is connector
+    assert (llm.HTTP_POOL.pool_size, llm.HTTP_POOL.idle_seconds) == (3, 12.0)
+    assert "pool_size=3" in log
+    llm.HTTP_POOL.configure(pool_size=llm.DEFAULT_POOL_SIZE, idle_seconds=llm.DEFAULT_IDLE_SECONDS)
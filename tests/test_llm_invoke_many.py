@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Tests for GeneralLLMServiceConnector.invoke_many and CallLLMServiceBatch."""
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_llm_retry_logging import _load_llm_module  # noqa: E402
+
+
+@pytest.fixture
+def llm_module():
+    return _load_llm_module()
+
+
+def _ok(text):
+    r = MagicMock()
+    r.status_code = 200
+    r.json.return_value = {"choices": [{"message": {"content": text}}]}
+    return r
+
+
+def _fake_post_echo(url, json=None, **kwargs):
+    """Echo the user content back; delay inversely to keep order honest."""
+    content = json["messages"][-1]["content"]
+    if content == "boom":
+        r = MagicMock()
+        r.status_code = 400
+        r.text = "bad request"
+        return r
+    time.sleep(0.05 if content == "a" else 0.0)
+    return _ok(f"echo:{content}")
+
+
+def test_invoke_many_preserves_order_and_captures_errors(llm_module):
+    with patch.object(llm_module, "mie_log"), \
+         patch("services.llm.requests.Session.post", side_effect=_fake_post_echo):
+        c = llm_module.GeneralLLMServiceConnector("https://x/v1/chat/completions", "tok", "m")
+        out = c.invoke_many(
+            [[{"role": "user", "content": t}] for t in ("a", "boom", "c")],
+            max_concurrency=3,
+        )
+    assert out[0] == "echo:a"
+    assert isinstance(out[1], Exception) and "HTTP 400" in str(out[1])
+    assert out[2] == "echo:c"
+
+
+def test_invoke_many_bounds_concurrency(llm_module):
+    in_flight = []
+    peak = [0]
+    lock = threading.Lock()
+
+    def slow_post(url, json=None, **kwargs):
+        with lock:
+            in_flight.append(1)
+            peak[0] = max(peak[0], len(in_flight))
+        time.sleep(0.02)
+        with lock:
+            in_flight.pop()
+        return _ok("ok")
+
+    with patch.object(llm_module, "mie_log"), \
+         patch("services.llm.requests.Session.post", side_effect=slow_post):
+        c = llm_module.GeneralLLMServiceConnector("https://x/v1/chat/completions", "tok", "m")
+        out = c.invoke_many([[{"role": "user", "content": str(i)}] for i in range(12)], max_concurrency=3)
+    assert out == ["ok"] * 12
+    assert 1 < peak[0] <= 3
+
+
+def test_invoke_many_retries_each_item_on_5xx(llm_module):
+    r5 = MagicMock()
+    r5.status_code = 503
+    r5.text = "busy"
+    with patch.object(llm_module, "mie_log"), \
+         patch("services.llm.time.sleep"), \
+         patch("services.llm.requests.Session.post", side_effect=[r5, _ok("fine")]):
+        c = llm_module.GeneralLLMServiceConnector("https://x/v1/chat/completions", "tok", "m")
+        assert c.invoke_many([[{"role": "user", "content": "x"}]], max_concurrency=4) == ["fine"]
+    assert c.invoke_many([]) == []
+
+
+@pytest.mark.parametrize(
+    "mode,text,expected",
+    [
+        ("newline", "a\n\n b \nc", ["a", "b", "c"]),
+        ("blank_line", "line 1\nline 2\n\nsecond", ["line 1\nline 2", "second"]),
+        ("json_list", json.dumps(["x", "y\nz"]), ["x", "y\nz"]),
+    ],
+)
+def test_split_batch_inputs(llm_module, mode, text, expected):
+    assert llm_module._split_batch_inputs(text, mode) == expected
+
+
+def test_batch_node_outputs_aligned_json_lists(llm_module):
+    with patch.object(llm_module, "mie_log"), \
+         patch("services.llm.requests.Session.post", side_effect=_fake_post_echo):
+        c = llm_module.GeneralLLMServiceConnector("https://x/v1/chat/completions", "tok", "m")
+        responses, errors = llm_module.CallLLMServiceBatch().call(c, "a\nboom\nc", "newline", max_concurrency=2)
+    assert json.loads(responses) == ["echo:a", "", "echo:c"]
+    errs = json.loads(errors)
+    assert errs[0] is None and errs[2] is None
+    assert "HTTP 400" in errs[1]
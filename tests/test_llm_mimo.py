@@ -214,7 +214,7 @@ def test_invoke_posts_to_standard_url_and_returns_content(llm_module):
         "choices": [{"message": {"content": "hello from MiMo"}}]
     }
     with patch.object(llm_module, "mie_log"), \
-         patch("services.llm.requests.post", return_value=r) as fake_post, \
+         patch("services.llm.requests.Session.post", return_value=r) as fake_post, \
          patch("services.llm.resolve_token", return_value="sk-test"):
         c = llm_module.MiMoConnectorGeneral("tok", "mimo-v2.5-pro")
         out = c.invoke([{"role": "user", "content": "hi"}], max_tokens=128)
@@ -235,7 +235,7 @@ def test_invoke_posts_to_token_plan_url(llm_module):
         "choices": [{"message": {"content": "ok"}}]
     }
     with patch.object(llm_module, "mie_log"), \
-         patch("services.llm.requests.post", return_value=r) as fake_post, \
+         patch("services.llm.requests.Session.post", return_value=r) as fake_post, \
          patch("services.llm.resolve_token", return_value="tp-test"):
         c = llm_module.MiMoTokenPlanConnectorGeneral("tp-test", "mimo-v2.5-pro")
         out = c.invoke([{"role": "user", "content": "hi"}])
@@ -261,7 +261,7 @@ def test_5xx_response_is_retried_with_body_snippet(llm_module):
     captured = []
     with patch.object(llm_module, "mie_log", side_effect=lambda m: captured.append(m)), \
          patch("services.llm.time.sleep"), \
-         patch("services.llm.requests.post", side_effect=[r5, r2]), \
+         patch("services.llm.requests.Session.post", side_effect=[r5, r2]), \
          patch("services.llm.resolve_token", return_value="tok"):
         c = llm_module.MiMoConnectorGeneral("tok", "mimo-v2.5-pro")
         out = c.invoke([{"role": "user", "content": "hi"}])
@@ -288,7 +288,7 @@ def test_think_block_is_stripped_from_mimo_response(llm_module):
         }]
     }
     with patch.object(llm_module, "mie_log"), \
-         patch("services.llm.requests.post", return_value=r), \
+         patch("services.llm.requests.Session.post", return_value=r), \
          patch("services.llm.resolve_token", return_value="tok"):
         c = llm_module.MiMoConnectorGeneral("tok", "mimo-v2.5-pro")
         out = c.invoke([{"role": "user", "content": "hi"}])
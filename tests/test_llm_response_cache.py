@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""Tests for the opt-in on-disk LLM response cache."""
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_llm_retry_logging import _load_llm_module  # noqa: E402
+
+
+@pytest.fixture
+def llm_module():
+    return _load_llm_module()
+
+
+def _ok(text):
+    r = MagicMock()
+    r.status_code = 200
+    r.json.return_value = {"choices": [{"message": {"content": text}}]}
+    return r
+
+
+def _cached_connector(llm_module, tmp_path, **kwargs):
+    conn = llm_module.StandardOpenAICompatibleConnector(
+        "https://example.invalid/v1/chat/completions", "tok", "m",
+        max_retries=1, retry_delay=0,
+    )
+    node = llm_module.SetLLMResponseCache()
+    cached, _log = node.execute(conn, True, cache_dir=str(tmp_path), **kwargs)
+    return conn, cached
+
+
+def test_identical_request_hits_disk_cache(llm_module, tmp_path):
+    conn, cached = _cached_connector(llm_module, tmp_path)
+    msgs = [{"role": "user", "content": "hi"}]
+    with patch("services.llm.requests.Session.post", return_value=_ok("answer")) as post:
+        assert cached.invoke(msgs, seed=1) == "answer"
+        assert cached.invoke(msgs, seed=1) == "answer"
+    assert post.call_count == 1
+    stats = cached.response_cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+    # The upstream connector is untouched by the cache node.
+    assert conn.response_cache is None
+
+
+def test_cache_survives_new_instance(llm_module, tmp_path):
+    """A fresh cache object on the same directory (e.g. after a restart)
+    still serves the stored response."""
+    _conn, cached = _cached_connector(llm_module, tmp_path)
+    msgs = [{"role": "user", "content": "hi"}]
+    with patch("services.llm.requests.Session.post", return_value=_ok("answer")):
+        cached.invoke(msgs)
+    cache_mod = sys.modules[type(cached.response_cache).__module__]
+    fresh = cache_mod.LLMResponseCache(str(tmp_path))
+    cached.response_cache = fresh
+    with patch("services.llm.requests.Session.post") as post:
+        assert cached.invoke(msgs) == "answer"
+    post.assert_not_called()
+    assert fresh.hits == 1
+
+
+@pytest.mark.parametrize("change", [
+    {"seed": 2},
+    {"temperature": 0.1},
+    {"messages": [{"role": "user", "content": "other"}]},
+])
+def test_key_covers_seed_params_and_messages(llm_module, tmp_path, change):
+    _conn, cached = _cached_connector(llm_module, tmp_path)
+    base = {"messages": [{"role": "user", "content": "hi"}], "seed": 1, "temperature": 0.7}
+    varied = dict(base, **change)
+    with patch("services.llm.requests.Session.post", side_effect=[_ok("a"), _ok("b")]) as post:
+        assert cached.invoke(base.pop("messages"), **base) == "a"
+        assert cached.invoke(varied.pop("messages"), **varied) == "b"
+    assert post.call_count == 2
+
+
+def test_empty_response_is_not_cached(llm_module, tmp_path):
+    _conn, cached = _cached_connector(llm_module, tmp_path)
+    msgs = [{"role": "user", "content": "hi"}]
+    with patch("services.llm.requests.Session.post", side_effect=[_ok(""), _ok("ok")]) as post:
+        assert cached.invoke(msgs) == ""
+        assert cached.invoke(msgs) == "ok"
+    assert post.call_count == 2
+
+
+def test_ttl_expiry_counts_as_miss(llm_module, tmp_path):
+    cache_mod = sys.modules[llm_module.get_response_cache.__module__]
+    cache = cache_mod.LLMResponseCache(str(tmp_path), ttl_seconds=10)
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    with patch.object(cache_mod.time, "time", return_value=time.time() + 60):
+        assert cache.get("k") is None
+    assert not os.path.exists(os.path.join(str(tmp_path), "k.json"))
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_size_bound_evicts_least_recently_used(llm_module, tmp_path):
+    cache_mod = sys.modules[llm_module.get_response_cache.__module__]
+    cache = cache_mod.LLMResponseCache(str(tmp_path), max_bytes=10 ** 9)
+    for i, key in enumerate(("a", "b", "c")):
+        cache.put(key, "x" * 100)
+        os.utime(os.path.join(str(tmp_path), f"{key}.json"), (1000 + i, 1000 + i))
+    # Touch "a" so "b" becomes the LRU entry.
+    assert cache.get("a") is not None
+    entry_size = os.path.getsize(os.path.join(str(tmp_path), "a.json"))
+    # Room for three entries (plus slack for timestamp width), not four.
+    cache.max_bytes = entry_size * 3 + entry_size // 2
+    cache.put("d", "x" * 100)
+    remaining = sorted(n[:-5] for n in os.listdir(str(tmp_path)))
+    assert remaining == ["a", "c", "d"]
+    assert cache.evictions == 1
+
+
+def test_writes_under_the_bound_do_not_rescan(llm_module, tmp_path):
+    cache_mod = sys.modules[llm_module.get_response_cache.__module__]
+    cache = cache_mod.LLMResponseCache(str(tmp_path), max_bytes=10 ** 9)
+    cache.put("seed", "x")
+    with patch.object(cache_mod.os, "listdir", wraps=os.listdir) as listdir:
+        for i in range(20):
+            cache.put(f"k{i}", "x" * 10)
+        cache.put("k0", "x" * 50)
+    assert listdir.call_count == 0
+    assert cache._total_bytes == cache.stats()["bytes"]
+    assert not [n for n in os.listdir(str(tmp_path)) if n.endswith(".tmp")]
+
+
+def test_disabled_node_clears_cache(llm_module, tmp_path):
+    _conn, cached = _cached_connector(llm_module, tmp_path)
+    off, log = llm_module.SetLLMResponseCache().execute(cached, False)
+    assert off.response_cache is None
+    assert cached.response_cache is not None
@@ -75,7 +75,7 @@ def test_5xx_retry_logs_body_snippet_and_per_attempt(llm_module):
     captured = []
     with patch.object(llm_module, "mie_log", side_effect=lambda m: captured.append(m)), \
          patch("services.llm.time.sleep"), \
-         patch("services.llm.requests.post", side_effect=_make_5xx_then_200()), \
+         patch("services.llm.requests.Session.post", side_effect=_make_5xx_then_200()), \
          patch("services.llm.resolve_token", return_value="tok"):
         c = llm_module.GeneralLLMServiceConnector(
             api_url="https://x/v1/chat/completions", manual_token="", model="M3"
@@ -103,7 +103,7 @@ def test_timeout_path_logs_elapsed_and_raises_after_max_retries(llm_module):
 
     with patch.object(llm_module, "mie_log", side_effect=lambda m: captured.append(m)), \
          patch("services.llm.time.sleep") as fake_sleep, \
-         patch("services.llm.requests.post", side_effect=raise_timeout), \
+         patch("services.llm.requests.Session.post", side_effect=raise_timeout), \
          patch("services.llm.resolve_token", return_value="tok"):
         c = llm_module.GeneralLLMServiceConnector(
             api_url="https://x/v1/chat/completions", manual_token="", model="M3"
@@ -153,7 +153,7 @@ def _run_with_response(llm_module, response_json, captured):
     resp.json.return_value = response_json
     with patch.object(llm_module, "mie_log", side_effect=lambda m: captured.append(m)), \
          patch("services.llm.time.sleep"), \
-         patch("services.llm.requests.post", return_value=resp), \
+         patch("services.llm.requests.Session.post", return_value=resp), \
          patch("services.llm.resolve_token", return_value="tok"):
         return _conn(llm_module).invoke([{"role": "user", "content": "hi"}])
 
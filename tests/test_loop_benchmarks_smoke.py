@@ -0,0 +1,55 @@
+"""Smoke run of benchmarks/run_loop_benchmarks.py with tiny sizes."""
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_RUNNER = Path(__file__).resolve().parent.parent / "benchmarks" / "run_loop_benchmarks.py"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    spec = importlib.util.spec_from_file_location("_mie_loop_benchmarks", _RUNNER)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+def test_quick_run_covers_every_suite(bench, tmp_path):
+    out = tmp_path / "report.json"
+    assert bench.main(["--quick", "--repeat", "1", "--out", str(out)]) == 0
+    report = json.loads(out.read_text(encoding="utf-8"))
+    names = {r["name"] for r in report["results"]}
+    assert names == {
+        "collect_loop_body", "build_expand_graph", "loop_end_rounds", "loop_driver_rounds",
+        "chunked_disk_merge",
+    }
+    assert all(r["median_s"] >= 0 for r in report["results"])
+    assert all(
+        r["done"] for r in report["results"] if r["name"] in {"loop_end_rounds", "loop_driver_rounds"}
+    )
+    drivers = {r["params"]["driver"] for r in report["results"] if r["name"] == "loop_driver_rounds"}
+    assert drivers == {"expand", "inline"}
+
+
+def test_compare_flags_regressions_only(bench, tmp_path):
+    base = {"results": [
+        {"name": "x", "params": {"nodes": 1}, "median_s": 1.0},
+        {"name": "y", "params": {"nodes": 1}, "median_s": 1.0},
+    ]}
+    now = {"results": [
+        {"name": "x", "params": {"nodes": 1}, "median_s": 1.5},
+        {"name": "y", "params": {"nodes": 1}, "median_s": 1.05},
+    ]}
+    regressions = bench.compare(now, base, 1.2)
+    assert [r["name"] for r in regressions] == ["x"]
+
+    base_path = tmp_path / "base.json"
+    base_path.write_text(json.dumps({"results": [
+        {"name": "collect_loop_body", "params": {"nodes": 50}, "median_s": 1e-9},
+    ]}), encoding="utf-8")
+    rc = bench.main(["--quick", "--only", "detect", "--sizes", "50", "--repeat", "1",
+                     "--out", str(tmp_path / "r.json"), "--compare", str(base_path)])
+    assert rc == 1
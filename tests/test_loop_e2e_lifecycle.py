@@ -80,7 +80,7 @@ def _run_loop(start_kwargs, body_fn, *, max_rounds=30):
             # Last round: let End.execute() mark done=True
             ctx["index"] = total_count - 1
             ctx["is_last"] = True
-            ctx["current_params"] = ctx["params_list"][total_count - 1]
+            ctx["current_params"] = loop_module._loop_params_at(ctx, total_count - 1)
             end_result = end_node.execute(body_out_ctx)
             if isinstance(end_result, dict):
                 # Expand result dict — unexpected on last round
@@ -93,7 +93,7 @@ def _run_loop(start_kwargs, body_fn, *, max_rounds=30):
             # Not last: manually advance context (mirrors End's internal logic)
             next_index = curr_index + 1
             ctx["index"] = next_index
-            ctx["current_params"] = ctx["params_list"][next_index]
+            ctx["current_params"] = loop_module._loop_params_at(ctx, next_index)
             ctx["is_last"] = next_index == total_count - 1
             done = False
 
@@ -13,6 +13,8 @@ frames at 704x1280 fp32 ~= 21 GB). Verifies that the chunked merge:
 
 import glob
 import os
+import sys
+from collections import deque
 
 import pytest
 import torch
@@ -314,6 +316,95 @@ def test_chunked_disk_merge_memmap_uses_smaller_peak_than_pre_allocate(tmp_path,
     assert write_shapes, "no w+ mmap call captured"
     assert write_shapes[0][0] == 24  # 6 batches * 4 frames = 24
 
+# ---- single-pass path (no phase-1 chunk files) -------------------------
+
+
+@pytest.mark.parametrize("avoid_oom", [True, False])
+def test_chunked_disk_merge_single_pass_matches_one_shot_cat(tmp_path, avoid_oom):
+    expected, paths = _make_disk_batches(tmp_path, count=5, frames_per=3)
+    out_path = tmp_path / "merged.pt"
+    stats = {}
+    _chunked_disk_merge(
+        _to_disk_items(paths), out_path, kind="image",
+        avoid_oom=avoid_oom, single_pass=True, stats=stats,
+    )
+    loaded = torch.load(str(out_path), map_location="cpu", weights_only=False)
+    assert torch.equal(loaded, torch.cat(expected, dim=0))
+    assert stats["mode"] == "single_pass" and stats["frames"] == 15
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert all(p.exists() for p in paths)
+
+
+def test_chunked_disk_merge_single_pass_writes_no_chunk_files(tmp_path, monkeypatch):
+    _, paths = _make_disk_batches(tmp_path, count=6, frames_per=2)
+    saved = []
+    real_save = torch.save
+
+    def spy_save(obj, f, *args, **kwargs):
+        saved.append(Path(f).name)
+        return real_save(obj, f, *args, **kwargs)
+
+    monkeypatch.setattr(loop_module.torch, "save", spy_save)
+    _chunked_disk_merge(
+        _to_disk_items(paths), tmp_path / "merged.pt", chunk_size=2,
+        kind="image", single_pass=True,
+    )
+    assert saved == ["merged.pt"]
+
+
+def test_chunked_disk_merge_stats_single_pass_writes_less(tmp_path):
+    _, paths = _make_disk_batches(tmp_path, count=6, frames_per=2, h=16, w=16)
+    chunked, single = {}, {}
+    _chunked_disk_merge(
+        _to_disk_items(paths), tmp_path / "a.pt", chunk_size=2, kind="image",
+        stats=chunked,
+    )
+    _chunked_disk_merge(
+        _to_disk_items(paths), tmp_path / "b.pt", kind="image",
+        single_pass=True, stats=single,
+    )
+    assert chunked["mode"] == "chunked"
+    assert 0 < single["bytes_written"] < chunked["bytes_written"]
+    for s in (chunked, single):
+        assert s["peak_rss_bytes"] is None or s["peak_rss_bytes"] > 0
+
+
+def test_chunked_disk_merge_single_pass_warns_on_pt_target(tmp_path, recwarn):
+    _, paths = _make_disk_batches(tmp_path, count=2, frames_per=2)
+    with pytest.warns(RuntimeWarning, match="writes the data twice"):
+        _chunked_disk_merge(
+            _to_disk_items(paths), tmp_path / "a.pt", kind="image", single_pass=True,
+        )
+    recwarn.clear()
+    _chunked_disk_merge(
+        _to_disk_items(paths), tmp_path / "b.mieraw", kind="image", single_pass=True,
+    )
+    _chunked_disk_merge(
+        _to_disk_items(paths), tmp_path / "c.pt", kind="image",
+        single_pass=True, avoid_oom=False,
+    )
+    assert not [w for w in recwarn if issubclass(w.category, RuntimeWarning)]
+
+
+def test_chunked_disk_merge_single_pass_validates_before_writing(tmp_path):
+    _, paths = _make_disk_batches(tmp_path, count=3, frames_per=2)
+    torch.save(torch.rand(2, 8, 8, 3), str(paths[2]))
+    out_path = tmp_path / "merged.pt"
+
+    def validate(batch, idx, merged):
+        if merged is not None and tuple(batch.shape[1:]) != tuple(merged.shape[1:]):
+            raise ValueError(f"shape mismatch at {idx}")
+
+    with pytest.raises(ValueError, match="shape mismatch at 2"):
+        _chunked_disk_merge(
+            _to_disk_items(paths), out_path, kind="image",
+            validate_batch=validate, single_pass=True,
+        )
+    assert not out_path.exists()
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert all(p.exists() for p in paths)
+
+
 # ---------------------------------------------------------------------------
 # MieLoopFinalizeImages contract: the only user-facing knob is avoid_oom.
 # ---------------------------------------------------------------------------
@@ -425,7 +516,7 @@ def test_finalize_images_avoid_oom_false_still_loads_image_when_possible(
 def test_finalize_images_preserves_per_batch_files_on_failure(
     sample_loop_ctx, tmp_path, monkeypatch
 ):
-    """Hard contract: if the merge fails, the per-batch image_*.pt files
+    """Hard contract: if the merge fails, the per-batch image_*.mieraw files
     MUST survive. This is the only safety net for a multi-hour loop run
     -- losing them is losing the entire run."""
     collect = MieLoopCollectImage()
@@ -433,19 +524,86 @@ def test_finalize_images_preserves_per_batch_files_on_failure(
     ctx = collect.execute(sample_loop_ctx, torch.rand(2, 4, 4, 3), True, str(tmp_path))[0]
     ctx = collect.execute(ctx, torch.rand(2, 4, 4, 3), True, str(tmp_path))[0]
 
-    real_load = torch.load
+    merge_mod = sys.modules[_chunked_disk_merge.__module__]
+    real_load = merge_mod.load_tensor_file
     calls = {"n": 0}
 
     def flaky(*args, **kwargs):
         calls["n"] += 1
-        if calls["n"] >= 3:
+        if calls["n"] >= 2:
             raise RuntimeError("simulated disk error")
         return real_load(*args, **kwargs)
 
-    monkeypatch.setattr(loop_module.torch, "load", flaky)
+    monkeypatch.setattr(merge_mod, "load_tensor_file", flaky)
 
     with pytest.raises(RuntimeError):
         finalize.execute(ctx, True)
-    leftovers = list(Path(tmp_path).glob("image_*.pt"))
+    leftovers = list(Path(tmp_path).glob("image_*.mieraw"))
     assert leftovers, "input batches must be preserved on failure"
 
+
+
+# ---- phase-1 read-ahead --------------------------------------------------
+
+
+def _merge_module():
+    return sys.modules[_chunked_disk_merge.__module__]
+
+
+@pytest.mark.parametrize("workers,budget", [(0, 0), (1, 0), (3, 1 << 30)])
+def test_chunked_disk_merge_prefetch_matches_one_shot_cat(tmp_path, workers, budget):
+    expected, paths = _make_disk_batches(tmp_path, count=7, frames_per=2)
+    out_path = tmp_path / "merged.pt"
+    stats = {}
+    _chunked_disk_merge(
+        _to_disk_items(paths), out_path, chunk_size=3, kind="image",
+        prefetch_workers=workers, prefetch_bytes=budget, stats=stats,
+    )
+    loaded = torch.load(str(out_path), map_location="cpu", weights_only=False)
+    assert torch.equal(loaded, torch.cat(expected, dim=0))
+    assert stats["prefetch_wait_s"] >= 0
+
+
+def test_prefetcher_stays_within_byte_budget(tmp_path, monkeypatch):
+    merge = _merge_module()
+    _, paths = _make_disk_batches(tmp_path, count=8, frames_per=2)
+    one = paths[0].stat().st_size
+    loads = []
+    real_load = merge._load_batch
+    monkeypatch.setattr(merge, "_load_batch", lambda p: (loads.append(p), real_load(p))[1])
+    prefetcher = merge._BatchPrefetcher(
+        paths, workers=4, budget_bytes=2 * one, stats=merge._MergeStats("chunked"),
+    )
+    ahead = []
+    try:
+        for idx, batch in prefetcher:
+            # Submitted-but-unconsumed batches never exceed the budget (2 here).
+            ahead.append(prefetcher._submitted - (idx + 1))
+            assert batch.shape[0] == 2
+    finally:
+        prefetcher.close()
+    assert max(ahead) <= 2 and max(ahead) >= 1
+    assert loads == paths
+
+
+def test_prefetcher_reraises_at_failed_index_and_cancels_rest(tmp_path, monkeypatch):
+    merge = _merge_module()
+    _, paths = _make_disk_batches(tmp_path, count=6, frames_per=2)
+    real_load = merge._load_batch
+
+    def flaky(path):
+        if path == paths[2]:
+            raise RuntimeError("simulated read error")
+        return real_load(path)
+
+    monkeypatch.setattr(merge, "_load_batch", flaky)
+    prefetcher = merge._BatchPrefetcher(
+        paths, workers=2, budget_bytes=1 << 30, stats=merge._MergeStats("chunked"),
+    )
+    seen = []
+    with pytest.raises(RuntimeError, match="simulated read error"):
+        for idx, _batch in prefetcher:
+            seen.append(idx)
+    prefetcher.close()
+    assert seen == [0, 1]
+    assert prefetcher._pending == deque()
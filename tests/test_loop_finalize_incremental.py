@@ -5,6 +5,7 @@ the new failure-path behavior (disk cache preserved on merge failure) and the
 start/failed logging.
 """
 
+import sys
 from pathlib import Path
 
 import pytest
@@ -101,16 +102,20 @@ def test_finalize_images_many_disk_batches_matches_one_shot(sample_loop_ctx, tmp
 
 
 def test_finalize_images_disk_failure_preserves_files(sample_loop_ctx, monkeypatch, tmp_path):
-    """If torch.load fails mid-merge, disk cache files are preserved (not cleaned)."""
+    """If a batch read fails mid-merge, disk cache files are preserved (not cleaned)."""
     collect = MieLoopCollectImage()
     finalize = MieLoopFinalizeImages()
     ctx = collect.execute(sample_loop_ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
     ctx = collect.execute(ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
     ref = ctx["collectors"]["image"]["ref"]
     paths = [Path(x["disk_path"]) for x in RUNTIME_STORE["collectors"]["image"][ref]]
+    loop_module._flush_offload_writer(ctx["run_id"])
     assert all(p.exists() for p in paths)
 
-    real_load = torch.load
+    # Offloaded IMAGE batches are .mieraw; the merge reads them through
+    # load_tensor_file, not torch.load.
+    merge_mod = sys.modules[loop_module._chunked_disk_merge.__module__]
+    real_load = merge_mod.load_tensor_file
     calls = {"n": 0}
 
     def flaky_load(*args, **kwargs):
@@ -119,7 +124,7 @@ def test_finalize_images_disk_failure_preserves_files(sample_loop_ctx, monkeypat
             raise RuntimeError("simulated load failure")
         return real_load(*args, **kwargs)
 
-    monkeypatch.setattr(loop_module.torch, "load", flaky_load)
+    monkeypatch.setattr(merge_mod, "load_tensor_file", flaky_load)
 
     with pytest.raises(RuntimeError):
         finalize.execute(ctx, True)
@@ -238,6 +243,65 @@ def test_finalize_audio_many_disk_batches_matches_one_shot(tmp_path):
     assert all(not p.exists() for p in paths), "audio success must clean disk cache"
 
 
+def _audio_ctx(loop_id, count):
+    return {
+        "version": 3, "loop_id": loop_id, "run_id": f"{loop_id}_run",
+        "mode": "for_each", "index": 0, "count": count, "is_last": False,
+        "params_list": [{}] * count, "current_params": {}, "state": {},
+        "collectors": {"audio": {"ref": None, "count": 0}},
+        "meta": {"body_in_id": "10", "body_out_id": "20", "end_id": "30"},
+    }
+
+
+def test_finalize_audio_preallocates_without_running_cat(monkeypatch, tmp_path):
+    """Audio: mixed memory/disk items are copied into one buffer, no torch.cat."""
+    collect = MieLoopCollectAudio()
+    ctx = _audio_ctx("audio_prealloc", 6)
+    expected = []
+    for i in range(6):
+        a = _make_audio(3 + i)
+        expected.append(a["waveform"])
+        ctx = collect.execute(ctx, a, i % 2 == 0, str(tmp_path))[0]
+    ref = ctx["collectors"]["audio"]["ref"]
+    disk_items = [x for x in RUNTIME_STORE["collectors"]["audio"][ref] if "disk_path" in x]
+    assert disk_items and all(x["shape"][-1] > 0 and x["sample_rate"] == 24000 for x in disk_items)
+    want = torch.cat(expected, dim=-1)
+
+    def no_cat(*args, **kwargs):
+        raise AssertionError("finalize must not torch.cat")
+
+    monkeypatch.setattr(loop_module.torch, "cat", no_cat)
+    merged = MieLoopFinalizeAudio().execute(ctx, True)[0]
+    monkeypatch.undo()
+
+    assert torch.equal(merged["waveform"], want)
+
+
+def test_finalize_audio_stream_to_memmap_matches_in_memory(tmp_path):
+    """Audio: stream_to_memmap returns the same waveform backed by a file."""
+    collect = MieLoopCollectAudio()
+    ctx = _audio_ctx("audio_mmap", 5)
+    expected = []
+    for _ in range(5):
+        a = _make_audio(4)
+        expected.append(a["waveform"])
+        ctx = collect.execute(ctx, a, True, str(tmp_path))[0]
+    ref = ctx["collectors"]["audio"]["ref"]
+    paths = [Path(x["disk_path"]) for x in RUNTIME_STORE["collectors"]["audio"][ref]]
+
+    merged = MieLoopFinalizeAudio().execute(ctx, True, stream_to_memmap=True)[0]
+
+    assert torch.equal(merged["waveform"], torch.cat(expected, dim=-1))
+    assert merged["sample_rate"] == 24000
+    assert all(not p.exists() for p in paths)
+    (mmap_file,) = tmp_path.glob(f"merged_audio_{ref}_*.mmap")
+    assert RUNTIME_STORE["meta"][ctx["run_id"]]["finalize_files"] == [str(mmap_file)]
+    # The merged buffer goes with the run's runtime state.
+    del merged
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert not mmap_file.exists()
+
+
 # ----------------------------------------------------------------------
 # Logging
 # ----------------------------------------------------------------------
@@ -276,3 +340,22 @@ def test_finalize_logs_failed_preserves_files_on_error(sample_loop_ctx, monkeypa
     assert "disk_files_preserved=true" in out
     assert str(tmp_path) in out  # cache_dir printed for manual recovery
     assert all(p.exists() for p in paths)
+
+
+@pytest.mark.parametrize("codec", ["lossless", "fp16"])
+def test_finalize_audio_decodes_compressed_offload(tmp_path, codec):
+    collect = MieLoopCollectAudio()
+    ctx = _audio_ctx(f"audio_codec_{codec}", 3)
+    expected = []
+    for i in range(3):
+        a = _make_audio(4 + i)
+        expected.append(a["waveform"])
+        ctx = collect.execute(ctx, a, True, str(tmp_path), codec)[0]
+    assert len(list(tmp_path.rglob("audio_*.mieraw"))) == 3
+    merged = MieLoopFinalizeAudio().execute(ctx, True)[0]
+    want = torch.cat(expected, dim=-1)
+    assert merged["sample_rate"] == 24000
+    if codec == "lossless":
+        assert torch.equal(merged["waveform"], want)
+    else:
+        assert torch.allclose(merged["waveform"], want, atol=1e-3)
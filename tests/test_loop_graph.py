@@ -233,6 +233,70 @@ def test_explore_forward_no_successors():
     assert visited == {"10"}
 
 
+def test_node_index_consumers_and_classes():
+    """Consumer lists are de-duplicated and keep prompt order; by_class
+    groups on the base class type."""
+    dynprompt = {
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {}},
+        "15": {"class_type": "KSampler", "inputs": {"a": ["10", 0], "b": ["10", 1]}},
+        "12": {"class_type": "SaveImageBatch|Mie", "inputs": {"images": ["15", 0]}},
+        "20": {"class_type": "MieLoopBodyOut|Mie", "inputs": {"loop_ctx": ["10", 0]}},
+    }
+    index = loop_module._build_node_index(dynprompt)
+    assert list(index.consumers_of("10")) == ["15", "20"]
+    assert list(index.consumers_of(15)) == ["12"]
+    assert list(index.consumers_of("99")) == []
+    assert index.ids_of_classes({"SaveImageBatch", "MieLoopBodyIn"}) == ["10", "12"]
+
+
+def test_explore_forward_reuses_index_on_deep_chain():
+    """A prebuilt index is used as-is (no node rescans) and a 5000-deep
+    chain does not hit the recursion limit."""
+    n = 5000
+    dynprompt = {"0": {"class_type": "MieLoopBodyIn|Mie", "inputs": {}}}
+    for i in range(1, n):
+        dynprompt[str(i)] = {"class_type": "Op", "inputs": {"x": [str(i - 1), 0]}}
+    index = loop_module._build_node_index(dynprompt)
+    calls = {"n": 0}
+    real_get_inputs = loop_module._get_inputs
+
+    def counting(node):
+        calls["n"] += 1
+        return real_get_inputs(node)
+
+    loop_module._get_inputs = counting
+    try:
+        visited = set()
+        explore_forward_from_body_in("0", dynprompt, visited, node_index=index)
+    finally:
+        loop_module._get_inputs = real_get_inputs
+    assert len(visited) == n
+    assert calls["n"] == 0
+
+
+def test_loop_end_caches_node_index_per_run(sample_loop_ctx, sample_dynprompt):
+    """MieLoopEnd reuses the consumer index cached for its run_id and drops
+    it when the loop completes."""
+    ctx = dict(sample_loop_ctx, index=2, is_last=True)
+    index = loop_module._build_node_index(sample_dynprompt)
+    cache = loop_module.RUNTIME_STORE["_node_index_cache"]
+    cache[ctx["run_id"]] = index
+    seen = []
+    real_collect = loop_module.collect_loop_body
+
+    def spy(*args, **kwargs):
+        seen.append(kwargs.get("node_index"))
+        return real_collect(*args, **kwargs)
+
+    loop_module.collect_loop_body = spy
+    try:
+        loop_module.MieLoopEnd().execute(ctx, dynprompt=sample_dynprompt)
+    finally:
+        loop_module.collect_loop_body = real_collect
+    assert seen == [index]
+    assert ctx["run_id"] not in cache
+
+
 # ======================================================================
 # collect_loop_body
 # ======================================================================
@@ -1025,3 +1089,78 @@ def test_build_expand_graph_large_body(monkeypatch):
     for nid, node_data in result.items():
         if node_data["class_type"].startswith("BizNode"):
             assert "__mie_loop_round_idx__" in node_data["inputs"]
+
+
+# ======================================================================
+# _ExpandTemplate
+# ======================================================================
+
+
+def _make_cache_write_dynprompt():
+    """Simple body plus an external model input and a SaveImageBatch leaf
+    (forced in by the cache-write post-pass)."""
+    dp = _make_simple_dynprompt()
+    dp["5"] = {"class_type": "CheckpointLoader", "inputs": {"ckpt": "a.safetensors"}}
+    dp["15"]["inputs"]["model"] = ["5", 0]
+    dp["40"] = {"class_type": "SaveImageBatch|Mie", "inputs": {"images": ["15", 0], "path": "x"}}
+    return dp
+
+
+def test_expand_template_matches_fresh_build(monkeypatch):
+    """Instantiating the compiled template for round N yields exactly what
+    a full rebuild for round N would."""
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+    dynprompt = _make_cache_write_dynprompt()
+    detect_result = _make_detect_result()
+    ctx1 = _make_next_ctx(index=1, count=4)
+    ctx1["meta"]["expand_root"] = "30"
+    graph1, end1 = _build_expand_graph_for_next_round(
+        ctx1, dynprompt, "10", "20", "30", detect_result
+    )
+    template = loop_module._ExpandTemplate.compile(
+        graph1, loop_module._expand_prefix(ctx1, "30"), end1
+    )
+    assert template is not None
+
+    ctx3 = _make_next_ctx(index=3, count=4, state={"k": 7})
+    ctx3["meta"]["expand_root"] = "30"
+    fresh, fresh_end = _build_expand_graph_for_next_round(
+        ctx3, dynprompt, "10", "20", "30", detect_result
+    )
+    reused, reused_end = template.instantiate(ctx3, "30")
+    assert reused == fresh
+    assert list(reused) == list(fresh)
+    assert reused_end.id == fresh_end.id == "30.r3.__mie_loop_recurse_end__"
+    # Round 1's graph is untouched by later instantiations.
+    assert all(nid.startswith("30.r1.") for nid in graph1)
+
+
+def test_loop_end_reuses_expand_template(monkeypatch, sample_loop_ctx, sample_dynprompt):
+    """MieLoopEnd builds the clone graph once per run and instantiates the
+    cached template afterwards; the cache is dropped when the loop ends."""
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+    builds = []
+    real_build = loop_module._build_expand_graph_for_next_round
+
+    def spy(*args, **kwargs):
+        builds.append(kwargs["next_ctx"]["index"])
+        return real_build(*args, **kwargs)
+
+    monkeypatch.setattr(loop_module, "_build_expand_graph_for_next_round", spy)
+    ctx = sample_loop_ctx
+    end = loop_module.MieLoopEnd()
+    outputs = []
+    for _ in range(2):
+        out = end.execute(ctx, dynprompt=sample_dynprompt)
+        outputs.append(out["expand"])
+        ctx = loop_module.MieLoopResume().execute(next(
+            n["inputs"]["loop_ctx_json"] for n in out["expand"].values()
+            if n["class_type"].startswith("MieLoopResume")
+        ))[0]
+    assert builds == [1]
+    assert ctx["run_id"] in loop_module.RUNTIME_STORE["_expand_template_cache"]
+    assert [len(g) for g in outputs] == [len(outputs[0])] * 2
+    assert any(".r2." in nid for nid in outputs[1])
+    done = end.execute(ctx, dynprompt=sample_dynprompt)
+    assert done[1] is True
+    assert ctx["run_id"] not in loop_module.RUNTIME_STORE["_expand_template_cache"]
@@ -0,0 +1,147 @@
+"""MieLoopEnd(driver="inline"): remaining rounds run inside one MieLoopInlineRun."""
+
+import sys
+import types
+
+import pytest
+
+import loop as loop_module
+from loop import (
+    RUNTIME_STORE,
+    MieLoopBodyOut,
+    MieLoopCollectText,
+    MieLoopEnd,
+    MieLoopFinalizeTextList,
+    MieLoopInlineRun,
+    MieLoopParamGetInt,
+    MieLoopStart,
+    MieLoopStateSetInt,
+)
+
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+FakeGraphBuilder = _conftest_mod.FakeGraphBuilder if _conftest_mod else None
+
+
+class _Describe:
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {"required": {"value": ("INT",), "prefix": ("STRING",)}}
+
+    RETURN_TYPES = ("STRING",)
+    FUNCTION = "run"
+
+    def run(self, value, prefix):
+        return (f"{prefix}{value}",)
+
+
+class _Expander(_Describe):
+    def run(self, value, prefix):
+        return {"result": (prefix,), "expand": {}}
+
+
+class _ShowText(_Describe):
+    OUTPUT_NODE = True
+
+
+class _Validated(_Describe):
+    @classmethod
+    def VALIDATE_INPUTS(cls, value, prefix):
+        return True
+
+
+@pytest.fixture(autouse=True)
+def _fake_comfy(monkeypatch):
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+    registry = {
+        "Describe": _Describe, "Expander": _Expander,
+        "ShowText": _ShowText, "Validated": _Validated,
+    }
+    monkeypatch.setitem(sys.modules, "nodes", types.SimpleNamespace(NODE_CLASS_MAPPINGS=registry))
+    _Describe.instances = 0
+
+
+def _dynprompt(describe="Describe"):
+    return {
+        "5": {"class_type": "PrimitiveString", "inputs": {"value": "p"}},
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+        "11": {"class_type": "MieLoopParamGetInt|Mie",
+               "inputs": {"loop_ctx": ["10", 0], "key": "value", "default_value": 0}},
+        "12": {"class_type": describe, "inputs": {"value": ["11", 0], "prefix": ["5", 0]}},
+        "13": {"class_type": "MieLoopCollectText|Mie",
+               "inputs": {"loop_ctx": ["10", 0], "text": ["12", 0]}},
+        "14": {"class_type": "MieLoopStateSetInt|Mie",
+               "inputs": {"loop_ctx": ["13", 0], "key": "last", "value": ["11", 0]}},
+        "20": {"class_type": "MieLoopBodyOut|Mie",
+               "inputs": {"loop_ctx": ["14", 0], "state_json": "{}"}},
+        "30": {"class_type": "MieLoopEnd|Mie", "inputs": {"loop_ctx": ["20", 0], "driver": "inline"}},
+    }
+
+
+def _round_zero(dynprompt, count=4):
+    """Run round 0 as the real graph would, then its End."""
+    ctx = MieLoopStart().execute(
+        "inline_loop", param_type="int", param_mode="range",
+        int_range_start=0, int_range_end=count, int_range_step=1,
+    )[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    value = MieLoopParamGetInt().execute(ctx, "value", 0)[0]
+    ctx = MieLoopCollectText().execute(ctx, f"p{value}")[0]
+    ctx = MieLoopStateSetInt().execute(ctx, "last", value)[0]
+    ctx, state_json = MieLoopBodyOut().execute(ctx)
+    return ctx, MieLoopEnd().execute(
+        ctx, state_json, dynprompt=dynprompt, unique_id="30", driver="inline"
+    )
+
+
+def test_inline_runner_finishes_the_loop_with_the_same_results():
+    ctx, out = _round_zero(_dynprompt())
+    (runner_id, runner), = out["expand"].items()
+    assert runner_id == "30.r1.__mie_loop_inline__"
+    assert runner["class_type"] == "MieLoopInlineRun|Mie"
+    assert runner["inputs"]["ext_0"] == ["5", 0]
+    assert out["result"][0] == [runner_id, 0]
+
+    final, done = MieLoopInlineRun().execute(
+        runner["inputs"]["loop_ctx_json"], unique_id=runner_id, ext_0="p"
+    )
+    assert done and final["index"] == 3 and final["state"]["last"] == 3
+    texts = MieLoopFinalizeTextList().execute(final, True)[0]
+    assert texts == '["p0", "p1", "p2", "p3"]'
+    # One node instance serves every round; the run's caches are released.
+    assert _Describe.instances == 1
+    assert ctx["run_id"] not in RUNTIME_STORE["_expand_template_cache"]
+    rounds = RUNTIME_STORE["loop_metrics"][ctx["run_id"]]["rounds"]
+    assert rounds["0"]["driver"] == "inline"
+    assert all("inline_body_s" in rounds[str(i)] for i in (1, 2, 3))
+
+
+def test_unregistered_body_node_falls_back_to_expand():
+    ctx, out = _round_zero(_dynprompt(describe="KSampler"))
+    classes = {n["class_type"] for n in out["expand"].values()}
+    assert "MieLoopInlineRun|Mie" not in classes
+    assert "MieLoopResume|Mie" in classes
+    blocker = RUNTIME_STORE["_detect_cache"][ctx["run_id"]]["inline_blocker"]
+    assert "KSampler is not registered" in blocker
+
+
+@pytest.mark.parametrize(
+    "describe,reason",
+    [("ShowText", "ShowText is an output node"), ("Validated", "Validated has VALIDATE_INPUTS")],
+)
+def test_output_and_validated_body_nodes_fall_back_to_expand(describe, reason):
+    ctx, out = _round_zero(_dynprompt(describe=describe))
+    classes = {n["class_type"] for n in out["expand"].values()}
+    assert "MieLoopInlineRun|Mie" not in classes
+    assert reason in RUNTIME_STORE["_detect_cache"][ctx["run_id"]]["inline_blocker"]
+
+
+def test_body_node_that_expands_is_rejected():
+    _ctx, out = _round_zero(_dynprompt(describe="Expander"))
+    (runner_id, runner), = out["expand"].items()
+    with pytest.raises(ValueError, match="driver=expand"):
+        MieLoopInlineRun().execute(runner["inputs"]["loop_ctx_json"], ext_0="p")
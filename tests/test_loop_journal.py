@@ -0,0 +1,169 @@
+"""Durable per-run journal: crash-resumable loops (MieLoopStart journal_dir)."""
+
+import json
+import os
+import sys
+
+import pytest
+import torch
+
+import loop as loop_module
+from loop import (
+    RUNTIME_STORE,
+    MieLoopCollectImage,
+    MieLoopCollectText,
+    MieLoopEnd,
+    MieLoopFinalizeImages,
+    MieLoopFinalizeTextList,
+    MieLoopStart,
+    _flush_offload_writer,
+    _read_journal,
+)
+
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+FakeGraphBuilder = _conftest_mod.FakeGraphBuilder if _conftest_mod else None
+
+
+@pytest.fixture(autouse=True)
+def _fake_graph_builder(monkeypatch):
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+
+
+def _dynprompt():
+    return {
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+        "15": {"class_type": "KSampler|Mie", "inputs": {"loop_ctx": ["10", 0]}},
+        "20": {"class_type": "MieLoopBodyOut|Mie", "inputs": {"loop_ctx": ["15", 0]}},
+        "30": {"class_type": "MieLoopEnd|Mie", "inputs": {"loop_ctx": ["20", 0]}},
+    }
+
+
+def _start(journal_dir, int_list="1,2,3", **kwargs):
+    ctx = MieLoopStart().execute(
+        "journal_loop", param_type="int", param_mode="list", int_list=int_list,
+        initial_state_json='{"n": 0}', journal_dir=str(journal_dir), **kwargs,
+    )[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    return ctx
+
+
+def _collect(ctx, image, text):
+    ctx = MieLoopCollectImage().execute(ctx, image)[0]
+    return MieLoopCollectText().execute(ctx, text)[0]
+
+
+def _end(ctx):
+    """Finish the round; returns the next round's ctx, or (ctx, done)."""
+    patch = json.dumps({"n": ctx["index"] + 1})
+    out = MieLoopEnd().execute(ctx, patch, dynprompt=_dynprompt(), unique_id="30")
+    if isinstance(out, dict):
+        return RUNTIME_STORE["_ctx_snapshots"][ctx["run_id"]][ctx["index"] + 1]
+    return out
+
+
+def _restart():
+    """Drop everything a ComfyUI restart loses."""
+    for writer in list(RUNTIME_STORE["offload_writers"].values()):
+        writer.close()
+    RUNTIME_STORE.update(
+        collectors={"image": {}, "text": {}, "json": {}, "audio": {}},
+        state_objects={"image": {}},
+        meta={}, _detect_cache={}, _node_index_cache={}, _expand_template_cache={},
+        _ctx_snapshots={}, offload_writers={}, resident_index={}, loop_metrics={},
+        ref_owners={}, ref_orphans=[],
+    )
+
+
+def _image_items(ctx):
+    return RUNTIME_STORE["collectors"]["image"][ctx["collectors"]["image"]["ref"]]
+
+
+def _events(journal_dir):
+    return [r["event"] for r in _read_journal(str(journal_dir / "journal_loop.journal.jsonl"))]
+
+
+def test_crash_resumes_at_first_unfinished_round(tmp_path):
+    batches = [torch.rand(1, 4, 4, 3) for _ in range(3)]
+    ctx = _start(tmp_path)
+    run_id = ctx["run_id"]
+    ctx = _end(_collect(ctx, batches[0], "r0"))
+    # Round 1 collects an image, then the process dies before MieLoopEnd.
+    partial = MieLoopCollectImage().execute(ctx, batches[1])[0]
+    _flush_offload_writer(run_id)
+    partial_path = _image_items(partial)[-1]["disk_path"]
+    assert os.path.dirname(partial_path) == str(tmp_path / run_id)
+    with open(tmp_path / "journal_loop.journal.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"event": "ro')  # torn last line
+    _restart()
+
+    ctx = _start(tmp_path)
+    assert (ctx["run_id"], ctx["index"], ctx["state"]) == (run_id, 1, {"n": 1})
+    assert ctx["current_params"] == {"value": 2}
+    assert ctx["collectors"]["image"]["count"] == 1
+    assert ctx["collectors"]["text"]["count"] == 1
+    assert not os.path.exists(partial_path)
+
+    ctx = _end(_collect(ctx, batches[1], "r1"))
+    ctx, done = _end(_collect(ctx, batches[2], "r2"))
+    assert done and ctx["state"] == {"n": 3}
+    merged, _path = MieLoopFinalizeImages().execute(ctx, True)
+    assert torch.equal(merged, torch.cat(batches, dim=0))
+    assert json.loads(MieLoopFinalizeTextList().execute(ctx, True)[0]) == ["r0", "r1", "r2"]
+    assert _events(tmp_path)[-1] == "done"
+
+    # A finished run is not resumed: queueing again starts over.
+    again = _start(tmp_path)
+    assert again["run_id"] != run_id and again["index"] == 0
+
+
+def test_changed_params_start_a_new_run(tmp_path):
+    ctx = _start(tmp_path)
+    _end(_collect(ctx, torch.rand(1, 2, 2, 3), "r0"))
+    _restart()
+    fresh = _start(tmp_path, int_list="1,2,4")
+    assert fresh["run_id"] != ctx["run_id"] and fresh["index"] == 0
+    assert fresh["collectors"]["image"]["ref"] is None
+
+
+def test_missing_file_rewinds_to_its_round(tmp_path):
+    ctx = _start(tmp_path)
+    ctx = _end(_collect(ctx, torch.rand(1, 2, 2, 3), "r0"))
+    ctx = _end(_collect(ctx, torch.rand(1, 2, 2, 3), "r1"))
+    _flush_offload_writer(ctx["run_id"])
+    os.remove(_image_items(ctx)[1]["disk_path"])
+    _restart()
+    resumed = _start(tmp_path)
+    assert resumed["index"] == 1 and resumed["state"] == {"n": 1}
+    assert RUNTIME_STORE["collectors"]["text"][resumed["collectors"]["text"]["ref"]] == ["r0"]
+    assert _events(tmp_path)[-1] == "resume"
+
+
+def test_resume_loop_ctx_reattaches_collectors_after_restart(tmp_path):
+    batch = torch.rand(1, 2, 2, 3)
+    ctx = _start(tmp_path)
+    ctx = _end(_collect(ctx, batch, "r0"))
+    _flush_offload_writer(ctx["run_id"])
+    saved = json.dumps(ctx)
+    _restart()
+    resumed = MieLoopStart().execute("journal_loop", resume_loop_ctx=saved)[0]
+    assert resumed["index"] == 1
+    items = _image_items(resumed)
+    assert len(items) == 1 and items[0]["shape"] == [1, 2, 2, 3]
+    assert torch.equal(loop_module.load_mieraw(items[0]["disk_path"]), batch)
+
+
+def test_runtime_reclaim_keeps_journaled_files(tmp_path):
+    ctx = _start(tmp_path)
+    ctx = _end(_collect(ctx, torch.rand(1, 2, 2, 3), "r0"))
+    _flush_offload_writer(ctx["run_id"])
+    path = _image_items(ctx)[0]["disk_path"]
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert os.path.exists(path)
+    assert _start(tmp_path)["index"] == 1
+
+
+def test_no_journal_dir_writes_no_journal(tmp_path):
+    ctx = MieLoopStart().execute("plain", param_type="int", param_mode="list", int_list="1,2")[0]
+    assert "journal_path" not in ctx["meta"]
+    MieLoopCollectText().execute(ctx, "x")
+    assert list(tmp_path.iterdir()) == []
@@ -37,6 +37,7 @@ from loop import (
     MieImageGrid,
     RUNTIME_STORE,
     EMPTY_IMAGES,
+    _loop_params_at,
 )
 
 
@@ -88,7 +89,8 @@ class TestMieLoopStart:
             int_range_end=6,
             int_range_step=2,
         )
-        assert ctx["params_list"] == [{"value": 2}, {"value": 4}]
+        assert ctx["params_source"] == {"kind": "int_range", "start": 2, "step": 2, "count": 2}
+        assert [_loop_params_at(ctx, i) for i in range(count)] == [{"value": 2}, {"value": 4}]
         assert count == 2
         assert index == 0
         assert is_last is False
@@ -114,7 +116,8 @@ class TestMieLoopStart:
             float_range_end=0.3,
             float_range_step=0.1,
         )
-        assert ctx["params_list"] == [{"value": 0.1}, {"value": 0.2}]
+        assert ctx["params_source"]["kind"] == "float_range"
+        assert [_loop_params_at(ctx, i) for i in range(count)] == [{"value": 0.1}, {"value": 0.2}]
         assert count == 2
         assert index == 0
         assert is_last is False
@@ -301,6 +304,75 @@ class TestMieLoopResume:
         with pytest.raises(ValueError, match="invalid JSON"):
             node.execute(loop_ctx_json="not json")
 
+    def test_handle_payload_is_compact_and_resolves(self, sample_loop_ctx):
+        import loop as loop_module
+
+        big = dict(sample_loop_ctx, count=5000, index=3,
+                   params_list=[{"value": i} for i in range(5000)],
+                   current_params={"value": 3})
+        # MieLoopStart registers the run's params table; the handle omits it.
+        loop_module.RUNTIME_STORE["meta"]["test_run_123"] = {"params_list": big["params_list"]}
+        payload = loop_module._resume_payload(big)
+        assert len(payload) < 1000
+        ctx = MieLoopResume().execute(loop_ctx_json=payload)[0]
+        assert ctx["index"] == 3
+        assert ctx["params_list"] is big["params_list"]
+
+    def test_only_recent_snapshots_are_kept(self, sample_loop_ctx):
+        import loop as loop_module
+
+        payloads = [
+            loop_module._resume_payload(dict(sample_loop_ctx, index=i))
+            for i in range(3)
+        ]
+        snapshots = loop_module.RUNTIME_STORE["_ctx_snapshots"]["test_run_123"]
+        assert sorted(snapshots) == [1, 2]
+        # An evicted snapshot is rebuilt from the fallback in its handle.
+        assert MieLoopResume().execute(loop_ctx_json=payloads[0])[0]["index"] == 0
+        assert MieLoopResume().execute(loop_ctx_json=payloads[2])[0]["index"] == 2
+
+    def test_handle_embeds_only_what_cannot_be_rebuilt(self, sample_loop_ctx):
+        import loop as loop_module
+
+        ctx = dict(sample_loop_ctx, index=1, current_params={"value": 2}, state={"n": 5})
+        ctx["meta"] = dict(ctx["meta"], unroll_first=0, big="x" * 5000)
+        ctx["collectors"] = dict(ctx["collectors"], text={"ref": "t_ref", "count": 2})
+        payload = loop_module._resume_payload(ctx)
+        handle = json.loads(payload)[loop_module._CTX_HANDLE_KEY]
+        assert handle["fallback"] == {"state": {"n": 5}, "unroll_first": 0}
+        assert len(payload) < 300
+
+        loop_module.RUNTIME_STORE["_ctx_snapshots"] = {}
+        resumed = MieLoopResume().execute(loop_ctx_json=payload)[0]
+        assert resumed["index"] == 1 and resumed["state"] == {"n": 5}
+        assert resumed["current_params"] == {"value": 2}
+        assert resumed["collectors"]["text"] == {"ref": "t_ref", "count": 2}
+        assert resumed["meta"]["unroll_first"] == 0 and len(resumed["meta"]["big"]) == 5000
+
+    def test_snapshot_is_frozen(self, sample_loop_ctx):
+        import loop as loop_module
+
+        ctx = dict(sample_loop_ctx, state={"n": 1})
+        payload = loop_module._resume_payload(ctx)
+        ctx["state"]["n"] = 2
+        assert MieLoopResume().execute(loop_ctx_json=payload)[0]["state"] == {"n": 1}
+
+    def test_handle_survives_restart_with_shared_params(self, sample_loop_ctx):
+        import loop as loop_module
+
+        shared = list(sample_loop_ctx["params_list"])
+        loop_module.RUNTIME_STORE["meta"]["test_run_123"] = {"params_list": shared}
+        ctx = dict(sample_loop_ctx, params_list=shared)
+        payload = loop_module._resume_payload(ctx)
+        loop_module.RUNTIME_STORE["_ctx_snapshots"] = {}
+        resumed = MieLoopResume().execute(loop_ctx_json=payload)[0]
+        assert resumed["params_list"] is shared
+        # Without the run's meta (a real restart) the handle cannot be rebuilt.
+        loop_module.RUNTIME_STORE["_ctx_snapshots"] = {}
+        loop_module.RUNTIME_STORE["meta"] = {}
+        with pytest.raises(ValueError, match="snapshot not found"):
+            MieLoopResume().execute(loop_ctx_json=payload)
+
 
 # ---- MieLoopBodyIn ----
 
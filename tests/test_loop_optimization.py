@@ -406,3 +406,39 @@ def test_protocol_nodes_always_cloned(monkeypatch):
     assert "MieLoopBodyIn|Mie" not in result_types, "BodyIn should NOT be cloned"
     assert "MieLoopBodyOut|Mie" in result_types
     assert "MieLoopEnd|Mie" in result_types
+
+
+# ======================================================================
+# Copy-on-write loop_ctx (_copy_loop_ctx)
+# ======================================================================
+
+
+def _start_loop(count):
+    json_list = "[" + ",".join('{"i": %d}' % i for i in range(count)) + "]"
+    ctx, _, _, _ = loop_module.MieLoopStart().execute(
+        loop_id="cow", param_type="json", param_mode="list", json_list=json_list,
+    )
+    return ctx
+
+
+def test_copy_loop_ctx_shares_params_list_and_isolates_mutations():
+    ctx = _start_loop(1000)
+    out = loop_module.MieLoopStateSetInt().execute(ctx, "k", 3)[0]
+    out = loop_module.MieLoopCollectText().execute(out, "hello")[0]
+    # The params table is shared, never copied per node.
+    assert out["params_list"] is ctx["params_list"]
+    # Upstream (cached) outputs are never mutated by downstream nodes.
+    assert ctx["state"] == {}
+    assert ctx["collectors"]["text"] == {"ref": None, "count": 0}
+    assert out["state"] == {"k": 3}
+    assert out["collectors"]["text"]["count"] == 1
+
+
+def test_copy_loop_ctx_reattaches_shared_params_after_json_roundtrip():
+    """A ctx rebuilt from JSON (MieLoopResume) gets the run's single params
+    table back instead of keeping its own parsed copy."""
+    import json
+
+    ctx = _start_loop(50)
+    resumed = loop_module.MieLoopResume().execute(json.dumps(ctx))[0]
+    assert resumed["params_list"] is ctx["params_list"]
@@ -0,0 +1,118 @@
+"""Lazy parameter sources: range / decrement descriptors and params files."""
+
+import json
+import os
+import sys
+
+import pytest
+
+import loop as loop_module
+from loop import (
+    RUNTIME_STORE,
+    MieLoopEnd,
+    MieLoopParamGetInt,
+    MieLoopParamGetString,
+    MieLoopStart,
+    _loop_params_at,
+    _parse_params_list,
+)
+
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+FakeGraphBuilder = _conftest_mod.FakeGraphBuilder if _conftest_mod else None
+
+
+def _dynprompt():
+    return {
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+        "15": {"class_type": "KSampler|Mie", "inputs": {"loop_ctx": ["10", 0]}},
+        "20": {"class_type": "MieLoopBodyOut|Mie", "inputs": {"loop_ctx": ["15", 0]}},
+        "30": {"class_type": "MieLoopEnd|Mie", "inputs": {"loop_ctx": ["20", 0]}},
+    }
+
+
+def _start(**kwargs):
+    ctx = MieLoopStart().execute("src_loop", **kwargs)[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    return ctx
+
+
+def _values(ctx):
+    return [_loop_params_at(ctx, i) for i in range(ctx["count"])]
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        dict(param_type="int", param_mode="range", int_range_start=-3, int_range_end=17, int_range_step=4),
+        dict(param_type="float", param_mode="range", float_range_start=0.1, float_range_end=1.0, float_range_step=0.1),
+        dict(param_type="float", param_mode="range", float_range_start=0.0, float_range_end=1.0, float_range_step=0.25),
+        dict(param_type="int", param_mode="decrement", int_decrement_total=10, int_decrement_step=3),
+        dict(param_type="float", param_mode="decrement", float_decrement_total=1.0, float_decrement_step=0.3),
+    ],
+)
+def test_lazy_source_matches_materialized_list(kwargs):
+    ctx = _start(**kwargs)
+    expected = _parse_params_list(**kwargs)
+    assert ctx["count"] == len(expected)
+    assert ctx["params_list"] == []
+    assert _values(ctx) == expected
+    assert ctx["current_params"] == expected[0]
+
+
+def test_large_range_keeps_ctx_constant_size(monkeypatch):
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+    ctx = _start(param_type="int", param_mode="range", int_range_start=0,
+                 int_range_end=50000, int_range_step=1)
+    assert ctx["count"] == 50000
+    assert len(json.dumps(ctx)) < 1000
+    MieLoopEnd().execute(ctx, "{}", dynprompt=_dynprompt(), unique_id="30")
+    snap = RUNTIME_STORE["_ctx_snapshots"][ctx["run_id"]][1]
+    assert snap["current_params"] == {"value": 1}
+    assert MieLoopParamGetInt().execute(snap, "value", 0)[0] == 1
+
+
+def test_jsonl_file_source_reads_rows_on_demand(tmp_path, monkeypatch):
+    path = tmp_path / "params.jsonl"
+    rows = [{"prompt": f"p{i}", "seed": i} for i in range(4)]
+    path.write_bytes(
+        b"\xef\xbb\xbf" + "\n\n".join(json.dumps(r) for r in rows).encode("utf-8") + b"\n"
+    )
+    ctx = _start(param_type="json", param_mode="file", params_file=str(path))
+    assert ctx["count"] == 4 and ctx["params_source"]["format"] == "jsonl"
+    assert "offsets" not in json.dumps(ctx)
+    assert _values(ctx) == rows
+    assert MieLoopParamGetString().execute(ctx, "prompt", "")[0] == "p0"
+
+    # A resumed ctx whose run meta is gone rebuilds the row index.
+    RUNTIME_STORE["meta"].pop(ctx["run_id"])
+    assert _loop_params_at(ctx, 3) == rows[3]
+
+    path.write_text(json.dumps(rows[0]) + "\n", encoding="utf-8")
+    os.utime(path, ns=(1, 1))
+    with pytest.raises(ValueError, match="changed since MieLoopStart"):
+        _loop_params_at(ctx, 1)
+
+
+def test_csv_file_source_with_value_column(tmp_path):
+    path = tmp_path / "params.csv"
+    path.write_text('value,note\n5,"two\nlines"\n\n7,x\n', encoding="utf-8")
+    ctx = _start(param_type="int", param_mode="file", params_file=str(path))
+    assert _values(ctx) == [{"value": 5}, {"value": 7}]
+    ctx = _start(param_type="json", param_mode="file", params_file=str(path))
+    assert _values(ctx) == [{"value": "5", "note": "two\nlines"}, {"value": "7", "note": "x"}]
+
+
+@pytest.mark.parametrize(
+    "name,content,match",
+    [
+        ("bad.jsonl", '{"value": 1}\nnot json\n', "line 2 is invalid JSON"),
+        ("bad.jsonl", '{"value": 1}\n{"value": "x"}\n', "line 2: invalid int"),
+        ("bad.csv", "other\n1\n", "missing 'value' column"),
+        ("bad.txt", "1\n", "must be a .jsonl"),
+    ],
+)
+def test_bad_params_file_fails_at_start(tmp_path, name, content, match):
+    path = tmp_path / name
+    path.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError, match=match):
+        _start(param_type="int", param_mode="file", params_file=str(path))
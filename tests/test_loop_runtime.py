@@ -382,6 +382,17 @@ class TestGridImages:
         # pad clamped to 0
         assert result.shape == (1, 16, 32, 3)
 
+    def test_grid_images_tile_placement(self):
+        images = torch.arange(5, dtype=torch.float32).view(5, 1, 1, 1).expand(5, 3, 2, 3)
+        result = _grid_images(images, cols=2, pad=1)
+        assert result.shape == (1, 3 * 3 + 2, 2 * 2 + 1, 3)
+        for i in range(5):
+            y, x = (i // 2) * 4, (i % 2) * 3
+            assert torch.equal(result[0, y : y + 3, x : x + 2], images[i])
+        # Gutters and the empty sixth tile stay zero.
+        assert result[0, 3].abs().sum() == 0 and result[0, :, 2].abs().sum() == 0
+        assert result[0, 8:, 3:].abs().sum() == 0
+
     def test_grid_images_wrong_ndim(self):
         images = torch.rand(3, 64, 64)  # 3D tensor
         with pytest.raises(ValueError, match="ndim"):
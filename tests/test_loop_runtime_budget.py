@@ -0,0 +1,138 @@
+"""RAM-budgeted automatic spill of in-memory loop collector items."""
+
+import copy
+
+import pytest
+import torch
+
+import loop as loop_module
+from loop import (
+    MieLoopCollectAudio,
+    MieLoopCollectImage,
+    MieLoopFinalizeAudio,
+    MieLoopFinalizeImages,
+    MieLoopSetRuntimeBudget,
+    RUNTIME_STORE,
+    _flush_offload_writer,
+    _runtime_memory_stats,
+)
+
+_BATCH = (2, 4, 4, 3)
+_BATCH_BYTES = 2 * 4 * 4 * 3 * 4
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(nbytes):
+        monkeypatch.setattr(loop_module, "_MIE_LOOP_RUNTIME_BUDGET_BYTES", nbytes)
+
+    return set_budget
+
+
+def _image_items(ctx):
+    return RUNTIME_STORE["collectors"]["image"][ctx["collectors"]["image"]["ref"]]
+
+
+def test_oldest_items_spill_and_finalize_is_unchanged(sample_loop_ctx, tmp_path, budget):
+    budget(int(_BATCH_BYTES * 2.5))
+    batches = [torch.rand(*_BATCH) for _ in range(5)]
+    ctx = sample_loop_ctx
+    for b in batches:
+        ctx = MieLoopCollectImage().execute(ctx, b, False, str(tmp_path))[0]
+    items = _image_items(ctx)
+    # The three oldest were spilled in place; order in the list is unchanged.
+    assert [isinstance(x, dict) for x in items] == [True, True, True, False, False]
+    stats = _runtime_memory_stats()
+    assert stats["resident_bytes"] == 2 * _BATCH_BYTES
+    assert stats["spilled_bytes"] == 3 * _BATCH_BYTES
+    assert stats["spilled_items"] == 3
+    ref_stats = stats["by_ref"][ctx["collectors"]["image"]["ref"]]
+    assert ref_stats["run_id"] == ctx["run_id"] and ref_stats["kind"] == "image"
+
+    merged, _path = MieLoopFinalizeImages().execute(ctx, True)
+    assert torch.equal(merged, torch.cat(batches, dim=0))
+    assert list(tmp_path.glob("image_*")) == []
+
+
+def test_spill_is_least_recently_collected_across_runs_and_kinds(
+    sample_loop_ctx, tmp_path, budget
+):
+    audio_bytes = 1 * 2 * 12 * 4
+    budget(_BATCH_BYTES + audio_bytes)
+    img_ctx = sample_loop_ctx
+    other = copy.deepcopy(sample_loop_ctx)
+    other["run_id"] = "other_run"
+    img_ctx = MieLoopCollectImage().execute(img_ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    audio = {"waveform": torch.rand(1, 2, 12), "sample_rate": 24000}
+    other = MieLoopCollectAudio().execute(other, audio, False, str(tmp_path))[0]
+    # Fits exactly: nothing spilled yet.
+    assert _runtime_memory_stats()["spilled_items"] == 0
+    img_ctx = MieLoopCollectImage().execute(img_ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    first, second = _image_items(img_ctx)
+    assert isinstance(first, dict) and isinstance(second, torch.Tensor)
+    audio_items = RUNTIME_STORE["collectors"]["audio"][other["collectors"]["audio"]["ref"]]
+    assert isinstance(audio_items[0]["waveform"], torch.Tensor)
+
+    # The audio item is now the oldest resident one.
+    img_ctx = MieLoopCollectImage().execute(img_ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    assert "disk_path" in audio_items[0] and audio_items[0]["sample_rate"] == 24000
+    merged = MieLoopFinalizeAudio().execute(other, True)[0]
+    assert torch.equal(merged["waveform"], audio["waveform"])
+
+
+def test_zero_budget_never_spills(sample_loop_ctx, tmp_path, budget):
+    budget(0)
+    ctx = sample_loop_ctx
+    for _ in range(3):
+        ctx = MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    assert all(isinstance(x, torch.Tensor) for x in _image_items(ctx))
+    assert _runtime_memory_stats()["resident_bytes"] == 3 * _BATCH_BYTES
+
+
+def test_cleanup_removes_spilled_files(sample_loop_ctx, tmp_path, budget):
+    budget(_BATCH_BYTES)
+    ctx = sample_loop_ctx
+    for _ in range(3):
+        ctx = MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    _flush_offload_writer(ctx["run_id"])
+    assert len(list(tmp_path.glob("image_*.mieraw"))) == 2
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert list(tmp_path.glob("image_*")) == []
+    assert _runtime_memory_stats()["by_ref"] == {}
+    assert RUNTIME_STORE["resident_index"].get("image", {}) == {}
+
+
+def test_tracked_total_follows_collect_spill_and_finalize(sample_loop_ctx, tmp_path, budget):
+    budget(int(_BATCH_BYTES * 2.5))
+    ctx = sample_loop_ctx
+    for _ in range(4):
+        ctx = MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+        assert loop_module._resident_total() == _runtime_memory_stats()["resident_bytes"]
+    assert loop_module._resident_total() == 2 * _BATCH_BYTES
+    MieLoopFinalizeImages().execute(ctx, True)
+    assert loop_module._resident_total() == 0
+
+
+def test_under_budget_collect_does_not_rescan_items(sample_loop_ctx, tmp_path, budget, monkeypatch):
+    budget(_BATCH_BYTES * 100)
+    ctx = sample_loop_ctx
+    for _ in range(3):
+        ctx = MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    sized = []
+    real = loop_module._resident_nbytes
+    monkeypatch.setattr(loop_module, "_resident_nbytes", lambda x: (sized.append(x), real(x))[1])
+    MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))
+    # Only the item just collected is sized.
+    assert len(sized) == 1
+
+
+def test_set_runtime_budget_node_applies_immediately(sample_loop_ctx, tmp_path, budget):
+    budget(0)
+    ctx = sample_loop_ctx
+    for _ in range(3):
+        ctx = MieLoopCollectImage().execute(ctx, torch.rand(*_BATCH), False, str(tmp_path))[0]
+    gb = _BATCH_BYTES / 1024 ** 3
+    out_ctx, log = MieLoopSetRuntimeBudget().execute(ctx, budget_gb=gb)
+    assert out_ctx["run_id"] == ctx["run_id"] and "LoopRuntimeBudget" in log
+    assert loop_module._MIE_LOOP_RUNTIME_BUDGET_BYTES == _BATCH_BYTES
+    assert [isinstance(x, dict) for x in _image_items(ctx)] == [True, True, False]
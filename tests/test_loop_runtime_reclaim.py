@@ -0,0 +1,143 @@
+"""Owner index, expiry heap and incremental reclaim of the loop runtime store."""
+
+import time
+
+import pytest
+import torch
+
+import loop as loop_module
+from loop import (
+    RUNTIME_STORE,
+    MieLoopCollectImage,
+    MieLoopFinalizeImages,
+    MieLoopStart,
+    MieLoopStateSetImage,
+    _MAX_RUNTIME_STORE_AGE,
+    _prune_runtime_store,
+    _reclaim_expired_runtime,
+    _runtime_store_timestamps,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch):
+    monkeypatch.setattr(loop_module, "_runtime_expiry_heap", [])
+    monkeypatch.setattr(loop_module, "_runtime_expiry_pending", {})
+
+
+def _owners(section="collectors", kind="image"):
+    return RUNTIME_STORE["ref_owners"].get(section, {}).get(kind, {})
+
+
+def _start(loop_id="reclaim"):
+    ctx = MieLoopStart().execute(loop_id, param_type="int", param_mode="list", int_list="1,2")[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    return ctx
+
+
+def _later():
+    return time.time() + _MAX_RUNTIME_STORE_AGE + 1
+
+
+def test_owner_index_follows_register_and_remove():
+    ctx = _start()
+    ctx = MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))[0]
+    ref = ctx["collectors"]["image"]["ref"]
+    assert _owners() == {ref: ctx["run_id"]}
+    ctx = MieLoopStateSetImage().execute(ctx, "fb", torch.rand(1, 2, 2, 3))[0]
+    state_ref = ctx["state"]["fb_ref"]
+    assert _owners("state_objects") == {state_ref: ctx["run_id"]}
+
+    ctx["is_last"] = True
+    MieLoopFinalizeImages().execute(ctx, True)
+    assert _owners() == {}
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert _owners("state_objects") == {}
+
+
+def test_reclaim_only_touches_expired_runs(monkeypatch):
+    old = _start("old")
+    old = MieLoopCollectImage().execute(old, torch.rand(1, 2, 2, 3))[0]
+    fresh = [_start(f"fresh_{i}") for i in range(50)]
+    cleaned = []
+    real_cleanup = loop_module._cleanup_runtime_for_run
+    monkeypatch.setattr(
+        loop_module, "_cleanup_runtime_for_run",
+        lambda rid: (cleaned.append(rid), real_cleanup(rid))[1],
+    )
+    assert _reclaim_expired_runtime() == [] and cleaned == []
+
+    # Only "old" went idle: every other run was touched again just now.
+    later = _later()
+    for ctx in fresh:
+        _runtime_store_timestamps[ctx["run_id"]] = later - 10
+    assert _reclaim_expired_runtime(now=later) == [old["run_id"]]
+    assert cleaned == [old["run_id"]]
+    assert old["run_id"] not in RUNTIME_STORE["meta"]
+    assert RUNTIME_STORE["collectors"]["image"] == {}
+    # The touched runs were re-armed, not scanned again.
+    assert len(loop_module._runtime_expiry_heap) == len(fresh)
+    assert all(ctx["run_id"] in RUNTIME_STORE["meta"] for ctx in fresh)
+
+
+def test_released_ref_with_leftover_items_is_reclaimed():
+    ctx = _start()
+    ctx = MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))[0]
+    ref = ctx["collectors"]["image"]["ref"]
+    run_meta = RUNTIME_STORE["meta"][ctx["run_id"]]
+    loop_module._remove_runtime_collector_ref(run_meta, "image", ref)
+    assert RUNTIME_STORE["ref_orphans"] == [("collectors", "image", ref)]
+    _reclaim_expired_runtime()
+    assert ref not in RUNTIME_STORE["collectors"]["image"]
+    assert RUNTIME_STORE["ref_orphans"] == []
+
+
+def test_start_does_not_scan_the_store(monkeypatch):
+    def boom():
+        raise AssertionError("full prune on the hot path")
+
+    monkeypatch.setattr(loop_module, "_prune_runtime_store", boom)
+    _start()
+
+
+def test_full_prune_rebuilds_index_for_hand_written_meta():
+    RUNTIME_STORE["collectors"]["image"]["live_ref"] = [torch.rand(1, 2, 2, 3)]
+    RUNTIME_STORE["meta"]["hand_run"] = {"image_refs": ["live_ref"]}
+    _runtime_store_timestamps["hand_run"] = time.time()
+    _prune_runtime_store()
+    assert _owners() == {"live_ref": "hand_run"}
+    assert any(rid == "hand_run" for _ts, rid in loop_module._runtime_expiry_heap)
+    _runtime_store_timestamps.pop("hand_run", None)
+
+
+def test_start_reclaims_expired_runs_on_the_calling_thread(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(loop_module, "_MAX_RUNTIME_STORE_AGE", 0.0)
+    ctx = _start()
+    ctx = MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))[0]
+    threads = set(threading.enumerate())
+    other = _start("other")
+    assert ctx["run_id"] not in RUNTIME_STORE["meta"]
+    assert other["run_id"] in RUNTIME_STORE["meta"]
+    assert RUNTIME_STORE["collectors"]["image"] == {}
+    assert set(threading.enumerate()) <= threads
+
+
+def test_release_queued_during_a_pass_is_not_lost(monkeypatch):
+    ctx = _start()
+    ctx = MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))[0]
+    first = ctx["collectors"]["image"]["ref"]
+    run_meta = RUNTIME_STORE["meta"][ctx["run_id"]]
+    loop_module._remove_runtime_collector_ref(run_meta, "image", first)
+    late = ("collectors", "image", "late_ref")
+    real_cleanup = loop_module._cleanup_disk_cache_items
+
+    def release_meanwhile(items):
+        if late not in RUNTIME_STORE["ref_orphans"]:
+            RUNTIME_STORE["ref_orphans"].append(late)
+        return real_cleanup(items)
+
+    monkeypatch.setattr(loop_module, "_cleanup_disk_cache_items", release_meanwhile)
+    _reclaim_expired_runtime()
+    assert RUNTIME_STORE["ref_orphans"] == [late]
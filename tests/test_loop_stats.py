@@ -0,0 +1,98 @@
+"""Per-round loop metrics, MieLoopStats and the JSONL trace."""
+
+import json
+import sys
+
+import torch
+
+import loop as loop_module
+from loop import (
+    MieLoopCollectImage,
+    MieLoopEnd,
+    MieLoopFinalizeImages,
+    MieLoopStart,
+    MieLoopStats,
+    _flush_offload_writer,
+)
+
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+FakeGraphBuilder = _conftest_mod.FakeGraphBuilder if _conftest_mod else None
+
+
+def _dynprompt():
+    return {
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+        "15": {"class_type": "KSampler|Mie", "inputs": {"loop_ctx": ["10", 0]}},
+        "20": {"class_type": "MieLoopBodyOut|Mie", "inputs": {"loop_ctx": ["15", 0]}},
+        "30": {"class_type": "MieLoopEnd|Mie", "inputs": {"loop_ctx": ["20", 0]}},
+    }
+
+
+def _start(tmp_path, trace=True):
+    ctx = MieLoopStart().execute(
+        "stats_loop", param_type="int", param_mode="list", int_list="1,2",
+        trace_path=str(tmp_path / "trace.jsonl") if trace else "",
+    )[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    return ctx
+
+
+def _stats(ctx):
+    return json.loads(MieLoopStats().execute(ctx)[0])
+
+
+def test_stats_cover_rounds_and_finalize(tmp_path, monkeypatch):
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+    ctx = _start(tmp_path)
+    img = torch.rand(2, 4, 4, 3)
+    nbytes = img.numel() * img.element_size()
+    ctx = MieLoopCollectImage().execute(ctx, img, True, str(tmp_path / "off"))[0]
+    MieLoopEnd().execute(ctx, "{}", dynprompt=_dynprompt(), unique_id="30")
+    ctx["index"], ctx["is_last"] = 1, True
+    ctx = MieLoopCollectImage().execute(ctx, img.clone(), False)[0]
+    ctx, done = MieLoopEnd().execute(ctx, "{}")
+    assert done
+    _flush_offload_writer(ctx["run_id"])
+    MieLoopFinalizeImages().execute(ctx, True)
+
+    stats = _stats(ctx)
+    assert stats["loop_id"] == "stats_loop"
+    r0, r1 = stats["rounds"]
+    assert (r0["round"], r1["round"]) == (0, 1)
+    assert r0["collector_bytes"] == nbytes and r1["collector_bytes"] == nbytes
+    assert r0["detect_cached"] is False and r0["detect_s"] >= 0
+    assert r0["expand_template"] == "built" and r0["expand_nodes"] > 0
+    assert r0["offload_bytes"] > 0 and r0["offload_write_s"] >= 0
+    assert "offload_bytes" not in r1
+    assert all(r["round_wall_s"] >= 0 for r in (r0, r1))
+    assert stats["totals"]["collector_bytes"] == 2 * nbytes
+    fin = stats["finalize"]["image"]
+    assert fin["batches"] == 2 and fin["frames"] == 4
+    assert set(fin) >= {"flush_s", "materialize_s", "merge_s", "load_s", "merge_phase_s"}
+    assert fin["merge_phase_s"]
+
+
+def test_trace_file_gets_one_json_line_per_record(tmp_path):
+    ctx = _start(tmp_path)
+    ctx = MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))[0]
+    lines = (tmp_path / "trace.jsonl").read_text(encoding="utf-8").splitlines()
+    events = [json.loads(line) for line in lines]
+    assert [e["event"] for e in events] == ["start", "round"]
+    assert all(e["run_id"] == ctx["run_id"] for e in events)
+    assert events[1]["round"] == 0 and events[1]["collector_bytes"] == 1 * 2 * 2 * 3 * 4
+    assert ctx["meta"]["trace_path"] == str(tmp_path / "trace.jsonl")
+
+
+def test_no_trace_path_writes_nothing(tmp_path):
+    ctx = _start(tmp_path, trace=False)
+    MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))
+    assert list(tmp_path.iterdir()) == []
+    assert _stats(ctx)["rounds"][0]["collector_bytes"] == 1 * 2 * 2 * 3 * 4
+
+
+def test_cleanup_drops_run_metrics(tmp_path):
+    ctx = _start(tmp_path, trace=False)
+    MieLoopCollectImage().execute(ctx, torch.rand(1, 2, 2, 3))
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert ctx["run_id"] not in loop_module.RUNTIME_STORE["loop_metrics"]
+    assert _stats(ctx)["rounds"] == []
@@ -0,0 +1,170 @@
+"""MieLoopEnd(unroll=N): several rounds of a stateless or collector body per expand graph."""
+
+import sys
+
+import pytest
+
+import loop as loop_module
+from loop import (
+    RUNTIME_STORE,
+    MieLoopBodyOut,
+    MieLoopCollectText,
+    MieLoopEnd,
+    MieLoopFinalizeTextList,
+    MieLoopResume,
+    MieLoopStart,
+    MieLoopStats,
+    _journal_resume_point,
+    _read_journal,
+    _unroll_blocker,
+    collect_loop_body,
+)
+
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+FakeGraphBuilder = _conftest_mod.FakeGraphBuilder if _conftest_mod else None
+
+
+@pytest.fixture(autouse=True)
+def _fake_graph_builder(monkeypatch):
+    monkeypatch.setattr(loop_module, "GraphBuilder", FakeGraphBuilder)
+
+
+def _dynprompt(body_class="KSampler|Mie", state_json="{}"):
+    return {
+        "10": {"class_type": "MieLoopBodyIn|Mie", "inputs": {"loop_ctx": ["1", 0]}},
+        "15": {"class_type": body_class, "inputs": {"loop_ctx": ["10", 0], "key": "k", "value": 1}},
+        "20": {"class_type": "MieLoopBodyOut|Mie",
+               "inputs": {"loop_ctx": ["15", 0], "state_json": state_json}},
+        "30": {"class_type": "MieLoopEnd|Mie", "inputs": {"loop_ctx": ["20", 0], "unroll": 3}},
+    }
+
+
+def _start(count=5, **kwargs):
+    ctx = MieLoopStart().execute(
+        "unroll_loop", param_type="int", param_mode="range",
+        int_range_start=0, int_range_end=count, int_range_step=1, **kwargs,
+    )[0]
+    ctx["meta"].update({"body_in_id": "10", "body_out_id": "20", "end_id": "30"})
+    return ctx
+
+
+def _of_class(graph, name):
+    return {nid: n for nid, n in graph.items() if n["class_type"] == f"{name}|Mie"}
+
+
+def _resume(graph, round_idx):
+    (node,) = [
+        n for nid, n in _of_class(graph, "MieLoopResume").items() if f".r{round_idx}." in nid
+    ]
+    return MieLoopResume().execute(node["inputs"]["loop_ctx_json"])[0]
+
+
+def test_one_expand_clones_the_next_rounds_and_joins_them():
+    out = MieLoopEnd().execute(_start(), dynprompt=_dynprompt(), unique_id="30", unroll=3)
+    graph = out["expand"]
+    ends = _of_class(graph, "MieLoopEnd")
+    assert list(ends) == ["30.r3.__mie_loop_recurse_end__"]
+    assert out["result"][0] == ["30.r3.__mie_loop_recurse_end__", 0]
+    # One business clone per round, each tagged with its own round index.
+    samplers = _of_class(graph, "KSampler")
+    assert sorted(n["inputs"]["__mie_loop_round_idx__"] for n in samplers.values()) == [1, 2, 3]
+    # BodyOut(r1) <- join(r2) <- join(r3) <- End(r3).
+    body_out = loop_module.RECURSE_BODY_OUT_ID
+    joins = _of_class(graph, "MieLoopUnrollJoin")
+    assert joins["30.r2.__mie_loop_unroll_join__"]["inputs"]["after"] == [f"30.r1.{body_out}", 0]
+    assert joins["30.r3.__mie_loop_unroll_join__"]["inputs"]["after"] == [
+        "30.r2.__mie_loop_unroll_join__", 0
+    ]
+    assert ends["30.r3.__mie_loop_recurse_end__"]["inputs"]["loop_ctx"] == [
+        "30.r3.__mie_loop_unroll_join__", 0
+    ]
+    # Every Resume handle of the chunk still resolves.
+    assert [_resume(graph, i)["current_params"] for i in (1, 2, 3)] == [
+        {"value": 1}, {"value": 2}, {"value": 3}
+    ]
+    assert _resume(graph, 3)["is_last"] is False
+
+
+def test_last_chunk_is_clamped_and_its_end_finishes_the_loop(tmp_path):
+    ctx = _start(journal_dir=str(tmp_path))
+    graph = MieLoopEnd().execute(ctx, dynprompt=_dynprompt(), unique_id="30", unroll=3)["expand"]
+    last = _resume(graph, 3)
+    assert last["meta"]["unroll_first"] == 1
+    # End(r3) closes rounds 1..3 and expands only the one round left.
+    out = MieLoopEnd().execute(last, dynprompt=_dynprompt(), unroll=3)
+    assert len(_of_class(out["expand"], "MieLoopResume")) == 1
+    assert not _of_class(out["expand"], "MieLoopUnrollJoin")
+    ctx, done = MieLoopEnd().execute(_resume(out["expand"], 4), dynprompt=_dynprompt(), unroll=3)
+    assert done and ctx["index"] == 4 and "unroll_first" not in ctx["meta"]
+    journal = _read_journal(ctx["meta"]["journal_path"])
+    assert [r["round"] for r in journal if r["event"] == "round"] == [0, 1, 2, 3, 4]
+    assert journal[-1]["event"] == "done"
+    rounds = MieLoopStats().execute(ctx)[0]
+    assert '"expand_rounds": 3' in rounds
+
+
+@pytest.mark.parametrize(
+    "body_class,state_json,reason",
+    [
+        ("KSampler|Mie", "{}", ""),
+        ("MieLoopCollectText|Mie", "{}", ""),
+        ("MieLoopStateSetInt|Mie", "{}", "loop_ctx chain"),
+        ("KSampler|Mie", ["15", 1], "state_json is computed per round"),
+    ],
+)
+def test_unroll_blocker(body_class, state_json, reason):
+    dynprompt = _dynprompt(body_class, state_json)
+    _, detect = collect_loop_body("10", "20", dynprompt, "30")
+    blocker = _unroll_blocker(dynprompt, detect, "10", "20")
+    assert (reason in blocker) if reason else blocker == ""
+
+
+def test_off_chain_collector_blocks_unroll():
+    dynprompt = _dynprompt()
+    dynprompt["16"] = {"class_type": "MieLoopCollectText|Mie",
+                       "inputs": {"loop_ctx": ["10", 0], "text": "x"}}
+    dynprompt["20"]["inputs"]["state_json"] = "{}"
+    detect = {"node_types": {"15": "KSampler", "16": "MieLoopCollectText"}}
+    assert "16 (MieLoopCollectText)" in _unroll_blocker(dynprompt, detect, "10", "20")
+
+
+def test_collector_body_runs_its_unrolled_rounds_in_order(tmp_path):
+    dynprompt = _dynprompt("MieLoopCollectText|Mie")
+    ctx = MieLoopCollectText().execute(_start(journal_dir=str(tmp_path)), "t0")[0]
+    ctx, state_json = MieLoopBodyOut().execute(ctx)
+    graph = MieLoopEnd().execute(ctx, state_json, dynprompt=dynprompt, unique_id="30", unroll=3)["expand"]
+    body_out = loop_module.RECURSE_BODY_OUT_ID
+    resumes = _of_class(graph, "MieLoopResume")
+    assert "after" not in resumes["30.r1.__mie_loop_resume__"]["inputs"]
+    assert resumes["30.r2.__mie_loop_resume__"]["inputs"]["after"] == [f"30.r1.{body_out}", 0]
+    assert resumes["30.r3.__mie_loop_resume__"]["inputs"]["after"] == [f"30.r2.{body_out}", 0]
+
+    # Execute the chunk the way its links order it: Resume(k) after BodyOut(k-1).
+    prev = None
+    for i in (1, 2, 3):
+        node = resumes[f"30.r{i}.__mie_loop_resume__"]
+        round_ctx = MieLoopResume().execute(node["inputs"]["loop_ctx_json"], after=prev)[0]
+        round_ctx = MieLoopCollectText().execute(round_ctx, f"t{i}")[0]
+        prev, state_json = MieLoopBodyOut().execute(round_ctx)
+    assert prev["collectors"]["text"]["count"] == 4
+    out = MieLoopEnd().execute(prev, state_json, dynprompt=dynprompt, unroll=3)
+    ctx = _resume(out["expand"], 4)
+    ctx = MieLoopCollectText().execute(ctx, "t4")[0]
+    ctx, done = MieLoopEnd().execute(ctx, dynprompt=dynprompt, unroll=3)
+    assert done
+    assert MieLoopFinalizeTextList().execute(ctx, True)[0] == '["t0", "t1", "t2", "t3", "t4"]'
+    journal = _read_journal(ctx["meta"]["journal_path"])
+    counts = [r["collectors"]["text"]["count"] for r in journal if r["event"] == "round"]
+    assert counts == [1, 2, 3, 4, 5]
+    # Every round record matches its items, so a resume would keep them all.
+    point = _journal_resume_point(journal[:-1], run_id=ctx["run_id"])
+    assert point["index"] == 5
+
+
+def test_stateful_body_keeps_one_round_per_expand():
+    ctx = _start()
+    out = MieLoopEnd().execute(
+        ctx, dynprompt=_dynprompt("MieLoopStateSetInt|Mie"), unique_id="30", unroll=3
+    )
+    assert len(_of_class(out["expand"], "MieLoopResume")) == 1
+    assert RUNTIME_STORE["_detect_cache"][ctx["run_id"]]["unroll_blocker"]
@@ -130,6 +130,10 @@ def _ctx_skeleton(**overrides):
     return ctx
 
 
+def _all_values(ctx):
+    return [loop_module._loop_params_at(ctx, i)["value"] for i in range(ctx["count"])]
+
+
 def test_loop_start_with_decrement_mode_initializes_context():
     node = loop_module.MieLoopStart()
     ctx_out, index, count, is_last = node.execute(
@@ -144,7 +148,9 @@ def test_loop_start_with_decrement_mode_initializes_context():
     assert is_last is False
     assert ctx_out["loop_id"] == "dec_loop"
     assert ctx_out["count"] == 3
-    assert [p["value"] for p in ctx_out["params_list"]] == [2, 2, 1]
+    assert ctx_out["params_source"]["kind"] == "int_decrement"
+    assert ctx_out["params_list"] == []
+    assert _all_values(ctx_out) == [2, 2, 1]
     assert ctx_out["current_params"]["value"] == 2
 
 
@@ -159,7 +165,7 @@ def test_loop_start_with_decrement_step_larger_than_total():
     )
     assert count == 1
     assert is_last is True
-    assert [p["value"] for p in ctx_out["params_list"]] == [3]
+    assert _all_values(ctx_out) == [3]
 
 
 def test_loop_start_with_decrement_total_zero_creates_empty_loop():
@@ -187,8 +193,7 @@ def test_loop_start_with_float_decrement():
         float_decrement_step=0.4,
     )
     assert count == 3
-    actual = [p["value"] for p in ctx_out["params_list"]]
-    assert actual == pytest.approx([0.4, 0.4, 0.2], abs=1e-9)
+    assert _all_values(ctx_out) == pytest.approx([0.4, 0.4, 0.2], abs=1e-9)
 
 
 # ---------- MieLoopIfCurrentIdx ----------------------------------------
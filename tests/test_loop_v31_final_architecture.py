@@ -73,8 +73,8 @@ def test_loop_end_expand_result_uses_only_two_outputs(monkeypatch):
 def test_expand_root_lazy_init(monkeypatch):
     """Plan A: execute pins expand_root into the ctx that flows to the next round.
 
-    execute deep-copies the input ctx and serializes the copy into the expand
-    graph's Resume node (loop_ctx_json). expand_root must be present there —
+    execute copies the input ctx and snapshots it behind the expand graph's
+    Resume node handle (loop_ctx_json). expand_root must be present there —
     lazily initialized to end_id on first expand — so the flat prefix stays
     stable for the whole run_id lifetime, including across resume.
     """
@@ -87,7 +87,7 @@ def test_expand_root_lazy_init(monkeypatch):
     resume = next(
         d for d in expand_graph.values() if d["class_type"] == "MieLoopResume|Mie"
     )
-    carried_ctx = json.loads(resume["inputs"]["loop_ctx_json"])
+    carried_ctx = loop_module.MieLoopResume().execute(resume["inputs"]["loop_ctx_json"])[0]
     assert carried_ctx["meta"].get("expand_root") == "30", (
         f"expand_root should be lazily initialized to end_id '30' and carried into "
         f"the next-round ctx, got {carried_ctx['meta'].get('expand_root')}"
@@ -141,7 +141,7 @@ def test_resume_preserves_expand_root(monkeypatch):
         resume_node = next(
             d for d in expand_graph.values() if d["class_type"] == "MieLoopResume|Mie"
         )
-        carried = json.loads(resume_node["inputs"]["loop_ctx_json"])
+        carried = loop_module.MieLoopResume().execute(resume_node["inputs"]["loop_ctx_json"])[0]
         assert carried["meta"]["expand_root"] == expand_root
 
     # Default: expand_root equals template end_id (typical first-run pin).
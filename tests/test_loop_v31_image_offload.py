@@ -1,6 +1,8 @@
 import tempfile
+import threading
 from pathlib import Path
 
+import pytest
 import torch
 
 from loop import (
@@ -8,7 +10,9 @@ from loop import (
     MieLoopFinalizeImages,
     MieLoopCleanupImages,
     RUNTIME_STORE,
+    _flush_offload_writer,
 )
+from loop import is_mieraw, load_tensor_file, read_header
 
 
 def test_offload_images_to_disk_and_finalize_cleans_files(sample_loop_ctx):
@@ -25,6 +29,7 @@ def test_offload_images_to_disk_and_finalize_cleans_files(sample_loop_ctx):
         stored = RUNTIME_STORE["collectors"]["image"][ref]
         assert len(stored) == 2
         paths = [Path(x["disk_path"]) for x in stored]
+        _flush_offload_writer(ctx["run_id"])  # writes land off the loop thread
         assert all(p.exists() for p in paths)
 
         merged = finalize.execute(ctx, True)[0]
@@ -45,6 +50,7 @@ def test_offload_images_to_disk_and_cleanup_cleans_files(sample_loop_ctx):
         ref = ctx["collectors"]["image"]["ref"]
         stored = RUNTIME_STORE["collectors"]["image"][ref]
         paths = [Path(x["disk_path"]) for x in stored]
+        _flush_offload_writer(ctx["run_id"])  # writes land off the loop thread
         assert all(p.exists() for p in paths)
 
         cleaned_ctx, cleaned = cleanup.execute(ctx)
@@ -53,3 +59,151 @@ def test_offload_images_to_disk_and_cleanup_cleans_files(sample_loop_ctx):
         assert ref not in RUNTIME_STORE["collectors"]["image"]
         assert all(not p.exists() for p in paths)
 
+
+
+def test_offload_images_writes_raw_container(sample_loop_ctx, tmp_path):
+    collect = MieLoopCollectImage()
+    img = torch.rand(2, 8, 8, 3)
+
+    ctx = collect.execute(sample_loop_ctx, img, True, str(tmp_path))[0]
+    ref = ctx["collectors"]["image"]["ref"]
+    path = Path(RUNTIME_STORE["collectors"]["image"][ref][0]["disk_path"])
+    _flush_offload_writer(ctx["run_id"])
+
+    assert path.suffix == ".mieraw"
+    assert torch.equal(load_tensor_file(path), img)
+    assert torch.equal(load_tensor_file(path, mmap=True), img)
+
+
+def test_background_offload_failure_surfaces_at_finalize(sample_loop_ctx, tmp_path, monkeypatch):
+    import loop as loop_module
+
+    def broken_save(tensor, path, meta=None, codec="raw"):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(loop_module, "save_mieraw", broken_save)
+    ctx = MieLoopCollectImage().execute(sample_loop_ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
+    ref = ctx["collectors"]["image"]["ref"]
+
+    with pytest.raises(RuntimeError, match="background offload write failed.*disk full"):
+        MieLoopFinalizeImages().execute(ctx, True)
+    # Items stay registered so the run can still be inspected / cleaned up.
+    assert len(RUNTIME_STORE["collectors"]["image"][ref]) == 1
+
+
+def test_background_offload_bounds_inflight_bytes(tmp_path, monkeypatch):
+    import loop as loop_module
+
+    gate = threading.Event()
+    peak = {"bytes": 0}
+    real_save = loop_module.save_mieraw
+
+    def slow_save(tensor, path, meta=None, codec="raw"):
+        gate.wait(5)
+        return real_save(tensor, path, meta, codec)
+
+    monkeypatch.setattr(loop_module, "save_mieraw", slow_save)
+    item = torch.rand(2, 8, 8, 3)
+    nbytes = item.numel() * item.element_size()
+    writer = loop_module._OffloadWriter("bp_run", max_inflight_bytes=nbytes * 2)
+    try:
+        def produce():
+            for i in range(5):
+                writer.submit(tmp_path / f"b{i}.mieraw", item.clone())
+                peak["bytes"] = max(peak["bytes"], writer.inflight_bytes)
+
+        t = threading.Thread(target=produce)
+        t.start()
+        t.join(0.3)
+        # The producer is blocked by backpressure while the writer is stuck.
+        assert t.is_alive()
+        assert writer.inflight_bytes <= nbytes * 2
+        gate.set()
+        t.join(5)
+        writer.flush()
+    finally:
+        gate.set()
+        writer.close()
+    assert peak["bytes"] <= nbytes * 2
+    assert len(list(tmp_path.glob("b*.mieraw"))) == 5
+
+
+def test_background_offload_owns_cpu_input(sample_loop_ctx, tmp_path):
+    img = torch.rand(1, 4, 4, 3)
+    expected = img.clone()
+    ctx = MieLoopCollectImage().execute(sample_loop_ctx, img, True, str(tmp_path))[0]
+    img.zero_()  # upstream reuses its buffer while the write may be queued
+    _flush_offload_writer(ctx["run_id"])
+    ref = ctx["collectors"]["image"]["ref"]
+    path = RUNTIME_STORE["collectors"]["image"][ref][0]["disk_path"]
+    assert torch.equal(load_tensor_file(path), expected)
+
+
+def test_cleanup_runtime_for_run_closes_writer(sample_loop_ctx, tmp_path):
+    import loop as loop_module
+
+    ctx = MieLoopCollectImage().execute(sample_loop_ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
+    writer = RUNTIME_STORE["offload_writers"][ctx["run_id"]]
+    loop_module._cleanup_runtime_for_run(ctx["run_id"])
+    assert ctx["run_id"] not in RUNTIME_STORE["offload_writers"]
+    assert not writer._thread.is_alive()
+    assert list(tmp_path.glob("*.mieraw")) == []
+
+
+def test_run_end_closes_writer_and_finalize_still_raises(sample_loop_ctx, tmp_path, monkeypatch):
+    import loop as loop_module
+
+    def broken_save(tensor, path, meta=None, codec="raw"):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(loop_module, "save_mieraw", broken_save)
+    ctx = MieLoopCollectImage().execute(sample_loop_ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
+    writer = RUNTIME_STORE["offload_writers"][ctx["run_id"]]
+    # What MieLoopEnd does once the last round is closed.
+    loop_module._release_run_caches(ctx["run_id"])
+    assert ctx["run_id"] not in RUNTIME_STORE["offload_writers"]
+    assert not writer._thread.is_alive()
+    with pytest.raises(RuntimeError, match="^LoopCollectImage: background offload write failed.*disk full"):
+        MieLoopFinalizeImages().execute(ctx, True)
+
+
+def test_finalize_closes_writer_of_completed_run(sample_loop_ctx, tmp_path):
+    ctx = MieLoopCollectImage().execute(sample_loop_ctx, torch.rand(1, 4, 4, 3), True, str(tmp_path))[0]
+    writer = RUNTIME_STORE["offload_writers"][ctx["run_id"]]
+    RUNTIME_STORE["meta"][ctx["run_id"]]["status"] = "completed"
+    MieLoopFinalizeImages().execute(ctx, True)
+    assert ctx["run_id"] not in RUNTIME_STORE["offload_writers"]
+    assert not writer._thread.is_alive()
+
+
+def test_writer_errors_name_the_submitting_source(tmp_path, monkeypatch):
+    import loop as loop_module
+
+    def broken_save(tensor, path, meta=None, codec="raw"):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(loop_module, "save_mieraw", broken_save)
+    writer = loop_module._OffloadWriter("src_run")
+    try:
+        writer.submit(tmp_path / "a.mieraw", torch.rand(1, 2, 2, 3), source="LoopCollect")
+        with pytest.raises(RuntimeError, match="^LoopCollect: .*a.mieraw"):
+            writer.flush()
+        writer.call_after_writes(lambda: 1 / 0)
+        with pytest.raises(RuntimeError, match="^LoopJournal: .*<callback>"):
+            writer.flush()
+    finally:
+        writer.close()
+
+
+def test_offload_codec_roundtrips_through_finalize(sample_loop_ctx, tmp_path):
+    batches = [torch.randint(0, 256, (2, 4, 4, 3)).float() / 255.0 for _ in range(3)]
+    ctx = sample_loop_ctx
+    for b in batches:
+        ctx = MieLoopCollectImage().execute(ctx, b, True, str(tmp_path), "lossless_uint8")[0]
+    _flush_offload_writer(ctx["run_id"])
+    ref = ctx["collectors"]["image"]["ref"]
+    for item in RUNTIME_STORE["collectors"]["image"][ref]:
+        assert is_mieraw(item["disk_path"])
+        assert read_header(item["disk_path"])["encoding"]["stored_dtype"] == "uint8"
+    merged, _path = MieLoopFinalizeImages().execute(ctx, True)
+    assert torch.equal(merged, torch.cat(batches, dim=0))
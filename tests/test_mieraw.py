@@ -0,0 +1,259 @@
+"""Tests for the ``.mieraw`` raw tensor container (core/mieraw.py)."""
+
+import sys
+
+import pytest
+import torch
+
+import loop as loop_module
+from loop import _chunked_disk_merge
+
+
+@pytest.fixture
+def mieraw():
+    return sys.modules[loop_module.save_mieraw.__module__]
+
+
+@pytest.mark.parametrize(
+    "dtype", [torch.float32, torch.float16, torch.bfloat16, torch.uint8, torch.bool]
+)
+def test_roundtrip_is_bit_exact(mieraw, tmp_path, dtype):
+    t = (torch.rand(3, 5, 7, 3) * 200).to(dtype)
+    path = tmp_path / "x.mieraw"
+    written = mieraw.save_mieraw(t, path, meta={"fps": 16})
+    assert written == path.stat().st_size
+    header = mieraw.read_header(path)
+    assert header["shape"] == (3, 5, 7, 3)
+    assert header["meta"] == {"fps": 16}
+    assert header["data_offset"] % 64 == 0
+    for mmap in (True, False):
+        loaded = mieraw.load_mieraw(path, mmap=mmap)
+        assert loaded.dtype == dtype
+        assert torch.equal(loaded, t)
+
+
+def test_mmap_load_is_copy_on_write(mieraw, tmp_path):
+    t = torch.rand(4, 2, 2, 3)
+    path = tmp_path / "x.mieraw"
+    mieraw.save_mieraw(t, path)
+    view = mieraw.load_mieraw(path, mmap=True)
+    view.zero_()
+    assert torch.equal(mieraw.load_mieraw(path), t)
+
+
+@pytest.mark.parametrize(
+    "start,count,stride",
+    [(0, None, 1), (2, 3, 1), (1, None, 2), (3, 10, 2), (9, 2, 1)],
+)
+def test_frame_range_matches_slice(mieraw, tmp_path, start, count, stride):
+    t = torch.rand(8, 3, 3, 3)
+    path = tmp_path / "x.mieraw"
+    mieraw.save_mieraw(t, path)
+    stop = None if count is None else start + count * stride
+    want = t[start:stop:stride]
+    for mmap in (True, False):
+        got = mieraw.load_mieraw(path, mmap=mmap, start=start, count=count, stride=stride)
+        assert torch.equal(got, want)
+
+
+def test_empty_tensor_roundtrip(mieraw, tmp_path):
+    path = tmp_path / "empty.mieraw"
+    mieraw.save_mieraw(torch.zeros((0, 1, 1, 3)), path)
+    loaded = mieraw.load_mieraw(path)
+    assert loaded.shape == (0, 1, 1, 3)
+
+
+def test_create_mieraw_writes_in_place(mieraw, tmp_path):
+    path = tmp_path / "out.mieraw"
+    mm = mieraw.create_mieraw(path, (4, 2, 2, 3), torch.bfloat16)
+    src = torch.rand(4, 2, 2, 3).to(torch.bfloat16)
+    mieraw.memmap_as_tensor(mm, torch.bfloat16)[:] = src
+    mm.flush()
+    del mm
+    assert torch.equal(mieraw.load_mieraw(path), src)
+
+
+def test_load_tensor_file_sniffs_format(mieraw, tmp_path):
+    t = torch.rand(2, 2, 2, 3)
+    raw = tmp_path / "a.pt"  # extension does not matter, the magic does
+    mieraw.save_mieraw(t, raw)
+    pt = tmp_path / "b.pt"
+    torch.save(t, str(pt))
+    assert mieraw.is_mieraw(raw) and not mieraw.is_mieraw(pt)
+    assert torch.equal(mieraw.load_tensor_file(raw), t)
+    assert torch.equal(mieraw.load_tensor_file(pt), t)
+
+
+def test_read_header_rejects_foreign_files(mieraw, tmp_path):
+    bad = tmp_path / "bad.mieraw"
+    bad.write_bytes(b"NOTMIE\x00\x01" + b"\x00" * 8)
+    with pytest.raises(ValueError, match="bad magic"):
+        mieraw.read_header(bad)
+    short = tmp_path / "short.mieraw"
+    short.write_bytes(b"MIE")
+    with pytest.raises(ValueError, match="truncated"):
+        mieraw.read_header(short)
+
+
+# ---------------------------------------------------------------------------
+# chunked_disk_merge with .mieraw inputs / output
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_merge_mixed_inputs_to_mieraw_output(mieraw, tmp_path, single_pass):
+    expected, items = [], []
+    for i in range(5):
+        t = torch.rand(2, 4, 4, 3)
+        expected.append(t)
+        p = tmp_path / (f"image_{i}.mieraw" if i % 2 else f"image_{i}.pt")
+        if i % 2:
+            mieraw.save_mieraw(t, p)
+        else:
+            torch.save(t, str(p))
+        items.append({"disk_path": str(p), "ref": ""})
+    out_path = tmp_path / "merged.mieraw"
+    stats = {}
+    _chunked_disk_merge(
+        items, out_path, chunk_size=2, kind="image",
+        single_pass=single_pass, stats=stats,
+    )
+    assert mieraw.is_mieraw(out_path)
+    assert torch.equal(mieraw.load_mieraw(out_path), torch.cat(expected, dim=0))
+    assert list(tmp_path.glob("*.tmp")) == []
+    assert list(tmp_path.glob("_mie_chunk_*")) == []
+    if single_pass:
+        # Container output is written once: no temp memmap, no re-save.
+        assert stats["bytes_written"] == out_path.stat().st_size
+
+
+def test_merge_to_mieraw_removes_partial_output_on_failure(mieraw, tmp_path, monkeypatch):
+    items = []
+    for i in range(3):
+        p = tmp_path / f"image_{i}.mieraw"
+        mieraw.save_mieraw(torch.rand(2, 4, 4, 3), p)
+        items.append({"disk_path": str(p), "ref": ""})
+    merge_mod = sys.modules[_chunked_disk_merge.__module__]
+    real = merge_mod.iter_tensor_blocks
+    calls = {"n": 0}
+
+    def flaky(*args, **kwargs):
+        calls["n"] += 1
+        if calls["n"] > 1:  # first batch copies, second read fails
+            raise RuntimeError("simulated read failure")
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(merge_mod, "iter_tensor_blocks", flaky)
+    out_path = tmp_path / "merged.mieraw"
+    with pytest.raises(RuntimeError):
+        _chunked_disk_merge(items, out_path, kind="image", single_pass=True)
+    assert not out_path.exists()
+    assert all((tmp_path / f"image_{i}.mieraw").exists() for i in range(3))
+
+
+# ---------------------------------------------------------------------------
+# Encoded (compressed) containers
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("dtype", [torch.float32, torch.bfloat16, torch.uint8])
+def test_lossless_codec_is_bit_exact(mieraw, tmp_path, dtype):
+    t = (torch.rand(5, 6, 6, 3) * 100).to(dtype)
+    path = tmp_path / "x.mieraw"
+    written = mieraw.save_mieraw(t, path, meta={"k": 1}, codec="lossless")
+    assert written == path.stat().st_size
+    header = mieraw.read_header(path)
+    assert header["encoding"]["codec"] == "lossless"
+    assert header["meta"] == {"k": 1}
+    loaded = mieraw.load_tensor_file(path, mmap=True)
+    assert loaded.dtype == dtype
+    assert torch.equal(loaded, t)
+
+
+def test_compressed_codec_shrinks_redundant_data(mieraw, tmp_path):
+    t = torch.zeros(4, 32, 32, 3)
+    raw, packed = tmp_path / "raw.mieraw", tmp_path / "packed.mieraw"
+    mieraw.save_mieraw(t, raw)
+    mieraw.save_mieraw(t, packed, codec="lossless")
+    assert packed.stat().st_size < raw.stat().st_size // 10
+
+
+def test_lossless_uint8_stores_8bit_only_when_exact(mieraw, tmp_path):
+    exact = torch.randint(0, 256, (3, 4, 4, 3)).float() / 255.0
+    path = tmp_path / "exact.mieraw"
+    mieraw.save_mieraw(exact, path, codec="lossless_uint8")
+    enc = mieraw.read_header(path)["encoding"]
+    assert (enc["codec"], enc["stored_dtype"]) == ("lossless_uint8", "uint8")
+    assert torch.equal(mieraw.load_mieraw(path), exact)
+
+    inexact = torch.rand(3, 4, 4, 3)
+    path = tmp_path / "inexact.mieraw"
+    mieraw.save_mieraw(inexact, path, codec="lossless_uint8")
+    enc = mieraw.read_header(path)["encoding"]
+    assert (enc["codec"], enc["stored_dtype"]) == ("lossless", "float32")
+    assert torch.equal(mieraw.load_mieraw(path), inexact)
+
+
+@pytest.mark.parametrize("codec,tol", [("fp16", 1e-3), ("uint8", 0.5 / 255 + 1e-6)])
+def test_lossy_codecs_stay_within_display_precision(mieraw, tmp_path, codec, tol):
+    t = torch.rand(3, 8, 8, 3)
+    path = tmp_path / "x.mieraw"
+    mieraw.save_mieraw(t, path, codec=codec)
+    loaded = mieraw.load_mieraw(path)
+    assert loaded.dtype == torch.float32
+    assert (loaded - t).abs().max().item() <= tol
+
+
+def test_unknown_codec_is_rejected(mieraw, tmp_path):
+    with pytest.raises(ValueError, match="unknown codec"):
+        mieraw.save_mieraw(torch.rand(1, 2, 2, 3), tmp_path / "x.mieraw", codec="jpeg")
+
+
+@pytest.mark.parametrize(
+    "start,count,stride", [(0, None, 1), (2, 5, 1), (1, None, 3), (6, 4, 2)]
+)
+def test_encoded_frame_range_decodes_only_needed_blocks(
+    mieraw, tmp_path, monkeypatch, start, count, stride
+):
+    monkeypatch.setattr(mieraw, "_BLOCK_BYTES", 4 * 4 * 3 * 4 * 2)  # 2 frames / block
+    t = torch.rand(11, 4, 4, 3)
+    path = tmp_path / "x.mieraw"
+    mieraw.save_mieraw(t, path, codec="lossless")
+    assert len(mieraw.read_header(path)["encoding"]["blocks"]) == 6
+    decoded = []
+    real = mieraw._decode_block
+    monkeypatch.setattr(
+        mieraw, "_decode_block", lambda f, h, b: decoded.append(b) or real(f, h, b)
+    )
+    stop = None if count is None else start + count * stride
+    want = t[start:stop:stride]
+    got = mieraw.load_mieraw(path, start=start, count=count, stride=stride)
+    assert torch.equal(got, want)
+    assert sorted(set(decoded)) == sorted({i // 2 for i in range(11)[start:stop:stride]})
+    assert len(decoded) == len(set(decoded))
+
+
+def test_iter_tensor_blocks_streams_encoded_file(mieraw, tmp_path, monkeypatch):
+    monkeypatch.setattr(mieraw, "_BLOCK_BYTES", 4 * 4 * 3 * 4 * 3)  # 3 frames / block
+    t = torch.rand(7, 4, 4, 3)
+    path = tmp_path / "x.mieraw"
+    mieraw.save_mieraw(t, path, codec="lossless")
+    blocks = list(mieraw.iter_tensor_blocks(path))
+    assert [b.shape[0] for b in blocks] == [3, 3, 1]
+    assert torch.equal(torch.cat(blocks), t)
+    assert mieraw.probe_tensor_file(path) == ((7, 4, 4, 3), torch.float32)
+
+
+@pytest.mark.parametrize("single_pass", [False, True])
+def test_merge_decodes_compressed_inputs(mieraw, tmp_path, single_pass):
+    expected, items = [], []
+    for i, codec in enumerate(["raw", "lossless", "lossless_uint8", "lossless"]):
+        t = torch.randint(0, 256, (2, 4, 4, 3)).float() / 255.0
+        expected.append(t)
+        p = tmp_path / f"image_{i}.mieraw"
+        mieraw.save_mieraw(t, p, codec=codec)
+        items.append({"disk_path": str(p), "ref": ""})
+    out_path = tmp_path / "merged.pt"
+    _chunked_disk_merge(items, out_path, chunk_size=2, kind="image", single_pass=single_pass)
+    merged = torch.load(str(out_path))
+    assert torch.equal(merged, torch.cat(expected, dim=0))
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Tests for AddNumberWatermarkForImage|Mie render modes."""
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_show_and_save_anything_log import PROJECT_DIR, _load_module  # noqa: E402
+
+pytest.importorskip("cv2")
+
+
+@pytest.fixture(scope="module")
+def node():
+    _load_module()  # stubs folder_paths and the internal package
+    spec = importlib.util.spec_from_file_location(
+        "image_for_test", str(PROJECT_DIR / "nodes" / "media" / "image.py")
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.AddNumberWatermarkForImage()
+
+
+@pytest.mark.parametrize(
+    "pos,font_scale,thickness,outline",
+    [((95.0, 95.0), 1.0, 2, True), ((0.0, 0.0), 1.5, 1, False), ((100.0, 0.0), 0.5, 1, True)],
+)
+def test_batched_matches_per_frame(node, pos, font_scale, thickness, outline):
+    images = torch.rand(5, 48, 96, 3)
+    args = (images, 7, pos[0], pos[1], font_scale, 200, 50, 10, thickness, outline, 2)
+    (legacy,) = node.apply_watermark(*args, "per_frame")
+    (batched,) = node.apply_watermark(*args, "batched")
+    assert batched.shape == legacy.shape and batched.dtype == images.dtype
+    # The legacy path quantizes each frame to uint8; nothing else differs.
+    assert (batched - legacy).abs().max() <= 3 / 255
+    # Frames get their own numbers, so the drawn pixels differ between frames.
+    changed = (batched != images).any(dim=-1)
+    assert changed.any(dim=(1, 2)).all()
+
+
+def test_batched_leaves_pixels_outside_text_untouched(node):
+    images = torch.rand(3, 64, 64, 3)
+    (out,) = node.apply_watermark(images, 1, 0.0, 0.0, 0.5, 255, 255, 255, 1, False, 1)
+    assert torch.equal(out[:, 32:, 32:], images[:, 32:, 32:])
+    assert not torch.equal(out[:, :16, :16], images[:, :16, :16])
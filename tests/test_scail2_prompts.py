@@ -24,6 +24,8 @@ from pathlib import Path
 
 import pytest
 
+_conftest_mod = sys.modules.get("tests.conftest") or sys.modules.get("conftest")
+
 PROJECT_DIR = Path(__file__).resolve().parents[1]
 SCAIL2_GEN_PATH = PROJECT_DIR / "nodes" / "llm" / "scail2_prompt_generator.py"
 SCAIL2_PROMPTS_PATH = PROJECT_DIR / "nodes" / "llm" / "scail2_prompts.py"
@@ -241,19 +243,6 @@ def test_sample_indices(scail2):
     assert gen._sample_indices(1, 8) == [0]
 
 
-def test_sample_urls_dedupes_endpoints(scail2):
-    """``_sample_urls`` preserves order and de-duplicates indices that
-    coincide at the endpoints (can happen when ``n >= total``)."""
-    _, gen = scail2
-    urls = [f"http://x/{i}" for i in range(4)]
-    out = gen._sample_urls(urls, 1)
-    assert out == ["http://x/2"]  # middle of 4
-    out = gen._sample_urls(urls, 2)
-    assert out == ["http://x/0", "http://x/3"]  # endpoints
-    # Empty / None URLs return empty.
-    assert gen._sample_urls([], 5) == []
-
-
 # --------------------------------------------------------------------------- #
 # ComfyUI-node tests
 # --------------------------------------------------------------------------- #
@@ -383,6 +372,9 @@ def test_enhancer_short_circuits_on_empty_prompt_replacement(scail2):
     assert out == ""
 
 
+_canned_frame_plan = _conftest_mod.canned_frame_plan
+
+
 def test_enhancer_happy_path_runs_full_pipeline(scail2, monkeypatch):
     """Regression for the ``source_urls`` NameError that the rename commit
     (58fafad) introduced on the success path: ``__call__`` must run both
@@ -390,8 +382,8 @@ def test_enhancer_happy_path_runs_full_pipeline(scail2, monkeypatch):
     present. The short-circuit tests above never reach the buggy log line,
     so this case is the only thing that would have caught it.
 
-    We monkeypatch ``image_tensor_batch_to_data_urls`` on the generator
-    module to return canned URLs (decoupling from the real image-encode
+    We monkeypatch ``FramePlan`` on the generator module to return
+    canned URLs (decoupling from the real image-encode
     path) and a ``FakeConnector`` whose ``invoke`` returns deterministic
     text per stage. We then assert:
       - the returned prompt is the stage-2 enhanced text, not the original;
@@ -420,8 +412,8 @@ def test_enhancer_happy_path_runs_full_pipeline(scail2, monkeypatch):
     # treated as a non-empty batch of frames / references.
     monkeypatch.setattr(
         gen,
-        "image_tensor_batch_to_data_urls",
-        lambda t: ["data:image/jpeg;base64,AAAA"] * 8 if t is not None else [],
+        "FramePlan",
+        _canned_frame_plan(8),
     )
 
     enhancer = gen.Scail2PromptEnhancer(FakeConnector(), num_frames=8)
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""Tests for ``core.utils.tensor_fingerprint`` (the `is_changed` media hash)."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import torch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from test_bernini_reference_video_frames import _load_bernini  # noqa: E402
+
+
+@pytest.fixture
+def fp():
+    _load_bernini()
+    return sys.modules["_mienodes_internal.core.utils"].tensor_fingerprint
+
+
+def test_none_and_unknown_inputs(fp):
+    assert fp(None) == "none"
+    assert fp("not a tensor") == "none"
+
+
+def test_stable_for_equal_content(fp):
+    t = torch.rand(3, 16, 16, 3)
+    assert fp(t) == fp(t.clone())
+
+
+def test_sensitive_to_shape_dtype_and_content(fp):
+    t = torch.zeros(4, 8, 8, 3)
+    base = fp(t)
+    assert fp(t.reshape(2, 16, 8, 3)) != base
+    assert fp(t.to(torch.float16)) != base
+    changed = t.clone()
+    changed[-1, -1, -1, -1] = 1.0
+    assert fp(changed) != base
+
+
+def test_frame_swap_detected_on_large_batch(fp):
+    """Replacing a whole frame in a batch larger than the sample budget
+    must still change the fingerprint."""
+    t = torch.zeros(81, 64, 64, 3)
+    swapped = t.clone()
+    swapped[40] = 0.25
+    assert fp(t, samples=512) != fp(swapped, samples=512)
+
+
+@pytest.mark.parametrize("as_numpy", [False, True])
+def test_tail_edit_detected_just_above_the_sample_budget(fp, as_numpy):
+    """About 1.5x ``samples`` elements: the picks must reach the tail, not
+    stop after the first ``samples`` elements."""
+    t = torch.rand(1, 40, 64, 3)  # 7680 elements, samples=4096
+    edited = t.clone()
+    edited[:, 30:39] = 0.0
+    if as_numpy:
+        t, edited = t.numpy(), edited.numpy()
+    assert fp(t) != fp(edited)
+
+
+def test_numpy_and_bfloat16(fp):
+    arr = np.arange(1000, dtype=np.float32)
+    assert fp(arr) == fp(arr.copy())
+    assert len(fp(torch.ones(10, dtype=torch.bfloat16))) == 32